@@ -14,6 +14,11 @@ from app.core.config import settings
 # Note: You might need to import specific model modules here explicitly if they aren't imported by app.models
 from app.models.settings import SystemSettings
 from app.models.sequin_database import SequinDatabase
+from app.models.sequin_sink import SequinSink
+from app.models.mirror_state import MirrorSyncState
+from app.models.backfill_job import BackfillJob
+from app.models.sequin_instance import SequinInstance
+from app.models.table_catalog import CatalogTable, SchemaChangeEvent
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -21,14 +26,15 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# Skipped when invoked from the running app, which owns its logging setup.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # target_metadata is the metadata object needed for autogenerate support
 target_metadata = SQLModel.metadata
 
 # Overwrite the sqlalchemy.url in the alembic config with the one from the app settings
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+config.set_main_option("sqlalchemy.url", settings.ASYNC_DATABASE_URL)
 
 
 def run_migrations_offline() -> None:
@@ -55,33 +61,45 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection, target_metadata=target_metadata
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
     In this scenario we need to create an Engine
     and associate a connection with the context.
 
+    When called from the app (app.core.db_migrations), the app's async engine
+    hands over an already-open connection via config.attributes, so we reuse
+    it instead of opening a second pool.
     """
-    # Using synchronous engine logic for migrations simply to match standard Alembic sync patterns
-    # unless async is specifically required. However, if the project is async, we can use async adapter.
-    # But usually standard alembic env.py uses standard create_engine.
-    # The project uses 'postgresql+psycopg2' (sync) in settings.DATABASE_URL according to previous view_file.
-    # But the project deps show 'psycopg2-binary' which is sync.
-    # There is no asyncpg in dependencies list in pyproject.toml unless missed.
-    # Wait, `sqlmodel` creates engine with `create_engine` in `app/core/database.py`, which is SYNC.
-    # So we should use sync engine here.
-
-    from sqlalchemy import create_engine
-    
-    connectable = create_engine(settings.DATABASE_URL)
-
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
+    # Standalone `alembic` CLI: drive the async engine ourselves
+    asyncio.run(run_async_migrations())
+
+
+async def run_async_migrations() -> None:
+    connectable = async_engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
 
 
 if context.is_offline_mode():
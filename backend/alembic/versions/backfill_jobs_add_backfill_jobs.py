@@ -0,0 +1,55 @@
+"""Add backfill orchestrator jobs table
+
+Revision ID: backfill_jobs
+Revises: sequin_mirror
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'backfill_jobs'
+down_revision: Union[str, None] = 'sequin_mirror'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fresh databases get this table from the initial create_all
+    if "backfilljob" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "backfilljob",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sink_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("table", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("source_database", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("options", sa.JSON(), nullable=True),
+        sa.Column("state", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("sequin_backfill_id", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("rows_initial_count", sa.Integer(), nullable=True),
+        sa.Column("rows_processed_count", sa.Integer(), nullable=False),
+        sa.Column("rows_ingested_count", sa.Integer(), nullable=False),
+        sa.Column("error", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_backfilljob_sink_id"), "backfilljob", ["sink_id"], unique=False)
+    op.create_index(op.f("ix_backfilljob_source_database"), "backfilljob", ["source_database"], unique=False)
+    op.create_index(op.f("ix_backfilljob_state"), "backfilljob", ["state"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_backfilljob_state"), table_name="backfilljob")
+    op.drop_index(op.f("ix_backfilljob_source_database"), table_name="backfilljob")
+    op.drop_index(op.f("ix_backfilljob_sink_id"), table_name="backfilljob")
+    op.drop_table("backfilljob")
@@ -0,0 +1,40 @@
+"""Add Sequin instances table
+
+Revision ID: sequin_instances
+Revises: backfill_jobs
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'sequin_instances'
+down_revision: Union[str, None] = 'backfill_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fresh databases get this table from the initial create_all
+    if "sequininstance" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "sequininstance",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("sequin_url", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("sequin_token", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("enabled", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sequininstance")
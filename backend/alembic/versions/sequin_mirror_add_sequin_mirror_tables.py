@@ -0,0 +1,64 @@
+"""Add local Sequin mirror tables and columns
+
+Revision ID: sequin_mirror
+Revises: settings_version
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'sequin_mirror'
+down_revision: Union[str, None] = 'settings_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The initial migration runs create_all from the current models, so fresh
+    # databases already have these; only add what is missing.
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    columns = [c["name"] for c in inspector.get_columns("sequindatabase")]
+    if "raw" not in columns:
+        op.add_column("sequindatabase", sa.Column("raw", sa.JSON(), nullable=True))
+    if "content_hash" not in columns:
+        op.add_column("sequindatabase", sa.Column("content_hash", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+    if "synced_at" not in columns:
+        op.add_column("sequindatabase", sa.Column("synced_at", sa.DateTime(timezone=True), nullable=True))
+
+    if "sequinsink" not in tables:
+        op.create_table(
+            "sequinsink",
+            sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("type", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("status", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("raw", sa.JSON(), nullable=True),
+            sa.Column("content_hash", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True),
+            sa.Column("synced_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if "mirrorsyncstate" not in tables:
+        op.create_table(
+            "mirrorsyncstate",
+            sa.Column("resource", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("synced_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("row_count", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("resource"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("mirrorsyncstate")
+    op.drop_table("sequinsink")
+    op.drop_column("sequindatabase", "synced_at")
+    op.drop_column("sequindatabase", "content_hash")
+    op.drop_column("sequindatabase", "raw")
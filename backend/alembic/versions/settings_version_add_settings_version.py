@@ -0,0 +1,31 @@
+"""Add version column to systemsettings
+
+Revision ID: settings_version
+Revises: initial_rev
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'settings_version'
+down_revision: Union[str, None] = 'initial_rev'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The initial migration runs create_all from the current models, so a fresh
+    # database already has the column; only add it to databases created earlier.
+    columns = [c["name"] for c in sa.inspect(op.get_bind()).get_columns("systemsettings")]
+    if "version" not in columns:
+        op.add_column("systemsettings", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("systemsettings", "version")
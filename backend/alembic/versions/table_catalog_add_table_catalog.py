@@ -0,0 +1,63 @@
+"""Add table catalog and schema change events
+
+Revision ID: table_catalog
+Revises: sequin_instances
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'table_catalog'
+down_revision: Union[str, None] = 'sequin_instances'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fresh databases get these tables from the initial create_all
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if "catalogtable" not in tables:
+        op.create_table(
+            "catalogtable",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("instance_id", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+            sa.Column("database_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("schema_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("table_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("oid", sa.Integer(), nullable=True),
+            sa.Column("columns", sa.JSON(), nullable=True),
+            sa.Column("fingerprint", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("instance_id", "database_id", "schema_name", "table_name"),
+        )
+        op.create_index(op.f("ix_catalogtable_database_id"), "catalogtable", ["database_id"], unique=False)
+    if "schemachangeevent" not in tables:
+        op.create_table(
+            "schemachangeevent",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("instance_id", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+            sa.Column("database_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("schema_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("table_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("change", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("details", sa.JSON(), nullable=True),
+            sa.Column("detected_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(op.f("ix_schemachangeevent_database_id"), "schemachangeevent", ["database_id"], unique=False)
+        op.create_index(op.f("ix_schemachangeevent_detected_at"), "schemachangeevent", ["detected_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_schemachangeevent_detected_at"), table_name="schemachangeevent")
+    op.drop_index(op.f("ix_schemachangeevent_database_id"), table_name="schemachangeevent")
+    op.drop_table("schemachangeevent")
+    op.drop_index(op.f("ix_catalogtable_database_id"), table_name="catalogtable")
+    op.drop_table("catalogtable")
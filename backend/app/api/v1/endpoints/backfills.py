@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_session
+from app.models.backfill_job import BackfillJob
+from app.schemas.backfill import BackfillJobEnqueue
+from app.services.backfill_orchestrator import backfill_orchestrator, job_progress
+from app.services.sequin import SequinService
+
+router = APIRouter()
+
+async def _get_job(session: AsyncSession, job_id: int) -> BackfillJob:
+    job = await session.get(BackfillJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    return job
+
+@router.post("/", status_code=202)
+async def enqueue_backfills(
+    *,
+    session: AsyncSession = Depends(get_session),
+    request: BackfillJobEnqueue,
+) -> Any:
+    """
+    Queue backfills for many sinks/tables. They start as concurrency limits allow.
+    """
+    jobs = await backfill_orchestrator.enqueue(session, [item.model_dump() for item in request.items])
+    return [job_progress(job) for job in jobs]
+
+@router.get("/")
+async def list_backfills(
+    state: Optional[str] = None,
+    sink_id: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    """
+    List orchestrated backfill jobs with progress, newest first.
+    """
+    query = select(BackfillJob)
+    if state:
+        query = query.where(BackfillJob.state == state)
+    if sink_id:
+        query = query.where(BackfillJob.sink_id == sink_id)
+    query = query.order_by(BackfillJob.id.desc()).offset(offset).limit(min(limit, 1000))
+    return [job_progress(job) for job in (await session.exec(query)).all()]
+
+@router.get("/summary")
+async def backfill_summary(session: AsyncSession = Depends(get_session)) -> Any:
+    """
+    Job counts per state, running jobs per source and overall throughput.
+    """
+    return await backfill_orchestrator.summary(session)
+
+@router.post("/tick")
+async def run_tick(session: AsyncSession = Depends(get_session)) -> Any:
+    """
+    Refresh progress and start queued backfills now.
+    """
+    service = await SequinService.create(session)
+    return await backfill_orchestrator.tick(session, service)
+
+@router.get("/{job_id}")
+async def get_backfill(job_id: int, session: AsyncSession = Depends(get_session)) -> Any:
+    return job_progress(await _get_job(session, job_id))
+
+@router.post("/{job_id}/cancel")
+async def cancel_backfill(job_id: int, session: AsyncSession = Depends(get_session)) -> Any:
+    """
+    Cancel a queued or running backfill job.
+    """
+    job = await _get_job(session, job_id)
+    service = await SequinService.create(session) if job.sequin_backfill_id else None
+    return job_progress(await backfill_orchestrator.cancel(session, job, service))
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
+from app.core.config import settings
+from app.services.job_queue import job_queue
+
+router = APIRouter()
+
+@router.get("/")
+async def list_jobs(
+    state: Optional[Literal["queued", "running", "succeeded", "failed"]] = None,
+    kind: Optional[str] = None,
+):
+    """
+    Background jobs known to this worker, newest first. Finished jobs are kept
+    for JOB_RESULT_TTL seconds.
+    """
+    return [job.to_dict() for job in job_queue.list(state=state, kind=kind)]
+
+@router.get("/stats")
+async def job_stats():
+    return job_queue.stats()
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """
+    State of one job, with its result or error ({"status_code", "detail"}) once finished.
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    return job.to_dict()
+
+@router.get("/{job_id}/events")
+async def stream_job(job_id: str):
+    """
+    Server-Sent Events feed of one job: a "status" event on every state change,
+    closing after it succeeded or failed ("gone" if the job is unknown).
+    """
+    return StreamingResponse(
+        job_queue.stream(job_id, heartbeat=settings.STATUS_STREAM_HEARTBEAT),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal, Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_session
+from app.services.admission import AdmissionRejected, kafka_admission
+from app.services.kafka_lag import kafka_lag_collector
+from app.services.settings_store import settings_store
+
+router = APIRouter()
+
+@router.get("/lag")
+async def get_lag(live: bool = False, session: AsyncSession = Depends(get_session)):
+    """
+    Latest consumer-group lag per group, topic and partition.
+    Pass ?live=true to sample now instead of returning the last collected value.
+    """
+    if live or kafka_lag_collector.latest is None:
+        settings = await settings_store.get(session)
+        if not settings:
+            raise HTTPException(status_code=404, detail="Settings not found")
+        try:
+            async with kafka_admission.admit(settings.kafka_url, "lag"):
+                return await kafka_lag_collector.collect(settings.kafka_url)
+        except AdmissionRejected as e:
+            raise e.to_http_exception()
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Kafka lag collection failed: {e}")
+    return {**kafka_lag_collector.latest, "last_error": kafka_lag_collector.last_error}
+
+@router.get("/lag/history")
+async def get_lag_history(
+    resolution: Literal["raw", "1m", "5m", "1h"] = "1m",
+    group: Optional[str] = None,
+    topic: Optional[str] = None,
+):
+    """
+    Lag time series per group and topic, keyed "group|topic".
+    Rollup resolutions return the average and max lag per bucket.
+    """
+    series = kafka_lag_collector.series.query(resolution)
+    if group or topic:
+        def keep(key: str) -> bool:
+            key_group, key_topic = key.split("|", 1)
+            return (group is None or key_group == group) and (topic is None or key_topic == topic)
+
+        for point in series:
+            for name in ("lag", "avg", "max"):
+                if name in point:
+                    point[name] = {k: v for k, v in point[name].items() if keep(k)}
+    return {"resolution": resolution, "points": series}
@@ -1,27 +1,79 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.database import get_session
+from app.core.http_client import get_pool_stats
+from app.services.cache import sequin_cache, shared_sequin_cache
+from app.services.coordination import coordinator
+from app.services.job_queue import JobOptions, job_options, run_or_submit
+from app.services.admission import sequin_admission
+from app.services.resilience import resilience_stats
+from app.services.singleflight import sequin_flights
 from app.services.sequin import SequinService
-from typing import Any, Dict
+from app.services.sequin_instances import DEFAULT_INSTANCE, sequin_instances
+from app.services.sequin_mirror import sequin_mirror, DATABASES, SINKS
+from typing import Any, Dict, Literal, Optional
+
+Source = Literal["live", "mirror"]
 
 router = APIRouter()
 
 @router.get("/databases")
-async def list_databases(session: Session = Depends(get_session)):
-    service = SequinService(session)
-    return await service.list_databases()
+async def list_databases(source: Source = "live", instance: Optional[str] = None, session: AsyncSession = Depends(get_session)):
+    """`instance` routes to one Sequin instance; instance=all merges the lists of every instance."""
+    return await sequin_instances.list_resource(session, DATABASES, source, instance)
 
 @router.get("/sinks")
-async def list_sinks(session: Session = Depends(get_session)):
-    service = SequinService(session)
-    return await service.list_sinks()
+async def list_sinks(source: Source = "live", instance: Optional[str] = None, session: AsyncSession = Depends(get_session)):
+    """`instance` routes to one Sequin instance; instance=all merges the lists of every instance."""
+    return await sequin_instances.list_resource(session, SINKS, source, instance)
 
 @router.post("/sinks")
-async def create_sink(sink_data: Dict[str, Any], session: Session = Depends(get_session)):
-    service = SequinService(session)
+async def create_sink(sink_data: Dict[str, Any], instance: Optional[str] = None, session: AsyncSession = Depends(get_session)):
+    service = await sequin_instances.service(session, instance)
     return await service.create_sink(sink_data)
 
 @router.post("/sinks/{sink_id}/backfills")
-async def create_backfill(sink_id: str, backfill_data: Dict[str, Any], session: Session = Depends(get_session)):
-    service = SequinService(session)
-    return await service.create_backfill(sink_id, backfill_data)
+async def create_backfill(
+    sink_id: str,
+    backfill_data: Dict[str, Any],
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    jobs: JobOptions = Depends(job_options),
+):
+    """Start a backfill; ?background=true returns 202 with a job to poll (see /jobs)."""
+    service = await sequin_instances.service(session, instance)
+    return await run_or_submit(
+        "create_backfill",
+        lambda _: service.create_backfill(sink_id, backfill_data),
+        session,
+        jobs,
+        request={"instance": instance, "sink_id": sink_id, "backfill": backfill_data},
+    )
+
+@router.get("/pool-stats")
+async def pool_stats(instance: Optional[str] = None):
+    """Connection pool statistics of the shared Sequin HTTP client, or of one instance's pool."""
+    return get_pool_stats(None if instance in (None, DEFAULT_INSTANCE) else instance)
+
+@router.get("/stats")
+async def proxy_stats():
+    """Response cache, request coalescing, retry, circuit breaker and cross-worker counters for the Sequin proxy."""
+    return {
+        "cache": sequin_cache.stats(),
+        "shared_cache": shared_sequin_cache.stats(),
+        "coordination": coordinator.stats(),
+        "singleflight": sequin_flights.stats(),
+        "admission": sequin_admission.stats(),
+        **resilience_stats(),
+    }
+
+@router.get("/mirror/status")
+async def mirror_status(session: AsyncSession = Depends(get_session)):
+    """Freshness of the local Sequin mirror per resource."""
+    return await sequin_mirror.status(session)
+
+@router.post("/mirror/sync")
+async def mirror_sync(session: AsyncSession = Depends(get_session)):
+    """Sync the local mirror from Sequin now."""
+    service = await SequinService.create(session)
+    return await sequin_mirror.sync(session, service)
@@ -1,66 +1,154 @@
+import logging
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
-from typing import Any
-from sqlmodel import Session
+from typing import Any, Literal, Optional, Tuple
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_session
-from app.services.sequin import SequinService
-from app.schemas.sequin_database import SequinDatabaseCreate, SequinDatabaseUpdate
+from app.services.job_queue import JobOptions, job_options, run_or_submit
+from app.services.sequin_instances import DEFAULT_INSTANCE, ensure_mirrored, sequin_instances
+from app.services.sequin_mirror import sequin_mirror, DATABASES
+from app.services.table_catalog import table_catalog
+from app.schemas.sequin_database import (
+    BulkResponse,
+    SequinDatabaseBulkCreate,
+    SequinDatabaseBulkDelete,
+    SequinDatabaseBulkUpdate,
+    SequinDatabaseCreate,
+    SequinDatabaseUpdate,
+)
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def _page_size(limit: Optional[int]) -> int:
+    return min(max(limit or settings.CATALOG_PAGE_SIZE, 1), settings.CATALOG_MAX_PAGE_SIZE)
+
+async def _catalog_key(session: AsyncSession, instance: Optional[str], database_id: str) -> Tuple[str, str]:
+    """(instance, Sequin database ID) of a catalog; the path may give the database by name."""
+    instance_id = instance or DEFAULT_INSTANCE
+    service = await sequin_instances.service(session, instance)
+    catalog_id = await table_catalog.resolve_database_id(
+        session, service, database_id, mirrored=instance_id == DEFAULT_INSTANCE,
+    )
+    return instance_id, catalog_id
+
+def _bulk_response(results: list) -> BulkResponse:
+    succeeded = sum(1 for result in results if result["ok"])
+    return BulkResponse(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
 @router.get("/", status_code=200)
 async def list_databases(
-    session: Session = Depends(get_session),
+    source: Literal["live", "mirror"] = "live",
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
     """
-    List all databases from Sequin and sync with local storage.
+    List all databases from Sequin, or from the local mirror with source=mirror.
+    `instance` routes to one Sequin instance; instance=all merges the lists of every instance.
     """
-    service = SequinService(session)
-    return await service.list_databases()
+    return await sequin_instances.list_resource(session, DATABASES, source, instance)
 
 @router.post("/", status_code=201)
 async def create_database(
     *,
-    session: Session = Depends(get_session),
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
     database_in: SequinDatabaseCreate,
 ) -> Any:
     """
     Create a new database in Sequin.
     """
-    service = SequinService(session)
+    service = await sequin_instances.service(session, instance)
     # Pydantic to dict
     try:
         return await service.create_database(database_in.model_dump())
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Creating a Sequin database failed")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_create_databases(
+    *,
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    bulk_in: SequinDatabaseBulkCreate,
+) -> Any:
+    """
+    Create many databases in Sequin with bounded concurrency.
+    Returns one result per item; a failing or slow item does not stop the others.
+    """
+    service = await sequin_instances.service(session, instance)
+    results = await service.bulk_create_databases(
+        [item.model_dump() for item in bulk_in.items],
+        validate_connection=bulk_in.validate_connection,
+        concurrency=bulk_in.concurrency,
+    )
+    return _bulk_response(results)
+
+@router.put("/bulk", response_model=BulkResponse)
+async def bulk_update_databases(
+    *,
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    bulk_in: SequinDatabaseBulkUpdate,
+) -> Any:
+    """
+    Update many databases in Sequin with bounded concurrency.
+    """
+    service = await sequin_instances.service(session, instance)
+    # filter out None values
+    items = [item.model_dump(exclude_unset=True) for item in bulk_in.items]
+    results = await service.bulk_update_databases(items, concurrency=bulk_in.concurrency)
+    return _bulk_response(results)
+
+@router.delete("/bulk", response_model=BulkResponse)
+async def bulk_delete_databases(
+    *,
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    bulk_in: SequinDatabaseBulkDelete,
+) -> Any:
+    """
+    Delete many databases from Sequin with bounded concurrency.
+    """
+    service = await sequin_instances.service(session, instance)
+    results = await service.bulk_delete_databases(bulk_in.ids, concurrency=bulk_in.concurrency)
+    return _bulk_response(results)
+
 @router.get("/{database_id}")
 async def get_database(
     *,
-    session: Session = Depends(get_session),
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
     database_id: str,
+    source: Literal["live", "mirror"] = "live",
 ) -> Any:
     """
-    Get a specific database by ID or name from Sequin.
+    Get a specific database by ID or name from Sequin, or from the local mirror with source=mirror.
     """
-    service = SequinService(session)
+    if source == "mirror":
+        ensure_mirrored(instance)
+    service = await sequin_instances.service(session, instance)
+    if source == "mirror":
+        return await sequin_mirror.get_database(session, database_id, service)
     return await service.get_database(database_id)
 
 @router.put("/{database_id}")
 async def update_database(
     *,
-    session: Session = Depends(get_session),
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
     database_id: str,
     database_in: SequinDatabaseUpdate,
 ) -> Any:
     """
     Update a database.
     """
-    service = SequinService(session)
+    service = await sequin_instances.service(session, instance)
     # filter out None values
     update_data = database_in.model_dump(exclude_unset=True)
     return await service.update_database(database_id, update_data)
@@ -68,36 +156,128 @@ async def update_database(
 @router.delete("/{database_id}")
 async def delete_database(
     *,
-    session: Session = Depends(get_session),
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
     database_id: str,
 ) -> Any:
     """
     Delete a database.
     """
-    service = SequinService(session)
+    service = await sequin_instances.service(session, instance)
     return await service.delete_database(database_id)
 
 @router.post("/test-connection")
 async def test_connection(
     *,
-    session: Session = Depends(get_session),
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    jobs: JobOptions = Depends(job_options),
     database_in: SequinDatabaseCreate = None, # Optional payload to test specific config
 ) -> Any:
     """
-    Test connection to a database.
+    Test connection to a database. ?background=true returns 202 with a job to poll.
     """
-    service = SequinService(session)
+    service = await sequin_instances.service(session, instance)
     data = database_in.model_dump() if database_in else {}
-    return await service.test_connection_db(data)
+    return await run_or_submit(
+        "test_connection_db",
+        lambda _: service.test_connection_db(data),
+        session,
+        jobs,
+        request={"instance": instance, "database": data},
+    )
 
 @router.post("/{database_id}/refresh-tables")
 async def refresh_tables(
     *,
-    session: Session = Depends(get_session),
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    database_id: str,
+    jobs: JobOptions = Depends(job_options),
+) -> Any:
+    """
+    Refresh tables for a database and update the local table catalog from the result.
+    ?background=true returns 202 with a job to poll.
+    """
+    service = await sequin_instances.service(session, instance)
+
+    async def run(run_session: AsyncSession) -> Any:
+        response = await service.refresh_tables(database_id)
+        instance_id, catalog_id = await _catalog_key(run_session, instance, database_id)
+        catalog = await table_catalog.refresh(run_session, service, catalog_id, response, instance_id)
+        if isinstance(response, dict):
+            return {**response, "catalog": catalog}
+        return response
+
+    return await run_or_submit(
+        "refresh_tables", run, session, jobs, request={"instance": instance, "database_id": database_id},
+    )
+
+@router.get("/{database_id}/catalog/tables")
+async def search_catalog_tables(
+    *,
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    database_id: str,
+    q: Optional[str] = None,
+    mode: Literal["prefix", "substring"] = "prefix",
+    schema: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> Any:
+    """
+    Search the table catalog of a database by table name or "schema.table".
+    Filled by refresh-tables; paginated with limit/offset.
+    """
+    instance_id, catalog_id = await _catalog_key(session, instance, database_id)
+    return await table_catalog.search(
+        session, instance_id, catalog_id,
+        query=q, mode=mode, schema=schema, limit=_page_size(limit), offset=max(offset, 0),
+    )
+
+@router.get("/{database_id}/catalog/tables/{schema}/{table}")
+async def get_catalog_table(
+    *,
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    database_id: str,
+    schema: str,
+    table: str,
+) -> Any:
+    """
+    One catalogued table with its columns.
+    """
+    instance_id, catalog_id = await _catalog_key(session, instance, database_id)
+    return await table_catalog.get_table(session, instance_id, catalog_id, schema, table)
+
+@router.get("/{database_id}/catalog/schemas")
+async def list_catalog_schemas(
+    *,
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    database_id: str,
+) -> Any:
+    """
+    Schemas in the table catalog of a database, with their table counts.
+    """
+    instance_id, catalog_id = await _catalog_key(session, instance, database_id)
+    return await table_catalog.schemas(session, instance_id, catalog_id)
+
+@router.get("/{database_id}/catalog/changes")
+async def list_schema_changes(
+    *,
+    instance: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
     database_id: str,
+    since: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
 ) -> Any:
     """
-    Refresh tables for a database.
+    Tables added, altered or removed between catalog refreshes, newest first.
     """
-    service = SequinService(session)
-    return await service.refresh_tables(database_id)
+    instance_id, catalog_id = await _catalog_key(session, instance, database_id)
+    return await table_catalog.changes(
+        session, instance_id, catalog_id,
+        since=since, limit=_page_size(limit), offset=max(offset, 0),
+    )
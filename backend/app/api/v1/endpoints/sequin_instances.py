@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends
+from typing import Any, List
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_session
+from app.models.sequin_instance import SequinInstance
+from app.schemas.sequin_instance import SequinInstanceCreate, SequinInstanceResponse, SequinInstanceUpdate
+from app.services.health_monitor import health_monitor, instance_probe_name, SEQUIN
+from app.services.sequin_instances import DEFAULT_INSTANCE, sequin_instances
+from app.services.settings_store import settings_store
+
+router = APIRouter()
+
+def _response(instance: SequinInstance) -> SequinInstanceResponse:
+    status = health_monitor.get_status(instance_probe_name(instance.id))
+    return SequinInstanceResponse(
+        id=instance.id,
+        name=instance.name,
+        sequin_url=instance.sequin_url,
+        has_token=bool(instance.sequin_token),
+        enabled=instance.enabled,
+        health=status.to_dict() if status else None,
+    )
+
+@router.get("/", response_model=List[SequinInstanceResponse])
+async def list_instances(session: AsyncSession = Depends(get_session)) -> Any:
+    """
+    All Sequin instances with their last health status, the default one (from the system settings) first.
+    """
+    instances = []
+    settings = await settings_store.get(session)
+    if settings:
+        status = health_monitor.get_status(SEQUIN)
+        instances.append(SequinInstanceResponse(
+            id=DEFAULT_INSTANCE,
+            sequin_url=settings.sequin_url,
+            has_token=bool(settings.sequin_token),
+            enabled=True,
+            health=status.to_dict() if status else None,
+        ))
+    instances.extend(_response(instance) for instance in (await sequin_instances.all(session)).values())
+    return instances
+
+@router.post("/", status_code=201, response_model=SequinInstanceResponse)
+async def create_instance(
+    *,
+    session: AsyncSession = Depends(get_session),
+    instance_in: SequinInstanceCreate,
+) -> Any:
+    """
+    Register an additional Sequin instance. Requests are routed to it with ?instance=<id>.
+    """
+    return _response(await sequin_instances.create(session, instance_in.model_dump()))
+
+@router.put("/{instance_id}", response_model=SequinInstanceResponse)
+async def update_instance(
+    *,
+    session: AsyncSession = Depends(get_session),
+    instance_id: str,
+    instance_in: SequinInstanceUpdate,
+) -> Any:
+    """
+    Update an instance. Its connection pool, cached responses and health status are reset.
+    """
+    return _response(await sequin_instances.update(session, instance_id, instance_in.model_dump(exclude_unset=True)))
+
+@router.delete("/{instance_id}")
+async def delete_instance(
+    *,
+    session: AsyncSession = Depends(get_session),
+    instance_id: str,
+) -> Any:
+    """
+    Remove an instance and close its connection pool.
+    """
+    await sequin_instances.delete(session, instance_id)
+    return {"deleted": instance_id}
+
+@router.post("/{instance_id}/test-connection")
+async def test_instance_connection(
+    *,
+    session: AsyncSession = Depends(get_session),
+    instance_id: str,
+) -> Any:
+    """
+    Probe an instance now and record the result as its health status.
+    """
+    if instance_id == DEFAULT_INSTANCE:
+        return (await health_monitor.run_probe(SEQUIN, session)).to_dict()
+    await sequin_instances.get(session, instance_id)
+    return (await health_monitor.run_probe(instance_probe_name(instance_id), session)).to_dict()
@@ -1,112 +1,91 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from typing import Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.database import get_session
 from app.models.settings import SystemSettings
-from app.services.sequin import SequinService
-from kafka import KafkaProducer     # type: ignore
-from kafka.errors import KafkaError # type: ignore
-from datetime import datetime, timezone
+from app.services.admission import AdmissionRejected, kafka_admission
+from app.services.coordination import coordinator
+from app.services.health_monitor import health_monitor, KAFKA, SEQUIN
+from app.services.job_queue import JobOptions, job_options, run_or_submit
+from app.services.settings_store import settings_store
 
 router = APIRouter()
 
 @router.get("/", response_model=SystemSettings)
-def get_settings(session: Session = Depends(get_session)):
-    settings = session.exec(select(SystemSettings)).first()
+async def get_settings(session: AsyncSession = Depends(get_session)):
+    settings = await settings_store.get(session)
     if not settings:
         # Return default if not exists
         return SystemSettings()
     return settings
 
 @router.post("/", response_model=SystemSettings)
-def update_settings(settings_in: SystemSettings, session: Session = Depends(get_session)):
-    settings = session.exec(select(SystemSettings)).first()
+async def update_settings(settings_in: SystemSettings, session: AsyncSession = Depends(get_session)):
+    settings = (await session.exec(select(SystemSettings))).first()
     if not settings:
-        settings = SystemSettings(**settings_in.model_dump())
+        settings = SystemSettings(**settings_in.model_dump(exclude={"version"}))
         session.add(settings)
     else:
-        settings.sqlmodel_update(settings_in.model_dump(exclude_unset=True))
-        session.add(settings)
+        settings.sqlmodel_update(settings_in.model_dump(exclude_unset=True, exclude={"version"}))
+    # Other workers pick up the change through their version check
+    settings.version += 1
+    session.add(settings)
     
-    session.commit()
-    session.refresh(settings)
+    await session.commit()
+    await session.refresh(settings)
+    settings_store.set(settings)
+    await coordinator.publish("settings_changed")
     return settings
 
+async def _health_status(name: str, live: bool, session: AsyncSession, **options) -> dict:
+    """Last monitored status for `name`, or a fresh probe when asked for or not yet available."""
+    status = health_monitor.get_status(name)
+    cached = status is not None and not live
+    if not cached:
+        status = await health_monitor.run_probe(name, session, **options)
+    return {**status.to_dict(), "cached": cached}
+
+@router.get("/health")
+async def get_health():
+    """Last known Sequin and Kafka status from the background health monitor."""
+    return health_monitor.snapshot()
+
 @router.post("/test-connection")
-async def test_connection(session: Session = Depends(get_session)):
-    service = SequinService(session)
-    is_connected = await service.test_connection()
-    return {
-        "connected": is_connected,
-        "checked_at": datetime.now(timezone.utc).isoformat()
-    }
+async def test_connection(live: bool = False, session: AsyncSession = Depends(get_session)):
+    """
+    Sequin connectivity as last seen by the health monitor.
+    Pass ?live=true to force a fresh probe.
+    """
+    return await _health_status(SEQUIN, live, session)
 
 @router.post("/test-kafka")
-def test_kafka_connection(session: Session = Depends(get_session)):
+async def test_kafka_connection(
+    live: bool = False,
+    metadata_only: Optional[bool] = None,
+    session: AsyncSession = Depends(get_session),
+    jobs: JobOptions = Depends(job_options),
+):
     """
-    Test connectivity to Kafka using kafka-python with multiple checks.
+    Kafka connectivity as last seen by the health monitor.
+    Pass ?live=true to force a fresh probe. A live probe runs the admin, producer
+    and consumer checks concurrently; ?metadata_only=true only fetches cluster metadata.
+    With ?background=true a live probe returns 202 with a job to poll.
     """
-    from kafka import KafkaConsumer, KafkaAdminClient # type: ignore
-    
-    settings = session.exec(select(SystemSettings)).first()
+    settings = await settings_store.get(session)
     if not settings:
         raise HTTPException(status_code=404, detail="Settings not found")
-    
-    bootstrap_servers = settings.kafka_url
-    details = []
-    
-    # Test 1: Try connecting with KafkaAdminClient
-    try:
-        admin_client = KafkaAdminClient(
-            bootstrap_servers=bootstrap_servers,
-            client_id="connection-test",
-            request_timeout_ms=5000,
-        )
-        cluster_metadata = admin_client.describe_cluster()
-        details.append(f"AdminClient connected. Cluster ID: {cluster_metadata.get('cluster_id', 'N/A')}")
-        admin_client.close()
-    except Exception as e:
-        return {
-            "connected": False, 
-            "error": f"AdminClient connection failed: {str(e)}",
-            "checked_at": datetime.now(timezone.utc).isoformat()
-        }
 
-    # Test 2: Try creating a producer
-    try:
-        producer = KafkaProducer(
-            bootstrap_servers=bootstrap_servers,
-            request_timeout_ms=5000,
-            max_block_ms=5000,
-        )
-        metadata = producer.bootstrap_connected()
-        details.append(f"Producer connected. Bootstrap connected: {metadata}")
-        producer.close()
-    except Exception as e:
-         return {
-            "connected": False, 
-            "error": f"Producer connection failed: {str(e)}",
-            "checked_at": datetime.now(timezone.utc).isoformat()
-        }
+    options = {} if metadata_only is None else {"metadata_only": metadata_only}
+    if not live and health_monitor.get_status(KAFKA) is not None:
+        return await _health_status(KAFKA, live, session, **options)
 
-    # Test 3: Try creating a consumer
-    try:
-        consumer = KafkaConsumer(
-            bootstrap_servers=bootstrap_servers,
-            request_timeout_ms=5000,
-            consumer_timeout_ms=1000,
-        )
-        topics = consumer.topics() # Get topics to verify connectivity
-        details.append(f"Consumer connected. Topics visible.")
-        consumer.close()
-    except Exception as e:
-         return {
-            "connected": False, 
-            "error": f"Consumer connection failed: {str(e)}",
-            "checked_at": datetime.now(timezone.utc).isoformat()
-        }
+    async def run(run_session: AsyncSession) -> dict:
+        # A live check opens admin, producer and consumer connections: admission-controlled
+        try:
+            async with kafka_admission.admit(settings.kafka_url, "test_connection"):
+                return await _health_status(KAFKA, live, run_session, **options)
+        except AdmissionRejected as e:
+            raise e.to_http_exception()
 
-    return {
-        "connected": True,
-        "checked_at": datetime.now(timezone.utc).isoformat(),
-        "details": details
-    }
+    return await run_or_submit("test_kafka", run, session, jobs, request={"kafka_url": settings.kafka_url, **options})
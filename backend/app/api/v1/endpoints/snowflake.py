@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends
+from typing import Any
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_session
+from app.models.sequin_database import SequinDatabase
+from app.schemas.snowflake import ColumnDefinition, SnowflakePipelinePreview, SnowflakePipelineResponse
+from app.services.sequin import SequinService
+from app.services.snowflake_pipeline import ColumnSpec, generate_pipeline, introspect_postgres, pipeline_names
+
+router = APIRouter()
+
+@router.post("/pipelines/preview", response_model=SnowflakePipelineResponse)
+async def preview_pipeline(
+    *,
+    session: AsyncSession = Depends(get_session),
+    request: SnowflakePipelinePreview,
+) -> Any:
+    """
+    Generate the Snowflake DDL (target table, stream, MERGE task) for one source table.
+    Nothing is executed; run the returned statements in Snowflake.
+    """
+    if request.columns:
+        columns = [
+            ColumnSpec(name=c.name, pg_type=c.type, primary_key=c.primary_key, nullable=c.nullable)
+            for c in request.columns
+        ]
+    else:
+        service = await SequinService.create(session)
+        data = await service.get_database(request.database_id)
+        connection = dict(data.get("data", data))
+        if request.password:
+            connection["password"] = request.password
+        elif not connection.get("password"):
+            local = await session.get(SequinDatabase, connection.get("id") or request.database_id)
+            connection["password"] = local.password if local else None
+        columns = await introspect_postgres(connection, request.schema_name, request.table)
+
+    names = pipeline_names(
+        table=request.table,
+        landing_database=request.landing_database,
+        landing_schema=request.landing_schema,
+        target_database=request.target_database,
+        target_schema=request.target_schema,
+        warehouse=request.warehouse,
+        schedule=request.schedule,
+        target_table=request.target_table,
+    )
+    statements = generate_pipeline(columns, names)
+    return SnowflakePipelineResponse(
+        table=request.table,
+        columns=[
+            ColumnDefinition(name=c.name, type=c.pg_type, primary_key=c.primary_key, nullable=c.nullable)
+            for c in columns
+        ],
+        statements=statements,
+        sql="".join(f"{statement};\n\n" for statement in statements),
+    )
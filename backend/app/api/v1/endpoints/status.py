@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from app.services.status_stream import status_broadcaster
+
+router = APIRouter()
+
+@router.get("/stream")
+async def stream_status():
+    """
+    Server-Sent Events feed of pipeline status for the dashboard.
+
+    Sends a "snapshot" event with the current databases, sinks, health and
+    Kafka lag, then "diff" events with only what changed. A "dropped" event
+    means the client fell behind and should reconnect.
+    """
+    return StreamingResponse(
+        status_broadcaster.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/stream/stats")
+async def stream_stats():
+    return status_broadcaster.stats()
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends
+from typing import Literal, Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_session
+from app.services.wal_monitor import wal_monitor
+
+router = APIRouter()
+
+@router.get("/slots")
+async def get_slots(live: bool = False, session: AsyncSession = Depends(get_session)):
+    """
+    Latest replication slot sample per source database: WAL position, retained
+    bytes and confirmed-flush lag per slot. Pass ?live=true to sample now.
+    """
+    if live or wal_monitor.latest is None:
+        return await wal_monitor.collect(session)
+    return wal_monitor.latest
+
+@router.get("/history")
+async def get_history(
+    metric: Literal["retained_bytes", "confirmed_flush_lag_seconds"] = "retained_bytes",
+    resolution: Literal["raw", "1m", "5m", "1h"] = "1m",
+    source: Optional[str] = None,
+    slot: Optional[str] = None,
+):
+    """
+    Time series of one slot metric, keyed "source|slot".
+    Rollup resolutions return the average and max per bucket.
+    """
+    series = wal_monitor.retained if metric == "retained_bytes" else wal_monitor.flush_lag
+    points = series.query(resolution)
+    if source or slot:
+        def keep(key: str) -> bool:
+            key_source, key_slot = key.split("|", 1)
+            return (source is None or key_source == source) and (slot is None or key_slot == slot)
+
+        for point in points:
+            for name in ("lag", "avg", "max"):
+                if name in point:
+                    point[name] = {k: v for k, v in point[name].items() if keep(k)}
+    return {"metric": metric, "resolution": resolution, "points": points}
+
+@router.get("/alerts")
+async def get_alerts():
+    """
+    Slots over the retained-WAL or flush-lag thresholds, slots whose WAL is
+    about to be or was removed, and sources that could not be sampled. Critical first.
+    """
+    alerts = wal_monitor.alerts()
+    return {
+        "collected_at": wal_monitor.latest["collected_at"] if wal_monitor.latest else None,
+        "critical": sum(1 for alert in alerts if alert["severity"] == "critical"),
+        "warning": sum(1 for alert in alerts if alert["severity"] == "warning"),
+        "alerts": alerts,
+    }
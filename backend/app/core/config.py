@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
@@ -12,6 +12,156 @@ class Settings(BaseSettings):
     POSTGRES_SERVER: str = "localhost"
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = "etl_manager"
+    # Log every SQL statement (slow; for debugging only)
+    DB_ECHO: bool = False
+    # Schema step on startup: "migrate" (Alembic, no DDL when already at head),
+    # "create_all" (SQLModel metadata) or "skip"
+    DB_STARTUP_MODE: Literal["migrate", "create_all", "skip"] = "migrate"
+
+    # Logging: JSON lines written by a background thread. LOG_LEVELS sets
+    # per-module levels, e.g. LOG_LEVELS='{"app.services.sequin": "DEBUG"}'.
+    # Debug payload logs are sampled and truncated.
+    LOG_CONFIGURE: bool = True
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: Dict[str, str] = {
+        "sqlalchemy.engine": "WARNING",
+        "apscheduler": "WARNING",
+        "kafka": "WARNING",
+        "httpx": "WARNING",
+    }
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1
+    LOG_PAYLOAD_MAX_CHARS: int = 2000
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Sequin HTTP client (shared, app-lifetime connection pool)
+    SEQUIN_HTTP_MAX_CONNECTIONS: int = 100
+    SEQUIN_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    SEQUIN_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    SEQUIN_HTTP2: bool = True
+    SEQUIN_HTTP_CONNECT_TIMEOUT: float = 5.0
+    SEQUIN_HTTP_READ_TIMEOUT: float = 30.0
+    SEQUIN_HTTP_WRITE_TIMEOUT: float = 30.0
+    SEQUIN_HTTP_POOL_TIMEOUT: float = 10.0
+
+    # Sequin GET response cache (seconds / entries). TTL of 0 disables caching.
+    SEQUIN_CACHE_TTL: float = 5.0
+    SEQUIN_CACHE_STALE_TTL: float = 30.0
+    SEQUIN_CACHE_MAX_ENTRIES: int = 256
+    # Serve list endpoints with Sequin's body bytes as-is instead of parsing and re-encoding them
+    SEQUIN_RAW_PASSTHROUGH: bool = True
+
+    # Sequin retries (idempotent calls only) and circuit breaker
+    SEQUIN_RETRY_ATTEMPTS: int = 3
+    SEQUIN_RETRY_BASE_DELAY: float = 0.2
+    SEQUIN_RETRY_MAX_DELAY: float = 5.0
+    SEQUIN_BREAKER_FAILURE_THRESHOLD: int = 5
+    SEQUIN_BREAKER_RESET_TIMEOUT: float = 30.0
+
+    # How often (seconds) a worker checks whether another worker changed SystemSettings
+    SETTINGS_VERSION_CHECK_INTERVAL: float = 5.0
+
+    # Background health monitor for Sequin and Kafka (seconds)
+    HEALTH_CHECK_ENABLED: bool = True
+    HEALTH_CHECK_INTERVAL: float = 30.0
+    HEALTH_CHECK_JITTER: float = 5.0
+    HEALTH_CHECK_MAX_BACKOFF: float = 300.0
+
+    # Kafka connectivity check: overall deadline (seconds) and whether scheduled
+    # checks only fetch cluster metadata instead of also creating a producer/consumer
+    KAFKA_CHECK_TIMEOUT: float = 5.0
+    KAFKA_CHECK_METADATA_ONLY: bool = True
+
+    # Consumer-group lag collector for CDC sink topics. Empty patterns match everything.
+    KAFKA_LAG_ENABLED: bool = True
+    KAFKA_LAG_INTERVAL: float = 30.0
+    KAFKA_LAG_GROUP_PATTERN: str = ""
+    KAFKA_LAG_TOPIC_PATTERN: str = ""
+    KAFKA_LAG_RAW_SAMPLES: int = 720
+
+    # Replication slot / WAL retention monitor for the source databases in the
+    # local mirror: sample interval and query timeout (seconds), raw samples
+    # kept, and warning/critical alert thresholds
+    WAL_MONITOR_ENABLED: bool = True
+    WAL_MONITOR_INTERVAL: float = 60.0
+    WAL_MONITOR_TIMEOUT: float = 10.0
+    WAL_MONITOR_RAW_SAMPLES: int = 720
+    WAL_RETAINED_WARNING_BYTES: int = 1024 ** 3
+    WAL_RETAINED_CRITICAL_BYTES: int = 10 * 1024 ** 3
+    WAL_FLUSH_LAG_WARNING_SECONDS: float = 300.0
+    WAL_FLUSH_LAG_CRITICAL_SECONDS: float = 1800.0
+
+    # Local mirror of Sequin databases/sinks (seconds)
+    MIRROR_SYNC_ENABLED: bool = True
+    MIRROR_SYNC_INTERVAL: float = 60.0
+    MIRROR_MAX_STALENESS: float = 300.0
+
+    # Table catalog built from refresh_tables: databases whose search index is
+    # kept in memory, and the default/maximum search page size
+    CATALOG_INDEX_MAX_DATABASES: int = 64
+    CATALOG_PAGE_SIZE: int = 50
+    CATALOG_MAX_PAGE_SIZE: int = 500
+
+    # Dashboard status stream (SSE): poll interval, burst coalescing window and
+    # keep-alive (seconds), and how many events a client may fall behind before it is dropped
+    STATUS_STREAM_INTERVAL: float = 10.0
+    STATUS_STREAM_COALESCE_WINDOW: float = 0.5
+    STATUS_STREAM_HEARTBEAT: float = 15.0
+    STATUS_STREAM_QUEUE_SIZE: int = 32
+
+    # Backfill orchestrator: concurrent Sequin backfills overall and per source
+    # database, progress poll interval (seconds) and start attempts on 5xx
+    BACKFILL_ORCHESTRATOR_ENABLED: bool = True
+    BACKFILL_MAX_CONCURRENT: int = 4
+    BACKFILL_MAX_PER_SOURCE: int = 1
+    BACKFILL_POLL_INTERVAL: float = 10.0
+    BACKFILL_MAX_ATTEMPTS: int = 3
+    # Seconds after which a job still starting (no Sequin ID) counts as abandoned
+    # by a dead worker; must exceed a create_backfill call including retries
+    BACKFILL_START_TIMEOUT: float = 300.0
+
+    # Optional Redis for multi-worker deployments: shared Sequin response cache,
+    # health/lag snapshots, one leader per background poller and cross-worker
+    # invalidation over pub/sub. Empty disables it (every worker works alone).
+    # Cached Sequin responses are stored in Redis in plain text; responses that
+    # carry credentials (show_sensitive=true) are kept out of it, but treat the
+    # instance as holding connection metadata and restrict access to it.
+    REDIS_URL: str = ""
+    REDIS_KEY_PREFIX: str = "etl-manager:"
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    # Minimum lifetime (seconds) of a poller leadership lease; the leader renews it every run
+    REDIS_LEASE_TTL: float = 60.0
+
+    # Admission control for upstream calls, per upstream and per endpoint class:
+    # token-bucket rate (calls/s) and burst, and concurrent calls (0 = unlimited).
+    # A call may queue up to *_ADMISSION_MAX_WAIT seconds before it is rejected
+    # with 429 (rate) or 503 (concurrency) and a Retry-After header.
+    SEQUIN_ADMISSION_LIMITS: Dict[str, Dict[str, float]] = {
+        "upstream": {"rate": 50, "burst": 100, "concurrency": 32},
+        "read": {"rate": 40, "burst": 80, "concurrency": 24},
+        "write": {"rate": 10, "burst": 20, "concurrency": 8},
+        "test_connection_db": {"rate": 1, "burst": 3, "concurrency": 2},
+        "refresh_tables": {"rate": 0.5, "burst": 2, "concurrency": 2},
+    }
+    SEQUIN_ADMISSION_MAX_WAIT: float = 5.0
+    # Kafka: live lag samples and live connectivity checks from the API
+    KAFKA_ADMISSION_LIMITS: Dict[str, Dict[str, float]] = {
+        "upstream": {"rate": 2, "burst": 5, "concurrency": 2},
+    }
+    KAFKA_ADMISSION_MAX_WAIT: float = 5.0
+
+    # Background jobs for slow calls (?background=true / Prefer: respond-async):
+    # concurrent jobs, queued jobs before 503, per-job timeout and how long
+    # finished results are kept (seconds)
+    JOB_WORKERS: int = 4
+    JOB_MAX_QUEUED: int = 100
+    JOB_TIMEOUT: float = 600.0
+    JOB_RESULT_TTL: float = 3600.0
+
+    # Bulk Sequin database operations
+    SEQUIN_BULK_CONCURRENCY: int = 8
+    SEQUIN_BULK_MAX_CONCURRENCY: int = 32
+    SEQUIN_BULK_ITEM_TIMEOUT: float = 60.0
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -19,4 +169,8 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
 settings = Settings()
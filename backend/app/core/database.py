@@ -1,39 +1,65 @@
-from sqlmodel import SQLModel, create_engine, Session
+import logging
+import time
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
 from app.models.settings import SystemSettings
 from app.models.sequin_database import SequinDatabase
+from app.models.sequin_sink import SequinSink
+from app.models.mirror_state import MirrorSyncState
+from app.models.backfill_job import BackfillJob
+from app.models.sequin_instance import SequinInstance
+from app.models.table_catalog import CatalogTable, SchemaChangeEvent
+from app.core.metrics import DB_POOL_CHECKOUT_ERRORS, DB_POOL_CHECKOUT_WAIT
 
-# Use PostgreSQL connection string from settings with connection pool limits
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=True,
+logger = logging.getLogger(__name__)
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            DB_POOL_CHECKOUT_ERRORS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+# Async engine (asyncpg) so queries never block the event loop
+engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedAsyncQueuePool,
     pool_size=5,          # Max persistent connections
     max_overflow=10,      # Max additional connections when pool is full
     pool_pre_ping=True,   # Test connections before use
     pool_recycle=3600,    # Recycle connections after 1 hour
 )
 
-def create_db_and_tables():
-    print(f"Creating tables in database: {settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}")
+async def create_db_and_tables():
+    logger.info(f"Creating tables in database: {settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}")
     try:
-        SQLModel.metadata.create_all(engine)
-        print("Tables created successfully.")
+        async with engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        logger.info("Tables created successfully.")
     except Exception as e:
-        print(f"Error creating tables: {e}")
+        logger.error(f"Error creating tables: {e}")
         raise e
 
-def get_session():
+async def get_session():
     """
-    Dependency that provides a database session.
+    Dependency that provides an async database session.
     Session is automatically committed on success, rolled back on error, and closed.
+    Attributes are not expired on commit, so loaded objects stay usable without lazy I/O.
     """
-    session = Session(engine)
-    try:
-        yield session
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
-
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
@@ -1,50 +1,114 @@
-from alembic.config import Config
-from alembic import command
-from alembic.script import ScriptDirectory
-from alembic.runtime.migration import MigrationContext
-from sqlalchemy import text
+import ast
 import logging
+from pathlib import Path
+from typing import Optional, Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-def run_pending_migrations() -> None:
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+VERSIONS_DIR = BACKEND_DIR / "alembic" / "versions"
+# First revision; legacy databases created by create_all are stamped here and upgraded
+INITIAL_REVISION = "initial_rev"
+
+
+def script_heads(versions_dir: Path = VERSIONS_DIR) -> Set[str]:
+    """
+    Head revision(s) of the migration scripts, read with `ast` instead of
+    loading Alembic's ScriptDirectory (which imports alembic and every script).
+    """
+    revisions: Set[str] = set()
+    parents: Set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        values = {}
+        for node in ast.parse(path.read_text()).body:
+            if isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                        values[target.id] = ast.literal_eval(node.value) if node.value is not None else None
+        if "revision" not in values:
+            continue
+        revisions.add(values["revision"])
+        down = values.get("down_revision")
+        if isinstance(down, (tuple, list)):
+            parents.update(down)
+        elif down:
+            parents.add(down)
+    return revisions - parents
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def _alembic_config(connection: Connection):
+    from alembic.config import Config
+
+    alembic_cfg = Config(str(BACKEND_DIR / "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    # Alembic is sync; this runs inside AsyncConnection.run_sync on the app engine
+    alembic_cfg.attributes["connection"] = connection
+    return alembic_cfg
+
+
+def _run_pending_migrations(connection: Connection) -> str:
+    current_rev = current_revision(connection)
+    if current_rev is not None and {current_rev} == script_heads():
+        logger.info(f"Database schema at head ({current_rev}). Skipping migrations.")
+        return "current"
+
+    # Only now pay for importing Alembic
+    from alembic import command
+
+    alembic_cfg = _alembic_config(connection)
+    if current_rev is None:
+        tables = [name for name in inspect(connection).get_table_names() if name != "alembic_version"]
+        if tables:
+            # Legacy DB created by create_all: the later migrations only add what is missing
+            logger.warning("Existing tables found without migration history. Stamping initial revision.")
+            command.stamp(alembic_cfg, INITIAL_REVISION)
+
+    command.upgrade(alembic_cfg, "head")
+    return "upgraded"
+
+
+async def run_pending_migrations() -> str:
     """
-    Run pending migrations at startup.
-    Optimized: skips if already at head, reuses existing engine.
+    Bring the schema to the Alembic head at startup.
+    When the database is already at head this costs one query and no DDL.
+    Returns "current" or "upgraded".
     """
     from app.core.database import engine  # Reuse existing engine
-    
-    alembic_cfg = Config("alembic.ini")
-    
-    with engine.connect() as connection:
-        # Check current revision
-        context = MigrationContext.configure(connection)
-        current_rev = context.get_current_revision()
-        
-        # Get head revision
-        script = ScriptDirectory.from_config(alembic_cfg)
-        head_rev = script.get_current_head()
-        
-        if current_rev == head_rev:
-            logger.info("Database already at head. Skipping migrations.")
-            return
-        
-        if current_rev is None:
-            # Check if tables exist (legacy DB without alembic_version)
-            result = connection.execute(
-                text("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'public' AND table_name != 'alembic_version'")
-            ).scalar()
-            if result and result > 0:
-                # Legacy DB: stamp as head (tables exist)
-                logger.warning("Existing tables found without migration history. Stamping head.")
-                command.stamp(alembic_cfg, "head")
-                return
-            # Fresh DB: fall through to run upgrade
-    
-    # Run pending migrations (creates tables for fresh DB)
+
     try:
-        command.upgrade(alembic_cfg, "head")
+        async with engine.begin() as connection:
+            outcome = await connection.run_sync(_run_pending_migrations)
         logger.info("Database migrations completed successfully.")
+        return outcome
     except Exception as e:
         logger.error(f"Error running migrations: {e}")
         raise
+
+
+async def prepare_database() -> str:
+    """
+    Schema step of the app startup, per DB_STARTUP_MODE:
+    "migrate" (default) runs pending Alembic migrations, "create_all" runs
+    SQLModel's create_all, "skip" assumes the schema is managed elsewhere.
+    """
+    mode = settings.DB_STARTUP_MODE
+    if mode == "skip":
+        return "skipped"
+    if mode == "create_all":
+        from app.core.database import create_db_and_tables
+
+        await create_db_and_tables()
+        return "create_all"
+    return await run_pending_migrations()
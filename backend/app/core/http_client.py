@@ -0,0 +1,138 @@
+import httpx
+import logging
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# App-lifetime client shared by every SequinService instance.
+# Created in the FastAPI lifespan, lazily created on first use otherwise (e.g. in tests).
+_client: Optional[httpx.AsyncClient] = None
+# One pool per additional Sequin instance (see app.services.sequin_instances), so a
+# slow or saturated cluster cannot starve the connections of the others
+_instance_clients: Dict[str, httpx.AsyncClient] = {}
+_request_count: int = 0
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  # type: ignore
+        return True
+    except ImportError:
+        return False
+
+
+async def _count_request(request: httpx.Request) -> None:
+    global _request_count
+    _request_count += 1
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the pooled client used for Sequin API calls.
+    Keep-alive connections are reused across requests so the TCP+TLS handshake
+    is paid once per connection instead of once per call.
+    """
+    http2 = settings.SEQUIN_HTTP2
+    if http2 and not _http2_available():
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed. Falling back to HTTP/1.1.")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.SEQUIN_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SEQUIN_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.SEQUIN_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=settings.SEQUIN_HTTP_CONNECT_TIMEOUT,
+            read=settings.SEQUIN_HTTP_READ_TIMEOUT,
+            write=settings.SEQUIN_HTTP_WRITE_TIMEOUT,
+            pool=settings.SEQUIN_HTTP_POOL_TIMEOUT,
+        ),
+        event_hooks={"request": [_count_request]},
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Create the shared client. Called once from the app lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and all instance clients, releasing pooled connections."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    for instance_id in list(_instance_clients):
+        await close_instance_client(instance_id)
+
+
+async def close_instance_client(instance_id: str) -> None:
+    """Close the pool of one Sequin instance, e.g. after its URL changed or it was removed."""
+    client = _instance_clients.pop(instance_id, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def get_http_client(instance_id: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    Return the shared client, or the pool of an additional Sequin instance,
+    creating it if the lifespan has not run (or on first use of the instance).
+    """
+    global _client
+    if instance_id is not None:
+        client = _instance_clients.get(instance_id)
+        if client is None or client.is_closed:
+            client = _instance_clients[instance_id] = create_http_client()
+        return client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+def get_pool_stats(instance_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Snapshot of the shared connection pool (or an instance's pool), used to
+    size the pool limits. Reads httpcore's pool state, which is not part of
+    httpx's public API, so every lookup is defensive.
+    """
+    client = _client if instance_id is None else _instance_clients.get(instance_id)
+    stats: Dict[str, Any] = {
+        "initialized": client is not None and not client.is_closed,
+        "http2_enabled": False,
+        "max_connections": settings.SEQUIN_HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.SEQUIN_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": settings.SEQUIN_HTTP_KEEPALIVE_EXPIRY,
+        "requests_sent": _request_count,
+        "connections": 0,
+        "active_connections": 0,
+        "idle_connections": 0,
+        "http2_connections": 0,
+        "pending_requests": 0,
+    }
+    if not stats["initialized"]:
+        return stats
+
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if pool is None:
+        return stats
+
+    stats["http2_enabled"] = bool(getattr(pool, "_http2", False))
+    connections = list(getattr(pool, "connections", []))
+    stats["connections"] = len(connections)
+    for connection in connections:
+        if connection.is_idle():
+            stats["idle_connections"] += 1
+        else:
+            stats["active_connections"] += 1
+        if "HTTP/2" in repr(connection):
+            stats["http2_connections"] += 1
+    stats["pending_requests"] = sum(1 for request in getattr(pool, "_requests", []) if request.is_queued())
+    return stats
@@ -0,0 +1,164 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.core.config import settings
+
+REDACTED = "***"
+
+# Dict keys whose values are never logged
+_SECRET_KEYS = re.compile(r"passw(?:or)?d|secret|token|authorization|api[_-]?key|private[_-]?key|credential", re.I)
+# The same keys inside already formatted text (JSON, repr, query strings, headers)
+_SECRET_IN_TEXT = re.compile(
+    r"""(?P<key>["']?(?:password|passwd|secret|[a-z_]*token|authorization|api[_-]?key|private[_-]?key)["']?\s*[:=]\s*)"""
+    r"""(?P<value>"[^"]*"|'[^']*'|Bearer\s+\S+|[^\s,&}]+)""",
+    re.I,
+)
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def redact(value: Any) -> Any:
+    """Copy of `value` with secret-looking dict entries and key=value pairs masked."""
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if isinstance(k, str) and _SECRET_KEYS.search(k) and v is not None else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    if isinstance(value, str):
+        return _SECRET_IN_TEXT.sub(lambda m: m.group("key") + REDACTED, value)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    """Masks secrets in the message and in `extra` fields."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact(record.getMessage())
+        record.args = None
+        for key, value in list(vars(record).items()):
+            if key not in _RECORD_ATTRS:
+                setattr(record, key, REDACTED if _SECRET_KEYS.search(key) else redact(value))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        elif record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text line; `extra` fields (e.g. sampled payloads) follow the message as key=value."""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        extra = " ".join(f"{key}={value}" for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        return f"{line} {extra}" if extra else line
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or erroring."""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may be mutated later) but leave formatting to the log thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Any) -> None:
+    """
+    Debug-log a (possibly large) upstream payload.
+
+    Costs one level check unless DEBUG is enabled for `logger`. Then only a
+    LOG_DEBUG_SAMPLE_RATE fraction of calls log, with secrets redacted and the
+    payload truncated to LOG_PAYLOAD_MAX_CHARS.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= settings.LOG_DEBUG_SAMPLE_RATE:
+        return
+    # Serialized here so later mutation of `payload` by the caller cannot race the log thread
+    text = json.dumps(redact(payload), default=str)
+    size = len(text)
+    if size > settings.LOG_PAYLOAD_MAX_CHARS:
+        text = text[: settings.LOG_PAYLOAD_MAX_CHARS] + "..."
+    logger.debug(message, extra={"payload": text, "payload_chars": size, "sampled": settings.LOG_DEBUG_SAMPLE_RATE})
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Route all app logging through a bounded queue to a background thread that
+    redacts, formats (JSON or text) and writes to stdout. Request code only
+    pays for enqueuing a record. Levels come from LOG_LEVEL and LOG_LEVELS.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.addFilter(RedactingFilter())
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(TextFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.addHandler(DroppingQueueHandler(records))
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,171 @@
+import functools
+import time
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# Latency buckets (seconds) sized for a proxy: sub-ms cache hits up to slow upstream calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "etl_http_request_duration_seconds",
+    "Backend HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+SEQUIN_CALL_DURATION = Histogram(
+    "etl_sequin_call_duration_seconds",
+    "SequinService method latency (including cache hits and retries)",
+    ["operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+KAFKA_PROBE_DURATION = Histogram(
+    "etl_kafka_probe_duration_seconds",
+    "Kafka connectivity check latency per check",
+    ["check", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "etl_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the app DB pool",
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_ERRORS = Counter(
+    "etl_db_pool_checkout_errors_total",
+    "App DB pool checkouts that failed (e.g. pool timeout)",
+)
+ADMISSION_REJECTED = Counter(
+    "etl_admission_rejected_total",
+    "Upstream calls rejected by admission control",
+    ["upstream", "endpoint_class", "reason"],
+)
+STARTUP_PHASE_DURATION = Gauge(
+    "etl_startup_phase_seconds",
+    "Wall time of each phase of the last worker start",
+    ["phase"],
+)
+
+
+def track_sequin_call(operation: str) -> Callable[[F], F]:
+    """Decorator recording the latency and outcome of a SequinService method."""
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await fn(*args, **kwargs)
+                outcome = "success"
+                return result
+            finally:
+                SEQUIN_CALL_DURATION.labels(operation, outcome).observe(time.perf_counter() - started)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+class ProxyStateCollector(Collector):
+    """
+    Exposes state the services already count (cache, single-flight, breakers,
+    HTTP and DB pools) at scrape time, so the hot path pays nothing extra.
+    """
+
+    def describe(self) -> Iterable[Any]:
+        # Without this, registering calls collect() at import time, which would
+        # import app.core.database while it may still be initializing
+        return []
+
+    def collect(self) -> Iterable[Any]:
+        from app.core.database import engine
+        from app.core.http_client import get_pool_stats
+        from app.services.cache import sequin_cache
+        from app.services.resilience import resilience_stats
+        from app.services.singleflight import sequin_flights
+
+        cache = sequin_cache.stats()
+        requests = CounterMetricFamily("etl_sequin_cache_requests", "Sequin response cache lookups", labels=["result"])
+        requests.add_metric(["hit"], cache["hits"])
+        requests.add_metric(["stale"], cache["stale_hits"])
+        requests.add_metric(["miss"], cache["misses"])
+        yield requests
+        yield CounterMetricFamily("etl_sequin_cache_evictions", "Sequin response cache LRU evictions", value=cache["evictions"])
+        yield GaugeMetricFamily("etl_sequin_cache_entries", "Sequin response cache entries", value=cache["entries"])
+
+        flights = sequin_flights.stats()
+        singleflight = CounterMetricFamily("etl_sequin_singleflight_calls", "Sequin GETs by coalescing result", labels=["result"])
+        singleflight.add_metric(["executed"], flights["executed"])
+        singleflight.add_metric(["coalesced"], flights["coalesced"])
+        yield singleflight
+
+        resilience = resilience_stats()
+        yield CounterMetricFamily("etl_sequin_retries", "Sequin call retries", value=resilience["retries"])
+        breaker_open = GaugeMetricFamily("etl_sequin_breaker_open", "1 if the circuit breaker is not closed", labels=["instance"])
+        breaker_rejected = CounterMetricFamily("etl_sequin_breaker_rejected", "Calls rejected by an open breaker", labels=["instance"])
+        for name, breaker in resilience["circuit_breakers"].items():
+            breaker_open.add_metric([name], 0 if breaker["state"] == "closed" else 1)
+            breaker_rejected.add_metric([name], breaker["rejected_count"])
+        yield breaker_open
+        yield breaker_rejected
+
+        http_pool = get_pool_stats()
+        http_connections = GaugeMetricFamily("etl_sequin_http_connections", "Sequin HTTP pool connections", labels=["state"])
+        http_connections.add_metric(["active"], http_pool["active_connections"])
+        http_connections.add_metric(["idle"], http_pool["idle_connections"])
+        http_connections.add_metric(["pending"], http_pool["pending_requests"])
+        yield http_connections
+
+        pool = engine.pool
+        db_pool = GaugeMetricFamily("etl_db_pool_connections", "App DB pool connections", labels=["state"])
+        for state, value in (
+            ("size", pool.size()),
+            ("checked_out", pool.checkedout()),
+            ("checked_in", pool.checkedin()),
+            ("overflow", pool.overflow()),
+        ):
+            db_pool.add_metric([state], value)
+        yield db_pool
+
+
+REGISTRY.register(ProxyStateCollector())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording request latency per route template
+    (e.g. /api/v1/sequin/databases/{database_id}) to keep label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_path, str(status)).observe(
+                time.perf_counter() - started
+            )
@@ -0,0 +1,42 @@
+import logging
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# App-lifetime Redis client, only when REDIS_URL is set (see app.services.coordination)
+_client: Optional["Redis"] = None
+_missing_package = False
+
+
+def get_redis() -> Optional["Redis"]:
+    """Return the shared Redis client, or None when Redis is not configured or not installed."""
+    global _client, _missing_package
+    if _client is not None:
+        return _client
+    if not settings.REDIS_URL or _missing_package:
+        return None
+    try:
+        import redis.asyncio as redis  # type: ignore
+    except ImportError:
+        logger.warning("REDIS_URL is set but the 'redis' package is not installed. Running without Redis.")
+        _missing_package = True
+        return None
+    _client = redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=30,
+    )
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
@@ -0,0 +1,44 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+from app.core.metrics import STARTUP_PHASE_DURATION
+
+logger = logging.getLogger(__name__)
+
+# When the app's imports started: app.main imports this module first
+IMPORTS_STARTED = time.perf_counter()
+
+
+class StartupProfile:
+    """Wall time of each cold-start phase (imports, schema check, clients, jobs)."""
+
+    def __init__(self) -> None:
+        self.phases: List[Tuple[str, float]] = []
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, seconds))
+        STARTUP_PHASE_DURATION.labels(name).set(seconds)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "phases": [{"phase": name, "ms": round(seconds * 1000, 2)} for name, seconds in self.phases],
+            "total_ms": round(sum(seconds for _, seconds in self.phases) * 1000, 2),
+        }
+
+    def log(self) -> None:
+        report = self.report()
+        phases = ", ".join(f"{p['phase']}={p['ms']:.0f}ms" for p in report["phases"])
+        logger.info(f"Startup took {report['total_ms']:.0f}ms ({phases})")
+
+
+startup_profile = StartupProfile()
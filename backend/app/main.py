@@ -1,26 +1,86 @@
-from fastapi import FastAPI
+# First, so the "imports" startup phase covers everything below
+from app.core.startup_profile import IMPORTS_STARTED, startup_profile
+
+import time
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-# from app.core.database import create_db_and_tables
+from app.core.http_client import init_http_client, close_http_client
+from app.core.logging_config import setup_logging
+from app.core.metrics import PrometheusMiddleware, render_metrics
+from app.core.redis_client import close_redis
+from app.core.responses import FastJSONResponse
+from app.services.backfill_orchestrator import backfill_orchestrator
+from app.services.coordination import coordinator
+from app.services.health_monitor import health_monitor
+from app.services.kafka import close_admin_clients
+from app.services.job_queue import job_queue
+from app.services.kafka_lag import kafka_lag_collector
+from app.services.sequin_mirror import sequin_mirror
+from app.services.status_stream import status_broadcaster
+from app.services.wal_monitor import wal_monitor
 from app.api.v1.endpoints import settings as settings_router
 from app.api.v1.endpoints import sequin as sequin_router
 from app.api.v1.endpoints import sequin_databases
+from app.api.v1.endpoints import sequin_instances as sequin_instances_router
+from app.api.v1.endpoints import kafka as kafka_router
+from app.api.v1.endpoints import status as status_router
+from app.api.v1.endpoints import backfills as backfills_router
+from app.api.v1.endpoints import snowflake as snowflake_router
+from app.api.v1.endpoints import wal as wal_router
+from app.api.v1.endpoints import jobs as jobs_router
+
+if settings.LOG_CONFIGURE:
+    setup_logging()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Ensure tables exist - direct approach for reliability
-    from app.core.database import create_db_and_tables
-    create_db_and_tables()
+    # Schema check: one query and no DDL when already at the Alembic head
+    from app.core.db_migrations import prepare_database
+    with startup_profile.phase("database"):
+        await prepare_database()
+    # One pooled Sequin client for the lifetime of the worker
+    with startup_profile.phase("http_client"):
+        await init_http_client()
+    with startup_profile.phase("background_jobs"):
+        # No-op without REDIS_URL
+        await coordinator.start()
+        if settings.HEALTH_CHECK_ENABLED:
+            health_monitor.start()
+        if settings.MIRROR_SYNC_ENABLED:
+            sequin_mirror.start()
+        if settings.KAFKA_LAG_ENABLED:
+            kafka_lag_collector.start()
+        if settings.WAL_MONITOR_ENABLED:
+            wal_monitor.start()
+        if settings.BACKFILL_ORCHESTRATOR_ENABLED:
+            # Resumes jobs persisted by a previous run
+            backfill_orchestrator.start()
+    startup_profile.log()
     yield
+    backfill_orchestrator.shutdown()
+    await job_queue.shutdown()
+    await status_broadcaster.shutdown()
+    await wal_monitor.shutdown()
+    kafka_lag_collector.shutdown()
+    sequin_mirror.shutdown()
+    health_monitor.shutdown()
+    close_admin_clients()
+    await coordinator.shutdown()
+    await close_redis()
+    await close_http_client()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
+app.add_middleware(PrometheusMiddleware)
+
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
         CORSMiddleware,
@@ -32,8 +92,27 @@ if settings.BACKEND_CORS_ORIGINS:
 
 app.include_router(settings_router.router, prefix=f"{settings.API_V1_STR}/settings", tags=["settings"])
 app.include_router(sequin_router.router, prefix=f"{settings.API_V1_STR}/sequin", tags=["sequin"])
+app.include_router(sequin_instances_router.router, prefix=f"{settings.API_V1_STR}/sequin/instances", tags=["sequin-instances"])
 app.include_router(sequin_databases.router, prefix=f"{settings.API_V1_STR}/sequin/databases", tags=["sequin-databases"])
+app.include_router(kafka_router.router, prefix=f"{settings.API_V1_STR}/kafka", tags=["kafka"])
+app.include_router(backfills_router.router, prefix=f"{settings.API_V1_STR}/backfills", tags=["backfills"])
+app.include_router(snowflake_router.router, prefix=f"{settings.API_V1_STR}/snowflake", tags=["snowflake"])
+app.include_router(status_router.router, prefix=f"{settings.API_V1_STR}/status", tags=["status"])
+app.include_router(wal_router.router, prefix=f"{settings.API_V1_STR}/wal", tags=["wal"])
+app.include_router(jobs_router.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
 
 @app.get("/")
 def root():
     return {"message": "Welcome to ETL Manager Backend"}
+
+@app.get("/startup-profile", include_in_schema=False)
+def startup_profile_report():
+    """Time spent in each phase of this worker's cold start."""
+    return startup_profile.report()
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+startup_profile.record("imports", time.perf_counter() - IMPORTS_STARTED)
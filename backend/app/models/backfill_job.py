@@ -0,0 +1,22 @@
+from sqlmodel import SQLModel, Field, JSON, Column, DateTime
+from typing import Optional
+from datetime import datetime
+
+class BackfillJob(SQLModel, table=True):
+    """A backfill queued through the orchestrator and its last known progress."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    sink_id: str = Field(index=True, description="Sequin sink ID or name")
+    table: Optional[str] = Field(default=None, description="Table to backfill, for multi-table sinks")
+    source_database: str = Field(index=True, description="Source database the per-source limit applies to")
+    options: Optional[dict] = Field(default=None, sa_column=Column(JSON), description="Extra fields sent to Sequin")
+    state: str = Field(default="queued", index=True)
+    sequin_backfill_id: Optional[str] = None
+    attempts: int = 0
+    rows_initial_count: Optional[int] = None
+    rows_processed_count: int = 0
+    rows_ingested_count: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    started_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    finished_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
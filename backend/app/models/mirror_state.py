@@ -0,0 +1,9 @@
+from sqlmodel import SQLModel, Field, Column, DateTime
+from typing import Optional
+from datetime import datetime
+
+class MirrorSyncState(SQLModel, table=True):
+    """Last successful mirror sync per Sequin resource ("databases", "sinks")."""
+    resource: str = Field(primary_key=True)
+    synced_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    row_count: int = 0
@@ -1,5 +1,6 @@
-from sqlmodel import SQLModel, Field, JSON, Column
+from sqlmodel import SQLModel, Field, JSON, Column, DateTime
 from typing import Optional, List
+from datetime import datetime
 
 class SequinDatabase(SQLModel, table=True):
     id: str = Field(primary_key=True, description="Sequin ID (e.g. db_...)")
@@ -13,3 +14,8 @@ class SequinDatabase(SQLModel, table=True):
     use_local_tunnel: bool = False
     ipv6: bool = False
     replication_slots: Optional[List[dict]] = Field(default=None, sa_column=Column(JSON))
+
+    # Local mirror bookkeeping (see app.services.sequin_mirror)
+    raw: Optional[dict] = Field(default=None, sa_column=Column(JSON), description="Sequin payload as last synced")
+    content_hash: Optional[str] = Field(default=None, max_length=64)
+    synced_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
@@ -0,0 +1,17 @@
+from sqlmodel import SQLModel, Field, Column, DateTime
+from typing import Optional
+from datetime import datetime
+
+class SequinInstance(SQLModel, table=True):
+    """
+    An additional Sequin deployment managed by this backend. The Sequin set in
+    SystemSettings is always available as the "default" instance.
+    """
+    id: str = Field(primary_key=True, max_length=64, description="Short instance ID used in URLs, e.g. 'eu-1'")
+    name: Optional[str] = None
+    # Same names as the SystemSettings columns so either can configure a SequinService
+    sequin_url: str
+    sequin_token: Optional[str] = None
+    enabled: bool = Field(default=True, description="Disabled instances are skipped by fan-out reads")
+    created_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
@@ -0,0 +1,12 @@
+from sqlmodel import SQLModel, Field, JSON, Column, DateTime
+from typing import Optional
+from datetime import datetime
+
+class SequinSink(SQLModel, table=True):
+    id: str = Field(primary_key=True, description="Sequin sink ID")
+    name: Optional[str] = None
+    type: Optional[str] = None
+    status: Optional[str] = None
+    raw: Optional[dict] = Field(default=None, sa_column=Column(JSON), description="Sequin payload as last synced")
+    content_hash: Optional[str] = Field(default=None, max_length=64)
+    synced_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
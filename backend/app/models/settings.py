@@ -10,3 +10,6 @@ class SystemSettings(SQLModel, table=True):
     # Store health status for quick access
     sequin_reachable: bool = False
     kafka_reachable: bool = False
+
+    # Bumped on every update so workers can detect changes with a cheap query
+    version: int = Field(default=0)
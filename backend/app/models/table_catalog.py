@@ -0,0 +1,28 @@
+from sqlmodel import SQLModel, Field, JSON, Column, DateTime, UniqueConstraint
+from typing import Optional, List
+from datetime import datetime
+
+class CatalogTable(SQLModel, table=True):
+    """One table of a Sequin database as last reported by refresh_tables (see app.services.table_catalog)."""
+    __table_args__ = (UniqueConstraint("instance_id", "database_id", "schema_name", "table_name"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    instance_id: str = Field(default="default", max_length=64)
+    database_id: str = Field(index=True, description="Sequin database ID")
+    schema_name: str
+    table_name: str
+    oid: Optional[int] = None
+    columns: Optional[List[dict]] = Field(default=None, sa_column=Column(JSON))
+    fingerprint: str = Field(max_length=64, description="Hash of the table's column definitions")
+    updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+
+class SchemaChangeEvent(SQLModel, table=True):
+    """A table added, removed or altered between two catalog refreshes."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    instance_id: str = Field(default="default", max_length=64)
+    database_id: str = Field(index=True)
+    schema_name: str
+    table_name: str
+    change: str = Field(description="added, removed or altered")
+    details: Optional[dict] = Field(default=None, sa_column=Column(JSON), description="Column-level diff for altered tables")
+    detected_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), index=True))
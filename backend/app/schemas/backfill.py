@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+class BackfillJobCreate(BaseModel):
+    sink_id: str = Field(..., description="Sequin sink ID or name")
+    table: Optional[str] = Field(None, description="Table to backfill, for multi-table sinks")
+    source_database: Optional[str] = Field(
+        None, description="Source database for the per-source limit; looked up from the sink when omitted"
+    )
+    options: Dict[str, Any] = Field(default_factory=dict, description="Extra fields sent to Sequin")
+
+class BackfillJobEnqueue(BaseModel):
+    items: List[BackfillJobCreate] = Field(..., min_length=1, max_length=1000)
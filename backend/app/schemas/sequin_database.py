@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Optional, List
 
 # Shared properties
 class SequinDatabaseBase(BaseModel):
@@ -36,3 +36,36 @@ class SequinDatabaseInDBBase(SequinDatabaseBase):
 # Properties to return to client
 class SequinDatabaseResponse(SequinDatabaseInDBBase):
     replication_slots: Optional[List[dict]] = None
+
+# Bulk operations; each item is one Sequin call, so a request is capped
+BULK_MAX_ITEMS = 1000
+
+class SequinDatabaseBulkCreate(BaseModel):
+    items: List[SequinDatabaseCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+    validate_connection: bool = Field(default=False, description="Run test_connection_db for each item before creating it")
+    concurrency: Optional[int] = Field(default=None, ge=1, description="Max concurrent Sequin calls (defaults to server setting)")
+
+class SequinDatabaseBulkUpdateItem(SequinDatabaseUpdate):
+    id_or_name: str = Field(..., description="Database ID or name to update")
+
+class SequinDatabaseBulkUpdate(BaseModel):
+    items: List[SequinDatabaseBulkUpdateItem] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+    concurrency: Optional[int] = Field(default=None, ge=1)
+
+class SequinDatabaseBulkDelete(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS, description="Database IDs or names to delete")
+    concurrency: Optional[int] = Field(default=None, ge=1)
+
+class BulkItemResult(BaseModel):
+    index: int
+    key: Optional[str] = Field(default=None, description="Database name or ID of the item")
+    ok: bool
+    status_code: int
+    stage: Optional[str] = Field(default=None, description="Step that failed (validate/create/update/delete)")
+    data: Optional[Any] = None
+    error: Optional[Any] = None
+
+class BulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
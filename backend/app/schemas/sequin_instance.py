@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+class SequinInstanceCreate(BaseModel):
+    id: str = Field(..., pattern=r"^[a-z0-9][a-z0-9_-]{0,63}$", description="Short instance ID used in URLs, e.g. 'eu-1'")
+    name: Optional[str] = None
+    sequin_url: str = Field(..., description="Base URL of the Sequin API")
+    sequin_token: Optional[str] = Field(None, description="Sequin API token")
+    enabled: bool = True
+
+class SequinInstanceUpdate(BaseModel):
+    name: Optional[str] = None
+    sequin_url: Optional[str] = None
+    sequin_token: Optional[str] = None
+    enabled: Optional[bool] = None
+
+class SequinInstanceResponse(BaseModel):
+    id: str
+    name: Optional[str] = None
+    sequin_url: str
+    # The token itself is never returned
+    has_token: bool
+    enabled: bool
+    health: Optional[Dict[str, Any]] = None
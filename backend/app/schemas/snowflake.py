@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+
+class ColumnDefinition(BaseModel):
+    name: str
+    type: str = Field(..., description="Postgres type, e.g. 'bigint', 'numeric(12,2)', 'timestamp without time zone'")
+    primary_key: bool = False
+    nullable: bool = Field(True, description="Source nullability; informational, only key columns are NOT NULL in Snowflake")
+
+class SnowflakePipelinePreview(BaseModel):
+    table: str = Field(..., description="Source table name")
+    schema_name: str = Field("public", description="Source schema")
+    # Column source: explicit columns, or introspected from the Sequin database's Postgres
+    columns: Optional[List[ColumnDefinition]] = None
+    database_id: Optional[str] = Field(None, description="Sequin database ID or name to introspect the table from")
+    password: Optional[str] = Field(None, description="Source password when Sequin does not return it")
+
+    landing_database: str = "SNOWFLAKE_LANDING_DB"
+    landing_schema: str = "DEV"
+    target_database: str = "DEV_SNOWFLAKE_DB"
+    target_schema: str = "BRONZE"
+    target_table: Optional[str] = Field(None, description="Defaults to the source table name")
+    warehouse: str = "WH_TASKS_XS"
+    schedule: str = "5 MINUTE"
+
+    @model_validator(mode="after")
+    def check_column_source(self) -> "SnowflakePipelinePreview":
+        if not self.columns and not self.database_id:
+            raise ValueError("Provide either columns or database_id")
+        return self
+
+class SnowflakePipelineResponse(BaseModel):
+    table: str
+    columns: List[ColumnDefinition]
+    statements: List[str]
+    sql: str
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings as app_settings
+from app.core.metrics import ADMISSION_REJECTED
+
+logger = logging.getLogger(__name__)
+
+# Endpoint classes of SequinService calls
+READ = "read"
+WRITE = "write"
+TEST_CONNECTION_DB = "test_connection_db"
+REFRESH_TABLES = "refresh_tables"
+# Limits key shared by every call to one upstream, whatever its class
+UPSTREAM = "upstream"
+
+RATE_LIMITED = "rate_limited"
+SATURATED = "saturated"
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised instead of calling upstream when a call could not be admitted within
+    its queueing deadline: its rate limit is exhausted (429) or its concurrency
+    slots stayed full (503).
+    """
+
+    def __init__(self, gate: str, reason: str, retry_after: float):
+        super().__init__(f"{gate} is {'rate limited' if reason == RATE_LIMITED else 'at its concurrency limit'}")
+        self.gate = gate
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def status_code(self) -> int:
+        return 429 if self.reason == RATE_LIMITED else 503
+
+    def to_http_exception(self) -> HTTPException:
+        return HTTPException(
+            status_code=self.status_code,
+            detail=f"Too many upstream calls: {self}; retry in {self.retry_after:.1f}s",
+            headers={"Retry-After": str(max(1, math.ceil(self.retry_after)))},
+        )
+
+
+class TokenBucket:
+    """
+    Tokens refill at `rate` per second up to `burst`. A caller that finds the
+    bucket empty reserves the next token that will become available, so queued
+    callers are served in arrival order and a burst is smoothed out to `rate`.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def reserve(self, max_wait: float) -> Tuple[bool, float]:
+        """
+        (True, wait) after reserving a token usable in `wait` seconds, or
+        (False, wait) without reserving anything when `wait` exceeds `max_wait`.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        if wait > max_wait:
+            return False, wait
+        self._tokens -= 1
+        return True, wait
+
+    def refund(self) -> None:
+        self._tokens = min(self.burst, self._tokens + 1)
+
+
+class AdmissionGate:
+    """A token bucket and a concurrency limit for one upstream or (upstream, endpoint class)."""
+
+    def __init__(self, name: str, rate: float, burst: int, concurrency: int):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.concurrency = concurrency
+        self._slots = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+        self.admitted = 0
+        self.rejected = {RATE_LIMITED: 0, SATURATED: 0}
+        self.waiting = 0
+        self.in_flight = 0
+
+    def reserve(self, max_wait: float) -> Tuple[bool, float]:
+        if self.bucket is None:
+            return True, 0.0
+        return self.bucket.reserve(max_wait)
+
+    def refund(self) -> None:
+        if self.bucket is not None:
+            self.bucket.refund()
+
+    async def acquire(self, timeout: float, retry_after: float) -> None:
+        if self._slots is not None:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                raise AdmissionRejected(self.name, SATURATED, retry_after) from None
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.bucket.rate if self.bucket else None,
+            "burst": self.bucket.burst if self.bucket else None,
+            "concurrency": self.concurrency or None,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+        }
+
+
+class AdmissionController:
+    """
+    Admission control in front of an upstream service.
+
+    Every call passes two gates: one for its endpoint class on that upstream
+    (e.g. Sequin reads) and one shared by all calls to the upstream. `limits`
+    maps UPSTREAM and each class name to {"rate", "burst", "concurrency"}; a
+    rate or concurrency of 0 (or a class without limits) leaves it unlimited.
+
+    A call queues for its tokens and slots for at most `max_wait` seconds in
+    total. If its token would only come later it is rejected up front with 429;
+    if no slot frees up in time it is rejected with 503. Both carry a
+    Retry-After hint (AdmissionRejected.to_http_exception).
+    """
+
+    def __init__(self, name: str, limits: Dict[str, Dict[str, float]], max_wait: float):
+        self.name = name
+        self.limits = limits
+        self.max_wait = max_wait
+        self._gates: Dict[Tuple[str, str], AdmissionGate] = {}
+
+    def _gate(self, upstream: str, key: str) -> Optional[AdmissionGate]:
+        gate = self._gates.get((upstream, key))
+        if gate is None:
+            limits = self.limits.get(key)
+            if not limits:
+                return None
+            gate = AdmissionGate(
+                f"{self.name} {key} ({upstream})" if key != UPSTREAM else f"{self.name} ({upstream})",
+                rate=float(limits.get("rate", 0)),
+                burst=int(limits.get("burst", 1)),
+                concurrency=int(limits.get("concurrency", 0)),
+            )
+            self._gates[(upstream, key)] = gate
+        return gate
+
+    @asynccontextmanager
+    async def admit(self, upstream: str, endpoint_class: str) -> AsyncIterator[None]:
+        gates = [gate for gate in (self._gate(upstream, endpoint_class), self._gate(upstream, UPSTREAM)) if gate]
+        deadline = time.monotonic() + self.max_wait
+
+        # Reserve on every gate before waiting, and give tokens back if a later gate refuses
+        reserved: List[AdmissionGate] = []
+        delay = 0.0
+        for gate in gates:
+            ok, wait = gate.reserve(self.max_wait)
+            if not ok:
+                for earlier in reserved:
+                    earlier.refund()
+                self._rejected(gate, endpoint_class, RATE_LIMITED)
+                raise AdmissionRejected(gate.name, RATE_LIMITED, wait)
+            reserved.append(gate)
+            delay = max(delay, wait)
+        if delay:
+            await asyncio.sleep(delay)
+
+        acquired: List[AdmissionGate] = []
+        try:
+            for gate in gates:
+                try:
+                    await gate.acquire(deadline - time.monotonic(), retry_after=self.max_wait)
+                except AdmissionRejected:
+                    self._rejected(gate, endpoint_class, SATURATED)
+                    raise
+                acquired.append(gate)
+            yield
+        finally:
+            for gate in acquired:
+                gate.release()
+
+    def _rejected(self, gate: AdmissionGate, endpoint_class: str, reason: str) -> None:
+        gate.rejected[reason] += 1
+        ADMISSION_REJECTED.labels(self.name, endpoint_class, reason).inc()
+        logger.warning(f"Rejected {endpoint_class} call: {gate.name} {reason}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_wait": self.max_wait,
+            "gates": {
+                f"{upstream} {key}": gate.stats() for (upstream, key), gate in self._gates.items()
+            },
+        }
+
+
+sequin_admission = AdmissionController(
+    "sequin",
+    limits=app_settings.SEQUIN_ADMISSION_LIMITS,
+    max_wait=app_settings.SEQUIN_ADMISSION_MAX_WAIT,
+)
+kafka_admission = AdmissionController(
+    "kafka",
+    limits=app_settings.KAFKA_ADMISSION_LIMITS,
+    max_wait=app_settings.KAFKA_ADMISSION_MAX_WAIT,
+)
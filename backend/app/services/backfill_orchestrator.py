@@ -0,0 +1,391 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.models.backfill_job import BackfillJob
+from app.models.sequin_sink import SequinSink
+from app.services.coordination import coordinator
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+    from app.services.sequin import SequinService
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+STARTING = "starting"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATES = (STARTING, RUNNING)
+FINAL_STATES = (COMPLETED, FAILED, CANCELLED)
+
+# Sequin backfill states that end a job; anything else is still running
+_SEQUIN_FINAL_STATES = {
+    "completed": COMPLETED,
+    "cancelled": CANCELLED,
+    "canceled": CANCELLED,
+    "failed": FAILED,
+}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone=True columns back without an offset
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def job_progress(job: BackfillJob) -> Dict[str, Any]:
+    """A job with derived progress (percent done) and throughput (rows/s)."""
+    data = job.model_dump()
+    percent = None
+    if job.rows_initial_count:
+        percent = round(min(job.rows_processed_count / job.rows_initial_count, 1.0) * 100, 1)
+    throughput = None
+    if job.started_at:
+        end = _as_utc(job.finished_at) if job.finished_at else _utcnow()
+        elapsed = (end - _as_utc(job.started_at)).total_seconds()
+        if elapsed > 0:
+            throughput = round(job.rows_processed_count / elapsed, 2)
+    return {**data, "percent_complete": percent, "rows_per_second": throughput}
+
+
+def _source_of(sink: Optional[SequinSink]) -> Optional[str]:
+    # Sequin sinks name their source database either as a string or an object
+    if sink is None or not sink.raw:
+        return None
+    database = sink.raw.get("database")
+    if isinstance(database, dict):
+        return database.get("name") or database.get("id")
+    return database
+
+
+class BackfillOrchestrator:
+    """
+    Queues Sequin backfills across many sinks and tables and runs them under
+    limits: at most `max_concurrent` at once overall and `max_per_source` per
+    source database, so re-seeding many tables does not overload a source.
+
+    Jobs live in the BackfillJob table. Every tick polls the progress of
+    running backfills, then starts queued ones in FIFO order wherever a slot
+    is free. Because all state is in the app DB, a restarted worker simply
+    picks up where the previous one stopped.
+
+    Workers claim a queued job with a conditional UPDATE, so two workers (or a
+    manual tick) never submit the same job twice. A job still "starting"
+    without a Sequin ID `start_timeout` seconds after its claim was abandoned
+    by a dead worker: it is queued again, or failed after `max_attempts`.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_per_source: int,
+        poll_interval: float,
+        max_attempts: int,
+        start_timeout: float,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_source = max_per_source
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.start_timeout = start_timeout
+        self._lock = asyncio.Lock()
+        self._scheduler: Optional["AsyncIOScheduler"] = None
+
+    async def enqueue(self, session: AsyncSession, items: List[Dict[str, Any]]) -> List[BackfillJob]:
+        """
+        Queue one job per item ({sink_id, table?, source_database?, options?}).
+        Without `source_database` the sink's source is looked up in the local
+        mirror; unknown sinks are limited on their own.
+        """
+        now = _utcnow()
+        jobs = []
+        for item in items:
+            source = item.get("source_database")
+            if not source:
+                sink = (
+                    await session.exec(
+                        select(SequinSink).where(
+                            (SequinSink.id == item["sink_id"]) | (SequinSink.name == item["sink_id"])
+                        )
+                    )
+                ).first()
+                source = _source_of(sink) or f"sink:{item['sink_id']}"
+            job = BackfillJob(
+                sink_id=item["sink_id"],
+                table=item.get("table"),
+                source_database=source,
+                options=item.get("options") or None,
+                created_at=now,
+                updated_at=now,
+            )
+            session.add(job)
+            jobs.append(job)
+        await session.commit()
+        await self._wake_all()
+        return jobs
+
+    async def cancel(self, session: AsyncSession, job: BackfillJob, service: Optional["SequinService"]) -> BackfillJob:
+        """Cancel a queued job, or a running one in Sequin as well."""
+        if job.state in FINAL_STATES:
+            raise HTTPException(status_code=409, detail=f"Backfill job is already {job.state}")
+        if job.sequin_backfill_id and service is not None:
+            await service.update_backfill(job.sink_id, job.sequin_backfill_id, {"state": "cancelled"})
+        now = _utcnow()
+        # A job being started is cancelled in Sequin by the tick that started it
+        if not await self._transition(
+            session, job, (QUEUED, *ACTIVE_STATES), state=CANCELLED, finished_at=now, updated_at=now,
+        ):
+            await session.refresh(job)
+            raise HTTPException(status_code=409, detail=f"Backfill job is already {job.state}")
+        await session.refresh(job)
+        await self._wake_all()
+        return job
+
+    async def summary(self, session: AsyncSession) -> Dict[str, Any]:
+        """Job counts per state and aggregate progress of running jobs."""
+        states = (
+            await session.exec(select(BackfillJob.state, func.count()).group_by(BackfillJob.state))
+        ).all()
+        rows_processed = (await session.exec(select(func.sum(BackfillJob.rows_processed_count)))).one()
+        running = (
+            await session.exec(select(BackfillJob).where(BackfillJob.state.in_(ACTIVE_STATES)))
+        ).all()
+        progress = [job_progress(job) for job in running]
+        return {
+            "states": dict(states),
+            "running_per_source": dict(Counter(job.source_database for job in running)),
+            "rows_processed": rows_processed or 0,
+            "rows_per_second": round(sum(p["rows_per_second"] or 0 for p in progress), 2),
+            "limits": {"max_concurrent": self.max_concurrent, "max_per_source": self.max_per_source},
+        }
+
+    async def tick(self, session: AsyncSession, service: "SequinService") -> Dict[str, int]:
+        """Refresh running jobs, then start queued ones within the limits."""
+        async with self._lock:
+            finished = await self._refresh_running(session, service)
+            started = await self._dispatch(session, service)
+        return {"finished": finished, "started": started}
+
+    async def _refresh_running(self, session: AsyncSession, service: "SequinService") -> int:
+        jobs = (
+            await session.exec(select(BackfillJob).where(BackfillJob.state.in_(ACTIVE_STATES)))
+        ).all()
+        now = _utcnow()
+        cutoff = now - timedelta(seconds=self.start_timeout)
+        for job in jobs:
+            # Jobs without a Sequin ID are being started; only stale claims are orphans
+            if job.sequin_backfill_id or (job.updated_at and _as_utc(job.updated_at) > cutoff):
+                continue
+            retry = job.attempts < self.max_attempts
+            values: Dict[str, Any] = {"state": QUEUED if retry else FAILED, "updated_at": now}
+            if not retry:
+                values.update(error=f"Start interrupted {job.attempts} times", finished_at=now)
+            # Conditional, so a job another worker just moved on is left alone
+            result = await session.exec(
+                update(BackfillJob)
+                .where(BackfillJob.id == job.id, BackfillJob.state == job.state, BackfillJob.updated_at == job.updated_at)
+                .values(**values)
+            )
+            if result.rowcount:
+                logger.warning(f"Backfill job {job.id} was abandoned while starting; {values['state']}")
+        await session.commit()
+
+        tracked = [job for job in jobs if job.sequin_backfill_id]
+        # Progress is fetched concurrently; the session is only used afterwards
+        responses = await asyncio.gather(
+            *(service.get_backfill(job.sink_id, job.sequin_backfill_id) for job in tracked),
+            return_exceptions=True,
+        )
+        finished = 0
+        for job, response in zip(tracked, responses):
+            if isinstance(response, BaseException):
+                logger.warning(f"Could not refresh backfill job {job.id}: {response!r}")
+                continue
+            data = response.get("data", response) if isinstance(response, dict) else {}
+            state = _SEQUIN_FINAL_STATES.get(str(data.get("state", "")).lower(), RUNNING)
+            values: Dict[str, Any] = {
+                "rows_initial_count": data.get("rows_initial_count", job.rows_initial_count),
+                "rows_processed_count": data.get("rows_processed_count") or job.rows_processed_count,
+                "rows_ingested_count": data.get("rows_ingested_count") or job.rows_ingested_count,
+                "state": state,
+                "updated_at": now,
+            }
+            if state in FINAL_STATES:
+                values["finished_at"] = now
+            # Conditional, so a cancel that landed while Sequin was being asked is kept
+            if await self._transition(session, job, ACTIVE_STATES, **values) and state in FINAL_STATES:
+                finished += 1
+        return finished
+
+    async def _transition(self, session: AsyncSession, job: BackfillJob, states: Any, **values: Any) -> bool:
+        """Write `values` only if the job is still in one of `states`; False if it moved on meanwhile."""
+        result = await session.exec(
+            update(BackfillJob).where(BackfillJob.id == job.id, BackfillJob.state.in_(states)).values(**values)
+        )
+        await session.commit()
+        return bool(result.rowcount)
+
+    async def _dispatch(self, session: AsyncSession, service: "SequinService") -> int:
+        running = (
+            await session.exec(select(BackfillJob.source_database).where(BackfillJob.state.in_(ACTIVE_STATES)))
+        ).all()
+        per_source = Counter(running)
+        free = self.max_concurrent - len(running)
+        if free <= 0:
+            return 0
+
+        queued = (
+            await session.exec(
+                select(BackfillJob).where(BackfillJob.state == QUEUED).order_by(BackfillJob.id)
+            )
+        ).all()
+        started = 0
+        for job in queued:
+            if free <= 0:
+                break
+            if per_source[job.source_database] >= self.max_per_source:
+                continue
+            # Claim atomically and persist it first, so no other worker starts it
+            # and a crash mid-call is visible on restart
+            claim = await session.exec(
+                update(BackfillJob)
+                .where(BackfillJob.id == job.id, BackfillJob.state == QUEUED)
+                .values(state=STARTING, attempts=BackfillJob.attempts + 1, updated_at=_utcnow())
+            )
+            await session.commit()
+            if not claim.rowcount:
+                continue
+            await session.refresh(job)
+
+            payload = dict(job.options or {})
+            if job.table:
+                payload["table"] = job.table
+            try:
+                response = await service.create_backfill(job.sink_id, payload)
+            except HTTPException as e:
+                # Sequin rejected the request (4xx) or is unavailable (5xx): retry the latter
+                retry = e.status_code >= 500 and job.attempts < self.max_attempts
+                now = _utcnow()
+                await self._transition(
+                    session, job, (STARTING,),
+                    state=QUEUED if retry else FAILED,
+                    error=str(e.detail),
+                    updated_at=now,
+                    finished_at=None if retry else now,
+                )
+                continue
+
+            data = response.get("data", response) if isinstance(response, dict) else {}
+            now = _utcnow()
+            if not data.get("id"):
+                # Without an ID the backfill cannot be tracked; resubmitting could duplicate it
+                await self._transition(
+                    session, job, (STARTING,),
+                    state=FAILED, error="Sequin returned no backfill ID", updated_at=now, finished_at=now,
+                )
+                continue
+            started_job = await self._transition(
+                session, job, (STARTING,),
+                sequin_backfill_id=data["id"],
+                rows_initial_count=data.get("rows_initial_count"),
+                state=RUNNING,
+                error=None,
+                started_at=now,
+                updated_at=now,
+            )
+            if not started_job:
+                # Cancelled while Sequin was creating it: stop the backfill that now exists
+                await self._cancel_created(session, job, service, data["id"])
+                continue
+            per_source[job.source_database] += 1
+            free -= 1
+            started += 1
+        return started
+
+    async def _cancel_created(
+        self, session: AsyncSession, job: BackfillJob, service: "SequinService", backfill_id: str,
+    ) -> None:
+        await self._transition(session, job, (CANCELLED,), sequin_backfill_id=backfill_id)
+        try:
+            await service.update_backfill(job.sink_id, backfill_id, {"state": "cancelled"})
+        except HTTPException as e:
+            logger.warning(f"Could not cancel backfill {backfill_id} of cancelled job {job.id}: {e.detail}")
+        else:
+            logger.info(f"Cancelled backfill {backfill_id}: job {job.id} was cancelled while starting")
+
+    def wake(self) -> None:
+        """Run the next tick now instead of at the next interval."""
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.modify_job("backfill-orchestrator", next_run_time=_utcnow())
+
+    async def _wake_all(self) -> None:
+        # With Redis the ticking worker may be another one
+        self.wake()
+        await coordinator.publish("backfill_wake")
+
+    def start(self) -> None:
+        """Start periodic ticks. Must be called from a running event loop."""
+        if self._scheduler is not None:
+            return
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+        from apscheduler.triggers.interval import IntervalTrigger  # type: ignore
+
+        self._scheduler = AsyncIOScheduler()
+        self._scheduler.add_job(
+            self._scheduled_tick,
+            trigger=IntervalTrigger(seconds=self.poll_interval),
+            id="backfill-orchestrator",
+            next_run_time=_utcnow(),
+            max_instances=1,
+            coalesce=True,
+        )
+        self._scheduler.start()
+        logger.info(
+            f"Backfill orchestrator started (max_concurrent={self.max_concurrent}, "
+            f"max_per_source={self.max_per_source})"
+        )
+
+    def shutdown(self) -> None:
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+        self._scheduler = None
+
+    async def _scheduled_tick(self) -> None:
+        from app.core.database import engine
+        from app.services.sequin import SequinService
+
+        try:
+            # With Redis, only one worker dispatches, so limits hold across workers
+            if not await coordinator.hold_lease("backfill-orchestrator", max(self.poll_interval * 3, app_settings.REDIS_LEASE_TTL)):
+                return
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                service = await SequinService.create(session)
+                await self.tick(session, service)
+        except Exception as e:
+            logger.warning(f"Backfill orchestrator tick failed: {e!r}")
+
+
+backfill_orchestrator = BackfillOrchestrator(
+    max_concurrent=app_settings.BACKFILL_MAX_CONCURRENT,
+    max_per_source=app_settings.BACKFILL_MAX_PER_SOURCE,
+    poll_interval=app_settings.BACKFILL_POLL_INTERVAL,
+    max_attempts=app_settings.BACKFILL_MAX_ATTEMPTS,
+    start_timeout=app_settings.BACKFILL_START_TIMEOUT,
+)
+
+coordinator.on("backfill_wake", lambda _: backfill_orchestrator.wake())
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, TypeVar
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StageFailed(Exception):
+    """Raised by a bulk operation to report which of its steps failed."""
+
+    def __init__(self, stage: str, cause: Exception):
+        super().__init__(str(cause))
+        self.stage = stage
+        self.cause = cause
+
+
+async def run_bounded(
+    items: Sequence[T],
+    operation: Callable[[T], Awaitable[Any]],
+    concurrency: int,
+    timeout: float,
+    stage: str,
+    key: Callable[[T], Any] = lambda item: None,
+) -> List[Dict[str, Any]]:
+    """
+    Run `operation` for every item with at most `concurrency` in flight.
+
+    Each item gets its own `timeout`, so one slow upstream cannot stall the
+    batch, and failures are captured per item instead of aborting the rest.
+    Results are returned in input order.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    def failure(index: int, item: T, failed_stage: str, error: Exception) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"index": index, "key": key(item), "ok": False, "stage": failed_stage}
+        if isinstance(error, HTTPException):
+            result.update(status_code=error.status_code, error=error.detail)
+        elif isinstance(error, asyncio.TimeoutError):
+            result.update(status_code=504, error=f"Timed out after {timeout}s")
+        else:
+            logger.error(f"Bulk {failed_stage} item {index} failed: {error!r}")
+            result.update(status_code=500, error=str(error))
+        return result
+
+    async def run_one(index: int, item: T) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                data = await asyncio.wait_for(operation(item), timeout=timeout)
+            except StageFailed as e:
+                return failure(index, item, e.stage, e.cause)
+            except Exception as e:
+                return failure(index, item, stage, e)
+            return {"index": index, "key": key(item), "ok": True, "status_code": 200, "data": data}
+
+    return list(await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items))))
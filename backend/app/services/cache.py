@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+
+
+class ResponseCache:
+    """
+    In-process read-through cache for upstream GET responses.
+
+    - Entries younger than `ttl` are served directly.
+    - Entries older than `ttl` but younger than `ttl + stale_ttl` are served
+      immediately while a single background task refreshes them
+      (stale-while-revalidate).
+    - At most `max_entries` keys are kept; the least recently used is evicted.
+
+    Writes call `invalidate`/`invalidate_prefix`, which also bump a generation
+    counter so a load that started before the write cannot repopulate the
+    cache with pre-write data.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        # Strong references: the event loop only keeps weak ones to running tasks
+        self._refresh_tasks: Set["asyncio.Task[None]"] = set()
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key`, calling `loader` on a miss."""
+        if self.ttl <= 0:
+            return await loader()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._schedule_refresh(key, loader)
+                return entry.value
+
+        self.misses += 1
+        return await self._load(key, loader)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        value = await loader()
+        if generation == self._generation:
+            self.set(key, value)
+        return value
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh() -> None:
+            try:
+                await self._load(key, loader)
+            except Exception as e:
+                # Keep serving the stale value until it expires; the next miss surfaces the error
+                logger.warning(f"Background refresh failed for {key}: {e!r}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for `key` regardless of age, without counting a hit."""
+        return self._entries.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = CacheEntry(value=value, stored_at=time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        self._generation += 1
+        self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        self._generation += 1
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SharedResponseCache:
+    """
+    Second cache level in Redis, shared by every worker (only when REDIS_URL is
+    set). A local miss checks here before calling Sequin, so N workers cost one
+    upstream call per `ttl` instead of N. Values are opaque bytes; callers
+    encode them. Redis errors count as misses.
+    """
+
+    def __init__(self, prefix: str, ttl: float):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        redis = get_redis()
+        if redis is None or self.ttl <= 0:
+            return None
+        try:
+            value = await redis.get(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared cache read failed for {key}: {e!r}")
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        redis = get_redis()
+        if redis is None or self.ttl <= 0:
+            return
+        try:
+            await redis.set(self.prefix + key, value, px=int(self.ttl * 1000))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared cache write failed for {key}: {e!r}")
+
+    async def invalidate_prefix(self, prefix: str) -> None:
+        redis = get_redis()
+        if redis is None:
+            return
+        # Keys are URLs; escape glob characters such as '?' and '['
+        pattern = re.sub(r"([*?\[\]\\])", r"\\\1", self.prefix + prefix) + "*"
+        try:
+            keys = [key async for key in redis.scan_iter(match=pattern, count=500)]
+            if keys:
+                await redis.delete(*keys)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared cache invalidation failed for {prefix}: {e!r}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": get_redis() is not None,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+# Shared by all SequinService instances in this worker
+sequin_cache = ResponseCache(
+    ttl=settings.SEQUIN_CACHE_TTL,
+    stale_ttl=settings.SEQUIN_CACHE_STALE_TTL,
+    max_entries=settings.SEQUIN_CACHE_MAX_ENTRIES,
+)
+
+# Shared by all workers (Redis); only holds fresh entries, stale-while-revalidate stays local
+shared_sequin_cache = SharedResponseCache(
+    prefix=f"{settings.REDIS_KEY_PREFIX}cache:",
+    ttl=settings.SEQUIN_CACHE_TTL,
+)
@@ -0,0 +1,221 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+from app.core.config import settings as app_settings
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+# Renew the lease if we hold it, otherwise take it only if nobody does
+_ACQUIRE_OR_RENEW = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+if redis.call('set', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+_RELEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class Coordinator:
+    """
+    Cross-worker coordination over Redis, used when several uvicorn workers or
+    pods run the backend. Without REDIS_URL every method is a no-op that lets
+    the worker act alone, so single-process deployments behave as before.
+
+    - Leases: `hold_lease(name, ttl)` elects one worker per background poller.
+      The holder renews the lease every run; if it dies the lease expires and
+      another worker takes over.
+    - Snapshots: the leader shares its results (`set_json`) and the other
+      workers adopt them (`get_json`) instead of polling themselves.
+    - Events: `publish` fans an event out to every other worker over pub/sub;
+      modules register handlers with `on(event_type, handler)`.
+
+    Redis errors are logged and never fail a request: a lease that cannot be
+    checked is treated as held, so pollers keep running on every worker.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.channel = f"{prefix}events"
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._leases: Set[str] = set()
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return get_redis() is not None
+
+    def key(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    async def hold_lease(self, name: str, ttl: float) -> bool:
+        """True if this worker should run poller `name` now (it holds or just took the lease)."""
+        redis = get_redis()
+        if redis is None:
+            return True
+        try:
+            held = await redis.eval(_ACQUIRE_OR_RENEW, 1, self.key(f"lease:{name}"), self.worker_id, int(ttl * 1000))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not check lease {name}: {e!r}. Running anyway.")
+            return True
+        if held:
+            self._leases.add(name)
+        else:
+            self._leases.discard(name)
+        return bool(held)
+
+    async def release_leases(self) -> None:
+        """Give up held leases so another worker takes over without waiting for expiry."""
+        redis = get_redis()
+        if redis is None:
+            return
+        for name in list(self._leases):
+            try:
+                await redis.eval(_RELEASE, 1, self.key(f"lease:{name}"), self.worker_id)
+            except Exception as e:
+                logger.warning(f"Could not release lease {name}: {e!r}")
+        self._leases.clear()
+
+    async def get_json(self, name: str) -> Any:
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(self.key(name))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not read shared {name}: {e!r}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set_json(self, name: str, value: Any, ttl: float) -> None:
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(self.key(name), json.dumps(value, default=str), px=int(ttl * 1000))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not store shared {name}: {e!r}")
+
+    async def claim_json(self, name: str, value: Any, ttl: float) -> Any:
+        """
+        Store `value` only if `name` is not set yet (SET NX). Returns None when
+        this worker claimed it, otherwise the value stored by the worker that did.
+        """
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            if await redis.set(self.key(name), json.dumps(value, default=str), px=int(ttl * 1000), nx=True):
+                return None
+            raw = await redis.get(self.key(name))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not claim shared {name}: {e!r}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def on(self, event_type: str, handler: Handler) -> None:
+        """Register a handler for events published by other workers."""
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    async def publish(self, event_type: str, **data: Any) -> None:
+        """Send an event to every other worker (this worker has already acted on it)."""
+        redis = get_redis()
+        if redis is None:
+            return
+        message = json.dumps({"type": event_type, "origin": self.worker_id, **data})
+        try:
+            await redis.publish(self.channel, message)
+            self.published += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not publish {event_type}: {e!r}")
+
+    async def dispatch(self, raw: Union[str, bytes]) -> None:
+        """Run the handlers of one received event; our own events are ignored."""
+        try:
+            event = json.loads(raw)
+        except ValueError:
+            logger.warning(f"Ignoring malformed event: {raw!r}")
+            return
+        if event.get("origin") == self.worker_id:
+            return
+        self.received += 1
+        for handler in self._handlers.get(event.get("type"), []):
+            try:
+                result = handler(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Event handler for {event.get('type')} failed: {e!r}")
+
+    async def start(self) -> None:
+        """Subscribe to events from other workers. Must be called from a running event loop."""
+        if self._listener is not None or not self.enabled:
+            return
+        self._listener = asyncio.create_task(self._listen())
+        logger.info(f"Redis coordination started (worker {self.worker_id})")
+
+    async def shutdown(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.release_leases()
+
+    async def _listen(self) -> None:
+        while True:
+            redis = get_redis()
+            if redis is None:
+                return
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            await self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Redis subscription lost: {e!r}. Reconnecting.")
+                await asyncio.sleep(1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "worker_id": self.worker_id,
+            "leases": sorted(self._leases),
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+
+coordinator = Coordinator(prefix=app_settings.REDIS_KEY_PREFIX)
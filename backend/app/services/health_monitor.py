@@ -0,0 +1,320 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.models.settings import SystemSettings
+from app.services.coordination import coordinator
+from app.services.kafka import check_kafka_connection
+from app.services.sequin import SequinService
+from app.services.sequin_instances import sequin_instances
+from app.services.settings_store import settings_store
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+    from apscheduler.triggers.interval import IntervalTrigger  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+SEQUIN = "sequin"
+KAFKA = "kafka"
+# Additional Sequin instances are recorded as "sequin:<instance id>"
+_INSTANCE_PREFIX = f"{SEQUIN}:"
+
+
+def instance_probe_name(instance_id: str) -> str:
+    return f"{_INSTANCE_PREFIX}{instance_id}"
+
+# SystemSettings column that mirrors each probe's reachability
+_REACHABLE_COLUMNS = {
+    SEQUIN: "sequin_reachable",
+    KAFKA: "kafka_reachable",
+}
+
+
+@dataclass
+class ProbeResult:
+    connected: bool
+    error: Optional[str] = None
+    details: Optional[List[str]] = None
+    checks: Optional[List[Dict[str, Any]]] = None
+
+
+@dataclass
+class HealthStatus:
+    connected: bool = False
+    checked_at: Optional[datetime] = None
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    details: Optional[List[str]] = None
+    checks: Optional[List[Dict[str, Any]]] = None
+    consecutive_failures: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "connected": self.connected,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "latency_ms": self.latency_ms,
+            "consecutive_failures": self.consecutive_failures,
+        }
+        if self.error:
+            data["error"] = self.error
+        if self.details:
+            data["details"] = self.details
+        if self.checks:
+            data["checks"] = self.checks
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HealthStatus":
+        """Inverse of `to_dict`, for statuses shared by another worker."""
+        checked_at = data.get("checked_at")
+        return cls(
+            connected=data["connected"],
+            checked_at=datetime.fromisoformat(checked_at) if checked_at else None,
+            latency_ms=data.get("latency_ms"),
+            error=data.get("error"),
+            details=data.get("details"),
+            checks=data.get("checks"),
+            consecutive_failures=data.get("consecutive_failures", 0),
+        )
+
+
+class HealthMonitor:
+    """
+    Periodically probes Sequin and Kafka and keeps the last result per target.
+    Additional Sequin instances are probed concurrently by one extra job and
+    recorded as "sequin:<instance id>". With Redis, one worker probes and the
+    others adopt its shared results (see app.services.coordination).
+
+    Probes run on an APScheduler interval with jitter so workers do not probe in
+    lockstep. After a failure the interval doubles (up to `max_backoff`) and is
+    reset on the next success. Reachability is also written to the
+    SystemSettings `sequin_reachable` / `kafka_reachable` columns.
+    """
+
+    def __init__(self, interval: float, jitter: float, max_backoff: float):
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self._scheduler: Optional["AsyncIOScheduler"] = None
+        self._status: Dict[str, HealthStatus] = {}
+        self._probes: Dict[str, Callable[..., Awaitable[ProbeResult]]] = {
+            SEQUIN: self._probe_sequin,
+            KAFKA: self._probe_kafka,
+        }
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._scheduler is not None and self._scheduler.running
+
+    def start(self) -> None:
+        """Start the scheduler. Must be called from a running event loop (the app lifespan)."""
+        if self.running:
+            return
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+
+        self._scheduler = AsyncIOScheduler()
+        for name in self._probes:
+            self._scheduler.add_job(
+                self._scheduled_probe,
+                trigger=self._trigger(self.interval),
+                args=[name],
+                id=f"health-{name}",
+                next_run_time=datetime.now(timezone.utc),
+                max_instances=1,
+                coalesce=True,
+            )
+        self._scheduler.add_job(
+            self._scheduled_probe_instances,
+            trigger=self._trigger(self.interval),
+            id="health-sequin-instances",
+            next_run_time=datetime.now(timezone.utc),
+            max_instances=1,
+            coalesce=True,
+        )
+        self._scheduler.start()
+        logger.info(f"Health monitor started (interval={self.interval}s, jitter={self.jitter}s)")
+
+    def shutdown(self) -> None:
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+        self._scheduler = None
+
+    def reset(self) -> None:
+        """Forget recorded results, e.g. after the probe targets changed."""
+        self._status.clear()
+
+    def forget(self, name: str) -> None:
+        """Drop the recorded result of one target, e.g. a removed Sequin instance."""
+        self._status.pop(name, None)
+
+    def get_status(self, name: str) -> Optional[HealthStatus]:
+        return self._status.get(name)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: status.to_dict() for name, status in self._status.items()}
+
+    async def run_probe(self, name: str, session: Optional[AsyncSession] = None, **options: Any) -> HealthStatus:
+        """
+        Probe `name` now, record the result and adjust its schedule.
+        Scheduled runs open their own session; live checks from an endpoint pass theirs.
+        `options` are forwarded to the probe (e.g. `metadata_only` for Kafka).
+        """
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if session is None:
+                from app.core.database import engine
+
+                async with AsyncSession(engine, expire_on_commit=False) as own_session:
+                    status = await self._probe_and_record(name, own_session, options)
+            else:
+                status = await self._probe_and_record(name, session, options)
+        self._reschedule(name)
+        await coordinator.set_json(f"health:{name}", status.to_dict(), self._lease_ttl(name))
+        return status
+
+    async def _scheduled_probe(self, name: str) -> None:
+        if await coordinator.hold_lease(f"health-{name}", self._lease_ttl(name)):
+            await self.run_probe(name)
+        else:
+            await self._adopt(name)
+
+    async def _scheduled_probe_instances(self) -> None:
+        if await coordinator.hold_lease("health-sequin-instances", self._lease_ttl(SEQUIN)):
+            await self.probe_instances()
+            return
+        from app.core.database import engine
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            instances = await sequin_instances.all(session)
+        for instance in instances.values():
+            await self._adopt(instance_probe_name(instance.id))
+
+    async def _adopt(self, name: str) -> None:
+        """Take over the result another worker shared for `name`."""
+        shared = await coordinator.get_json(f"health:{name}")
+        if shared is not None:
+            self._status[name] = HealthStatus.from_dict(shared)
+
+    async def probe_instances(self) -> Dict[str, HealthStatus]:
+        """Probe every enabled additional Sequin instance concurrently."""
+        from app.core.database import engine
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            instances = await sequin_instances.all(session)
+        names = [instance_probe_name(i.id) for i in instances.values() if i.enabled]
+        # Each probe opens its own session, so they can run side by side
+        statuses = await asyncio.gather(*(self.run_probe(name) for name in names))
+        return dict(zip(names, statuses))
+
+    async def _probe_and_record(self, name: str, session: AsyncSession, options: Dict[str, Any]) -> HealthStatus:
+        started = time.perf_counter()
+        try:
+            if name.startswith(_INSTANCE_PREFIX):
+                result = await self._probe_sequin_instance(session, name[len(_INSTANCE_PREFIX):])
+            else:
+                result = await self._probes[name](session, **options)
+        except Exception as e:
+            result = ProbeResult(connected=False, error=str(e))
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        previous = self._status.get(name, HealthStatus())
+        status = HealthStatus(
+            connected=result.connected,
+            checked_at=datetime.now(timezone.utc),
+            latency_ms=latency_ms,
+            error=result.error,
+            details=result.details,
+            checks=result.checks,
+            consecutive_failures=0 if result.connected else previous.consecutive_failures + 1,
+        )
+        self._status[name] = status
+
+        if name in _REACHABLE_COLUMNS and (status.connected != previous.connected or previous.checked_at is None):
+            await self._store_reachable(session, name, status.connected)
+        return status
+
+    async def _probe_sequin(self, session: AsyncSession) -> ProbeResult:
+        try:
+            service = await SequinService.create(session)
+            await service.check_connection()
+        except HTTPException as e:
+            return ProbeResult(connected=False, error=str(e.detail))
+        return ProbeResult(connected=True)
+
+    async def _probe_sequin_instance(self, session: AsyncSession, instance_id: str) -> ProbeResult:
+        try:
+            service = await sequin_instances.service(session, instance_id)
+            await service.check_connection()
+        except HTTPException as e:
+            return ProbeResult(connected=False, error=str(e.detail))
+        return ProbeResult(connected=True)
+
+    async def _probe_kafka(self, session: AsyncSession, metadata_only: Optional[bool] = None) -> ProbeResult:
+        settings = await settings_store.get(session)
+        if not settings:
+            return ProbeResult(connected=False, error="Settings not found")
+        if metadata_only is None:
+            metadata_only = app_settings.KAFKA_CHECK_METADATA_ONLY
+        result = await check_kafka_connection(settings.kafka_url, metadata_only=metadata_only)
+        return ProbeResult(
+            connected=result["connected"],
+            error=result.get("error"),
+            details=result.get("details"),
+            checks=result.get("checks"),
+        )
+
+    async def _store_reachable(self, session: AsyncSession, name: str, connected: bool) -> None:
+        try:
+            row = (await session.exec(select(SystemSettings))).first()
+            if row is None:
+                return
+            setattr(row, _REACHABLE_COLUMNS[name], connected)
+            session.add(row)
+            await session.commit()
+            # Same version: refreshes the snapshot without notifying settings listeners
+            settings_store.set(row)
+        except Exception as e:
+            logger.warning(f"Could not store {name} reachability: {e!r}")
+
+    def _interval(self, name: str) -> float:
+        status = self._status.get(name)
+        if status is not None and status.consecutive_failures:
+            return min(self.interval * 2 ** status.consecutive_failures, self.max_backoff)
+        return self.interval
+
+    def _lease_ttl(self, name: str) -> float:
+        # Outlives a few missed runs, so leadership only moves when the leader is gone
+        return max(self._interval(name) * 3, app_settings.REDIS_LEASE_TTL)
+
+    def _reschedule(self, name: str) -> None:
+        if not self.running:
+            return
+        interval = self._interval(name)
+        job = self._scheduler.get_job(f"health-{name}")
+        if job is not None and job.trigger.interval.total_seconds() != interval:
+            job.reschedule(trigger=self._trigger(interval))
+
+    def _trigger(self, interval: float) -> "IntervalTrigger":
+        from apscheduler.triggers.interval import IntervalTrigger  # type: ignore
+
+        return IntervalTrigger(seconds=interval, jitter=self.jitter)
+
+
+health_monitor = HealthMonitor(
+    interval=app_settings.HEALTH_CHECK_INTERVAL,
+    jitter=app_settings.HEALTH_CHECK_JITTER,
+    max_backoff=app_settings.HEALTH_CHECK_MAX_BACKOFF,
+)
+
+# A new Sequin URL/token or Kafka address makes the recorded results meaningless
+settings_store.add_listener(lambda _: health_monitor.reset())
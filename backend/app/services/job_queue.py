@@ -0,0 +1,434 @@
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Header, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.services.coordination import coordinator
+from app.services.status_stream import format_event
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL = {SUCCEEDED, FAILED}
+
+# A job body: gets a session of its own, since the request's is closed by the time it runs
+Run = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def request_hash(request: Any) -> str:
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    created_at: datetime
+    state: str = QUEUED
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Any = None
+    error: Optional[Dict[str, Any]] = None
+    idempotency_key: Optional[str] = None
+    request_hash: Optional[str] = None
+    expires_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "created_at": _isoformat(self.created_at),
+            "started_at": _isoformat(self.started_at),
+            "finished_at": _isoformat(self.finished_at),
+            "expires_at": _isoformat(self.expires_at),
+            "idempotency_key": self.idempotency_key,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        return cls(
+            id=data["id"],
+            kind=data["kind"],
+            state=data["state"],
+            created_at=_parse(data["created_at"]),
+            started_at=_parse(data.get("started_at")),
+            finished_at=_parse(data.get("finished_at")),
+            expires_at=_parse(data.get("expires_at")),
+            result=data.get("result"),
+            error=data.get("error"),
+            idempotency_key=data.get("idempotency_key"),
+            request_hash=data.get("request_hash"),
+        )
+
+
+@dataclass
+class JobOptions:
+    """How an endpoint that supports jobs was asked to run."""
+    background: bool = False
+    idempotency_key: Optional[str] = None
+
+
+def job_options(
+    background: bool = False,
+    prefer: Optional[str] = Header(default=None),
+    idempotency_key: Optional[str] = Header(default=None),
+) -> JobOptions:
+    """Dependency: ?background=true or `Prefer: respond-async` runs the call as a job."""
+    return JobOptions(
+        background=background or "respond-async" in (prefer or "").lower(),
+        idempotency_key=idempotency_key or None,
+    )
+
+
+class JobQueue:
+    """
+    Runs slow operations (refresh_tables, test_connection_db, create_backfill,
+    live Kafka checks) in the background so the request returns 202 with a job
+    ID right away.
+
+    At most `workers` jobs run at once and at most `max_queued` wait; a full
+    queue is refused with 503. A job is cancelled after `timeout` seconds.
+    Finished jobs are kept for `result_ttl` seconds and then forgotten.
+
+    An idempotency key, scoped to the job kind, returns the existing job for a
+    repeated submission (422 if it comes with a different request). The key is
+    claimed before the first await on this worker and with SET NX in Redis, so
+    concurrent submissions get the same job. With Redis, job status and keys
+    are shared, so any worker can answer a poll.
+    """
+
+    def __init__(self, workers: int, max_queued: int, result_ttl: float, timeout: float):
+        self.workers = max(workers, 1)
+        self.max_queued = max(max_queued, 1)
+        self.result_ttl = result_ttl
+        self.timeout = timeout
+        self._jobs: Dict[str, Job] = {}
+        self._runs: Dict[str, Run] = {}
+        self._keys: Dict[Tuple[str, str], str] = {}
+        # Keys being claimed on this worker -> the job the claim ends up with
+        self._claims: Dict[Tuple[str, str], "asyncio.Future[Optional[Job]]"] = {}
+        # Queue slots held by claims that have not enqueued their job yet
+        self._reserved = 0
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._queue: Optional["asyncio.Queue[str]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+
+    async def submit(
+        self,
+        kind: str,
+        run: Run,
+        idempotency_key: Optional[str] = None,
+        request: Any = None,
+    ) -> Tuple[Job, bool]:
+        """Queue `run`; returns the job and whether it is new (False for an idempotent replay)."""
+        self._expire()
+        digest = request_hash(request)
+        if not idempotency_key:
+            job = self._new_job(kind, digest)
+            self._enqueue(job, run)
+            await self._share(job)
+            return job, True
+
+        claim = (kind, idempotency_key)
+        pending = self._claims.get(claim)
+        if pending is not None:
+            # A concurrent submission on this worker is claiming the key: reuse its job
+            existing = await asyncio.shield(pending)
+            if existing is None:
+                return await self.submit(kind, run, idempotency_key, request)
+            return self._replay(existing, digest), False
+
+        pending = self._claims[claim] = asyncio.get_running_loop().create_future()
+        job: Optional[Job] = None
+        try:
+            job, created = await self._claim(kind, run, idempotency_key, digest)
+        finally:
+            del self._claims[claim]
+            pending.set_result(job)
+        return (job, True) if created else (self._replay(job, digest), False)
+
+    async def _claim(self, kind: str, run: Run, idempotency_key: str, digest: str) -> Tuple[Job, bool]:
+        existing = await self._by_key(kind, idempotency_key)
+        if existing is not None:
+            return existing, False
+        job = self._new_job(kind, digest, idempotency_key)
+        claim = {"id": job.id, "request_hash": digest, "created_at": _isoformat(job.created_at)}
+        self._reserved += 1
+        try:
+            winner = await coordinator.claim_json(f"job-key:{kind}:{idempotency_key}", claim, self._share_ttl(job))
+        finally:
+            self._reserved -= 1
+        if winner is not None and winner["id"] != job.id:
+            return await self._claimed_job(kind, idempotency_key, winner), False
+        # Shared only once the key is ours, so a lost claim leaves no job record behind
+        self._keys[(kind, idempotency_key)] = job.id
+        self._enqueue(job, run)
+        await self._share(job)
+        return job, True
+
+    async def _claimed_job(self, kind: str, idempotency_key: str, claim: Dict[str, Any]) -> Job:
+        # The winner shares its job right after claiming the key; until then the claim describes it
+        job = await self.get(claim["id"])
+        if job is not None:
+            return job
+        return Job(
+            id=claim["id"],
+            kind=kind,
+            created_at=_parse(claim["created_at"]),
+            idempotency_key=idempotency_key,
+            request_hash=claim["request_hash"],
+        )
+
+    def _replay(self, job: Job, digest: str) -> Job:
+        if job.request_hash != digest:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Idempotency-Key '{job.idempotency_key}' was already used for a different {job.kind} request",
+            )
+        self.deduplicated += 1
+        return job
+
+    def _new_job(self, kind: str, digest: str, idempotency_key: Optional[str] = None) -> Job:
+        queue = self._ensure_workers()
+        if queue.qsize() + self._reserved >= self.max_queued:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many queued jobs",
+                headers={"Retry-After": str(max(1, round(self.timeout / self.workers)))},
+            )
+        return Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            created_at=_utcnow(),
+            idempotency_key=idempotency_key,
+            request_hash=digest,
+        )
+
+    def _enqueue(self, job: Job, run: Run) -> None:
+        assert self._queue is not None
+        self._jobs[job.id] = job
+        self._runs[job.id] = run
+        self._changed[job.id] = asyncio.Event()
+        self._queue.put_nowait(job.id)
+        self.submitted += 1
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        self._expire()
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        # Submitted through another worker
+        shared = await coordinator.get_json(f"job:{job_id}")
+        return Job.from_dict(shared) if shared else None
+
+    def list(self, state: Optional[str] = None, kind: Optional[str] = None) -> List[Job]:
+        """Jobs known to this worker, newest first."""
+        self._expire()
+        jobs = [
+            job for job in self._jobs.values()
+            if (state is None or job.state == state) and (kind is None or job.kind == kind)
+        ]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    async def stream(self, job_id: str, heartbeat: float) -> AsyncIterator[str]:
+        """Server-Sent Events with the job's status on every change, ending once it finished."""
+        last: Optional[Dict[str, Any]] = None
+        while True:
+            changed = self._changed.get(job_id)
+            job = await self.get(job_id)
+            if job is None:
+                yield format_event("gone", {"id": job_id})
+                return
+            data = job.to_dict()
+            if data != last:
+                yield format_event("status", data)
+                last = data
+            if job.state in TERMINAL:
+                return
+            try:
+                if changed is None:
+                    # Another worker runs it: poll the shared copy
+                    await asyncio.sleep(min(1.0, heartbeat))
+                else:
+                    await asyncio.wait_for(changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+    async def _by_key(self, kind: str, idempotency_key: str) -> Optional[Job]:
+        job_id = self._keys.get((kind, idempotency_key))
+        if job_id is not None:
+            return await self.get(job_id)
+        claim = await coordinator.get_json(f"job-key:{kind}:{idempotency_key}")
+        return await self._claimed_job(kind, idempotency_key, claim) if claim else None
+
+    def _ensure_workers(self) -> "asyncio.Queue[str]":
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the app restarted on a new event loop and took the old workers with it
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._tasks = []
+            for job in self._jobs.values():
+                if job.state == QUEUED and job.id in self._runs and not self._queue.full():
+                    self._queue.put_nowait(job.id)
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._work()))
+        assert self._queue is not None
+        return self._queue
+
+    async def _work(self) -> None:
+        from app.core.database import engine
+
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            job = self._jobs.get(job_id)
+            run = self._runs.pop(job_id, None)
+            if job is None or run is None:
+                continue
+            job.state = RUNNING
+            job.started_at = _utcnow()
+            await self._changed_state(job)
+            try:
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    result = await asyncio.wait_for(run(session), timeout=self.timeout)
+                job.result = jsonable_encoder(result)
+                job.state = SUCCEEDED
+            except asyncio.CancelledError:
+                job.error = {"status_code": 503, "detail": "The server shut down before the job finished"}
+                job.state = FAILED
+                job.finished_at = _utcnow()
+                await self._changed_state(job)
+                raise
+            except asyncio.TimeoutError:
+                job.error = {"status_code": 504, "detail": f"Job timed out after {self.timeout:.0f}s"}
+                job.state = FAILED
+            except HTTPException as e:
+                job.error = {"status_code": e.status_code, "detail": e.detail}
+                job.state = FAILED
+            except Exception as e:
+                logger.exception(f"Job {job.id} ({job.kind}) failed")
+                job.error = {"status_code": 500, "detail": str(e) or repr(e)}
+                job.state = FAILED
+            job.finished_at = _utcnow()
+            await self._changed_state(job)
+
+    async def _changed_state(self, job: Job) -> None:
+        if job.state in TERMINAL:
+            job.expires_at = job.finished_at + timedelta(seconds=self.result_ttl)
+        # Wake every stream watching the job, then arm a fresh event for the next change
+        changed = self._changed.get(job.id)
+        if changed is not None:
+            changed.set()
+            self._changed[job.id] = asyncio.Event()
+        await self._share(job)
+
+    async def _share(self, job: Job) -> None:
+        await coordinator.set_json(
+            f"job:{job.id}", {**job.to_dict(), "request_hash": job.request_hash}, self._share_ttl(job),
+        )
+
+    def _share_ttl(self, job: Job) -> float:
+        # Unfinished jobs may still wait in the queue and run up to `timeout`
+        return self.result_ttl if job.state in TERMINAL else self.result_ttl + self.timeout * (1 + self.max_queued / self.workers)
+
+    def _expire(self) -> None:
+        now = _utcnow()
+        for job in [job for job in self._jobs.values() if job.expires_at is not None and job.expires_at <= now]:
+            del self._jobs[job.id]
+            self._changed.pop(job.id, None)
+            if job.idempotency_key:
+                self._keys.pop((job.kind, job.idempotency_key), None)
+
+    def stats(self) -> Dict[str, Any]:
+        states: Dict[str, int] = {}
+        for job in self._jobs.values():
+            states[job.state] = states.get(job.state, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queued": self.max_queued,
+            "states": states,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+        }
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._loop = None
+        self._queue = None
+
+
+job_queue = JobQueue(
+    workers=app_settings.JOB_WORKERS,
+    max_queued=app_settings.JOB_MAX_QUEUED,
+    result_ttl=app_settings.JOB_RESULT_TTL,
+    timeout=app_settings.JOB_TIMEOUT,
+)
+
+
+async def run_or_submit(
+    kind: str,
+    run: Run,
+    session: AsyncSession,
+    options: JobOptions,
+    request: Any = None,
+) -> Any:
+    """
+    Run `run` inline with the request's session, or as a job when the client
+    asked for it: 202 with the job, a Location to poll and, for an idempotent
+    replay, `Idempotent-Replayed: true`. `request` identifies the submission
+    for idempotency checks.
+    """
+    if not options.background:
+        return await run(session)
+    job, created = await job_queue.submit(kind, run, options.idempotency_key, request)
+    location = f"{app_settings.API_V1_STR}/jobs/{job.id}"
+    headers = {"Location": location}
+    if not created:
+        headers["Idempotent-Replayed"] = "true"
+    return JSONResponse(status_code=202, content={**job.to_dict(), "status_url": location}, headers=headers)
+
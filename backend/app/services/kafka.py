@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from app.core.config import settings as app_settings
+from app.core.metrics import KAFKA_PROBE_DURATION
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# kafka-python is blocking. Probes run on a small dedicated pool so a hung broker
+# can only tie up these threads, never the request threadpool. Other Kafka calls
+# (lag collection) get a pool of their own, so probes left running past their
+# deadline never make them queue.
+_probe_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="kafka-probe")
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kafka-call")
+
+# One long-lived admin client per bootstrap server, reused across checks.
+# KafkaAdminClient is not thread-safe, so each one has its own lock.
+_admin_clients: Dict[str, Tuple[Any, threading.Lock]] = {}
+_admin_clients_lock = threading.Lock()
+
+# Every client is built with these so its blocking calls give the thread back:
+# requests time out after REQUEST_TIMEOUT_MS, and so does the broker version
+# probe each client runs when it connects.
+REQUEST_TIMEOUT_MS = 5000
+CLIENT_TIMEOUTS = {
+    "request_timeout_ms": REQUEST_TIMEOUT_MS,
+    "api_version_auto_timeout_ms": REQUEST_TIMEOUT_MS,
+}
+
+
+def _get_admin_client(bootstrap_servers: str) -> Tuple[Any, threading.Lock]:
+    from kafka import KafkaAdminClient  # type: ignore
+
+    with _admin_clients_lock:
+        entry = _admin_clients.get(bootstrap_servers)
+        if entry is None:
+            client = KafkaAdminClient(
+                bootstrap_servers=bootstrap_servers,
+                client_id="etl-manager-admin",
+                **CLIENT_TIMEOUTS,
+            )
+            entry = (client, threading.Lock())
+            _admin_clients[bootstrap_servers] = entry
+        return entry
+
+
+def _drop_admin_client(bootstrap_servers: str) -> None:
+    """Discard a (possibly broken) cached admin client so the next check reconnects."""
+    with _admin_clients_lock:
+        entry = _admin_clients.pop(bootstrap_servers, None)
+    if entry is not None:
+        try:
+            entry[0].close()
+        except Exception:
+            pass
+
+
+def close_admin_clients() -> None:
+    """Close every cached admin client. Called on shutdown."""
+    for bootstrap_servers in list(_admin_clients):
+        _drop_admin_client(bootstrap_servers)
+
+
+@contextmanager
+def admin_client(bootstrap_servers: str) -> Iterator[Any]:
+    """
+    Borrow the cached admin client for `bootstrap_servers` (blocking).
+    A client that raises is dropped so the next caller reconnects.
+    """
+    client, lock = _get_admin_client(bootstrap_servers)
+    try:
+        with lock:
+            yield client
+    except Exception:
+        _drop_admin_client(bootstrap_servers)
+        raise
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any) -> T:
+    """Run a blocking kafka-python call on the Kafka thread pool (not the probe pool)."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+def _check_admin(bootstrap_servers: str) -> str:
+    with admin_client(bootstrap_servers) as client:
+        cluster_metadata = client.describe_cluster()
+    return f"AdminClient connected. Cluster ID: {cluster_metadata.get('cluster_id', 'N/A')}"
+
+
+def _check_producer(bootstrap_servers: str) -> str:
+    from kafka import KafkaProducer  # type: ignore
+
+    producer = KafkaProducer(
+        bootstrap_servers=bootstrap_servers,
+        max_block_ms=REQUEST_TIMEOUT_MS,
+        **CLIENT_TIMEOUTS,
+    )
+    try:
+        return f"Producer connected. Bootstrap connected: {producer.bootstrap_connected()}"
+    finally:
+        producer.close()
+
+
+def _check_consumer(bootstrap_servers: str) -> str:
+    from kafka import KafkaConsumer  # type: ignore
+
+    consumer = KafkaConsumer(
+        bootstrap_servers=bootstrap_servers,
+        consumer_timeout_ms=1000,
+        **CLIENT_TIMEOUTS,
+    )
+    try:
+        consumer.topics()  # Get topics to verify connectivity
+        return "Consumer connected. Topics visible."
+    finally:
+        consumer.close()
+
+
+_CHECKS: Dict[str, Callable[[str], str]] = {
+    "admin": _check_admin,
+    "producer": _check_producer,
+    "consumer": _check_consumer,
+}
+
+
+def _timed(name: str, bootstrap_servers: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        detail = _CHECKS[name](bootstrap_servers)
+        result: Dict[str, Any] = {"ok": True, "detail": detail}
+    except Exception as e:
+        result = {"ok": False, "error": str(e)}
+    elapsed = time.perf_counter() - started
+    KAFKA_PROBE_DURATION.labels(name, "success" if result["ok"] else "error").observe(elapsed)
+    result["latency_ms"] = round(elapsed * 1000, 2)
+    return result
+
+
+async def check_kafka_connection(
+    bootstrap_servers: str,
+    metadata_only: bool = False,
+    timeout: Optional[float] = None,
+) -> dict:
+    """
+    Test connectivity to Kafka.
+
+    The admin (cluster metadata), producer and consumer checks run concurrently
+    under one overall deadline and each reports its own latency. With
+    `metadata_only` only the admin check runs, on the cached admin client.
+    """
+    timeout = app_settings.KAFKA_CHECK_TIMEOUT if timeout is None else timeout
+    names = ["admin"] if metadata_only else list(_CHECKS)
+    loop = asyncio.get_running_loop()
+    futures = {
+        name: loop.run_in_executor(_probe_executor, _timed, name, bootstrap_servers)
+        for name in names
+    }
+    await asyncio.wait(futures.values(), timeout=timeout)
+
+    checks: List[Dict[str, Any]] = []
+    for name, future in futures.items():
+        if future.done():
+            checks.append({"check": name, **future.result()})
+        else:
+            # The thread keeps running until the client timeouts end it; we just stop waiting
+            checks.append({"check": name, "ok": False, "error": f"Timed out after {timeout}s", "latency_ms": None})
+
+    result: Dict[str, Any] = {
+        "connected": all(check["ok"] for check in checks),
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+        "checks": checks,
+        "details": [check["detail"] for check in checks if check["ok"]],
+    }
+    failed = next((check for check in checks if not check["ok"]), None)
+    if failed is not None:
+        result["error"] = f"{failed['check'].capitalize()} check failed: {failed['error']}"
+    return result
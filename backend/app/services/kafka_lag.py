@@ -0,0 +1,272 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.services.coordination import coordinator
+from app.services.kafka import REQUEST_TIMEOUT_MS, admin_client, run_blocking
+from app.services.settings_store import settings_store
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Rollup resolutions (seconds) and how many buckets of each are kept
+ROLLUPS: Dict[str, Tuple[int, int]] = {
+    "1m": (60, 6 * 60),       # 6 hours
+    "5m": (300, 24 * 12),     # 24 hours
+    "1h": (3600, 7 * 24),     # 7 days
+}
+
+
+def _isoformat(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+@dataclass
+class RollupBucket:
+    start: float
+    count: int = 0
+    total: Dict[str, float] = field(default_factory=dict)
+    peak: Dict[str, float] = field(default_factory=dict)
+
+    def add(self, values: Dict[str, float]) -> None:
+        self.count += 1
+        for key, value in values.items():
+            self.total[key] = self.total.get(key, 0) + value
+            self.peak[key] = max(self.peak.get(key, value), value)
+
+
+class LagSeries:
+    """
+    Bounded in-memory time series of lag values keyed by "group|topic".
+
+    Raw samples live in a fixed-size ring buffer; every sample is also folded
+    into 1m/5m/1h buckets (avg and max per key), each with its own ring buffer,
+    so long windows stay cheap to keep and to query.
+    """
+
+    def __init__(self, raw_size: int):
+        self.raw: Deque[Tuple[float, Dict[str, float]]] = deque(maxlen=raw_size)
+        self.rollups: Dict[str, Deque[RollupBucket]] = {
+            name: deque(maxlen=size) for name, (_, size) in ROLLUPS.items()
+        }
+
+    def add(self, ts: float, values: Dict[str, float]) -> None:
+        self.raw.append((ts, values))
+        for name, (resolution, _) in ROLLUPS.items():
+            buckets = self.rollups[name]
+            start = ts - ts % resolution
+            if not buckets or buckets[-1].start != start:
+                buckets.append(RollupBucket(start=start))
+            buckets[-1].add(values)
+
+    def query(self, resolution: str = "raw") -> List[Dict[str, Any]]:
+        if resolution == "raw":
+            return [{"ts": _isoformat(ts), "lag": dict(values)} for ts, values in self.raw]
+        return [
+            {
+                "ts": _isoformat(bucket.start),
+                "samples": bucket.count,
+                "avg": {k: round(v / bucket.count, 2) for k, v in bucket.total.items()},
+                "max": dict(bucket.peak),
+            }
+            for bucket in self.rollups[resolution]
+        ]
+
+
+def compute_lag(
+    committed: Dict[str, Dict[Tuple[str, int], int]],
+    end_offsets: Dict[Tuple[str, int], int],
+) -> Dict[str, Any]:
+    """
+    Lag per partition, per topic and per group from committed offsets
+    ({group: {(topic, partition): offset}}) and log-end offsets.
+    """
+    groups: Dict[str, Any] = {}
+    for group, offsets in committed.items():
+        topics: Dict[str, Any] = {}
+        for (topic, partition), offset in sorted(offsets.items()):
+            end = end_offsets.get((topic, partition))
+            if end is None:
+                continue
+            # No commit yet (-1) means everything in the log is outstanding
+            lag = end if offset < 0 else max(end - offset, 0)
+            entry = topics.setdefault(topic, {"lag": 0, "partitions": []})
+            entry["lag"] += lag
+            entry["partitions"].append(
+                {"partition": partition, "committed": offset, "end_offset": end, "lag": lag}
+            )
+        groups[group] = {"lag": sum(t["lag"] for t in topics.values()), "topics": topics}
+    return groups
+
+
+class KafkaLagCollector:
+    """
+    Periodically samples consumer-group lag for the CDC sink topics.
+
+    Each run makes one list-groups call, one committed-offsets call per
+    matching group and a single batched end-offsets call for every partition
+    involved, all on the Kafka thread pool.
+    """
+
+    def __init__(self, interval: float, group_pattern: str, topic_pattern: str, raw_size: int):
+        self.interval = interval
+        self.group_pattern = re.compile(group_pattern) if group_pattern else None
+        self.topic_pattern = re.compile(topic_pattern) if topic_pattern else None
+        self.series = LagSeries(raw_size=raw_size)
+        self.latest: Optional[Dict[str, Any]] = None
+        self._latest_ts = 0.0
+        self.last_error: Optional[str] = None
+        self._consumers: Dict[str, Any] = {}
+        # kafka-python consumers are not thread-safe: one fetch at a time across executor threads
+        self._fetch_lock = threading.Lock()
+        self._scheduler: Optional["AsyncIOScheduler"] = None
+
+    def start(self) -> None:
+        """Start periodic collection. Must be called from a running event loop."""
+        if self._scheduler is not None:
+            return
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+        from apscheduler.triggers.interval import IntervalTrigger  # type: ignore
+
+        self._scheduler = AsyncIOScheduler()
+        self._scheduler.add_job(
+            self._scheduled_collect,
+            trigger=IntervalTrigger(seconds=self.interval, jitter=self.interval / 10),
+            id="kafka-lag",
+            next_run_time=datetime.now(timezone.utc),
+            max_instances=1,
+            coalesce=True,
+        )
+        self._scheduler.start()
+        logger.info(f"Kafka lag collector started (interval={self.interval}s)")
+
+    def shutdown(self) -> None:
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+        self._scheduler = None
+        # Waits for an in-flight fetch rather than closing its consumer under it
+        with self._fetch_lock:
+            for consumer in self._consumers.values():
+                try:
+                    consumer.close()
+                except Exception:
+                    pass
+            self._consumers.clear()
+
+    async def collect(self, bootstrap_servers: str) -> Dict[str, Any]:
+        """Sample lag once, record it and share it with the other workers."""
+        committed, end_offsets = await run_blocking(self._fetch_offsets, bootstrap_servers)
+        groups = compute_lag(committed, end_offsets)
+        now = time.time()
+        self._record(now, groups)
+        await coordinator.set_json("kafka-lag", {"ts": now, "groups": groups}, self._lease_ttl())
+        return self.latest
+
+    def _record(self, ts: float, groups: Dict[str, Any]) -> None:
+        self._latest_ts = ts
+        self.latest = {"collected_at": _isoformat(ts), "groups": groups}
+        self.last_error = None
+        self.series.add(ts, {
+            f"{group}|{topic}": data["lag"]
+            for group, group_data in groups.items()
+            for topic, data in group_data["topics"].items()
+        })
+
+    async def _adopt(self) -> None:
+        """Record the sample another worker shared, if it is newer than ours."""
+        shared = await coordinator.get_json("kafka-lag")
+        if shared is not None and shared["ts"] > self._latest_ts:
+            self._record(shared["ts"], shared["groups"])
+
+    def _lease_ttl(self) -> float:
+        return max(self.interval * 3, app_settings.REDIS_LEASE_TTL)
+
+    def _fetch_offsets(
+        self, bootstrap_servers: str
+    ) -> Tuple[Dict[str, Dict[Tuple[str, int], int]], Dict[Tuple[str, int], int]]:
+        # The scheduled run and live requests may overlap on different executor threads
+        with self._fetch_lock:
+            return self._fetch_offsets_locked(bootstrap_servers)
+
+    def _fetch_offsets_locked(
+        self, bootstrap_servers: str
+    ) -> Tuple[Dict[str, Dict[Tuple[str, int], int]], Dict[Tuple[str, int], int]]:
+        committed: Dict[str, Dict[Tuple[str, int], int]] = {}
+        with admin_client(bootstrap_servers) as admin:
+            group_ids = [group_id for group_id, _ in admin.list_consumer_groups()]
+            for group_id in group_ids:
+                if self.group_pattern and not self.group_pattern.search(group_id):
+                    continue
+                offsets = {
+                    (tp.topic, tp.partition): meta.offset
+                    for tp, meta in admin.list_consumer_group_offsets(group_id).items()
+                    if not self.topic_pattern or self.topic_pattern.search(tp.topic)
+                }
+                if offsets:
+                    committed[group_id] = offsets
+
+        partitions = {tp for offsets in committed.values() for tp in offsets}
+        if not partitions:
+            return committed, {}
+
+        from kafka import TopicPartition  # type: ignore
+
+        consumer = self._end_offsets_consumer(bootstrap_servers)
+        try:
+            end_offsets = consumer.end_offsets([TopicPartition(topic, partition) for topic, partition in partitions])
+        except Exception:
+            self._consumers.pop(bootstrap_servers, None)
+            consumer.close()
+            raise
+        return committed, {(tp.topic, tp.partition): offset for tp, offset in end_offsets.items()}
+
+    def _end_offsets_consumer(self, bootstrap_servers: str) -> Any:
+        # Group-less consumer kept open between runs; only used for ListOffsets
+        consumer = self._consumers.get(bootstrap_servers)
+        if consumer is None:
+            from kafka import KafkaConsumer  # type: ignore
+
+            consumer = KafkaConsumer(
+                bootstrap_servers=bootstrap_servers,
+                client_id="etl-manager-lag",
+                enable_auto_commit=False,
+                request_timeout_ms=REQUEST_TIMEOUT_MS + 1000,
+                api_version_auto_timeout_ms=REQUEST_TIMEOUT_MS,
+            )
+            self._consumers[bootstrap_servers] = consumer
+        return consumer
+
+    async def _scheduled_collect(self) -> None:
+        from app.core.database import engine
+
+        try:
+            # With Redis, one worker talks to Kafka and the others reuse its samples
+            if not await coordinator.hold_lease("kafka-lag", self._lease_ttl()):
+                await self._adopt()
+                return
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                settings = await settings_store.get(session)
+            if settings is None:
+                return
+            await self.collect(settings.kafka_url)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning(f"Kafka lag collection failed: {e!r}")
+
+
+kafka_lag_collector = KafkaLagCollector(
+    interval=app_settings.KAFKA_LAG_INTERVAL,
+    group_pattern=app_settings.KAFKA_LAG_GROUP_PATTERN,
+    topic_pattern=app_settings.KAFKA_LAG_TOPIC_PATTERN,
+    raw_size=app_settings.KAFKA_LAG_RAW_SAMPLES,
+)
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+import httpx
+
+from app.core.config import settings as app_settings
+
+logger = logging.getLogger(__name__)
+
+# Methods that are safe to repeat against Sequin
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+# Upstream statuses worth retrying: gateway errors and overload
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast for `reset_timeout` seconds. Then a single trial call is let
+    through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.opened_count = 0
+        self.rejected_count = 0
+        self._trial_in_flight = False
+
+    def before_call(self) -> None:
+        if self.state == OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                self.rejected_count += 1
+                raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected_count += 1
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self._trial_in_flight = True
+
+    def abandon_trial(self) -> None:
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} failures")
+                self.opened_count += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_count": self.opened_count,
+            "rejected_count": self.rejected_count,
+        }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def _should_retry(breaker: CircuitBreaker, policy: RetryPolicy, retryable: bool, attempt: int) -> bool:
+    # Once this failure tripped the breaker, surface it instead of retrying into an open circuit
+    return retryable and attempt < policy.max_retries and breaker.state != OPEN
+
+
+async def call_with_resilience(
+    send: Callable[[], Awaitable[httpx.Response]],
+    breaker: CircuitBreaker,
+    policy: RetryPolicy,
+    retryable: bool,
+    gone_on_retry_ok: bool = False,
+) -> httpx.Response:
+    """
+    Call `send` through `breaker`, retrying transport errors and gateway
+    statuses with backoff when the call is `retryable`.
+    Transport errors and 5xx responses count as breaker failures; anything else
+    (including 4xx) proves the upstream is healthy.
+    With `gone_on_retry_ok` (DELETE), a 404 on a retry means an earlier attempt
+    whose response was lost already deleted the resource: it becomes a 204.
+    """
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            response = await send()
+        except asyncio.CancelledError:
+            # A cancelled half-open trial must not block the circuit forever
+            breaker.abandon_trial()
+            raise
+        except httpx.TransportError:
+            breaker.record_failure()
+            if not _should_retry(breaker, policy, retryable, attempt):
+                raise
+        else:
+            if response.status_code < 500:
+                breaker.record_success()
+                if gone_on_retry_ok and attempt > 0 and response.status_code == 404:
+                    return httpx.Response(204, request=response.request)
+                return response
+            breaker.record_failure()
+            if (
+                response.status_code not in RETRYABLE_STATUS_CODES
+                or not _should_retry(breaker, policy, retryable, attempt)
+            ):
+                return response
+
+        policy.retries += 1
+        await asyncio.sleep(policy.delay(attempt))
+        attempt += 1
+
+
+# One breaker per Sequin base URL, shared by all requests in this worker
+_breakers: Dict[str, CircuitBreaker] = {}
+
+sequin_retry_policy = RetryPolicy(
+    max_retries=app_settings.SEQUIN_RETRY_ATTEMPTS,
+    base_delay=app_settings.SEQUIN_RETRY_BASE_DELAY,
+    max_delay=app_settings.SEQUIN_RETRY_MAX_DELAY,
+)
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=app_settings.SEQUIN_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=app_settings.SEQUIN_BREAKER_RESET_TIMEOUT,
+        )
+        _breakers[name] = breaker
+    return breaker
+
+
+def resilience_stats() -> Dict[str, Any]:
+    return {
+        "retries": sequin_retry_policy.retries,
+        "circuit_breakers": {name: breaker.stats() for name, breaker in _breakers.items()},
+    }
@@ -1,27 +1,114 @@
 import httpx
+import json
 import logging
-from sqlmodel import Session, select
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings as app_settings
+from app.core.http_client import get_http_client
+from app.core.logging_config import log_payload
+from app.core.metrics import track_sequin_call
+from app.services.admission import READ, REFRESH_TABLES, TEST_CONNECTION_DB, WRITE, AdmissionRejected, sequin_admission
+from app.services.bulk import StageFailed, run_bounded
+from app.services.cache import sequin_cache, shared_sequin_cache
+from app.services.coordination import coordinator
+from app.services.resilience import (
+    IDEMPOTENT_METHODS,
+    CircuitOpenError,
+    call_with_resilience,
+    get_breaker,
+    sequin_retry_policy,
+)
+from app.services.singleflight import sequin_flights
+from app.services.settings_store import settings_store
+from app.services.sequin_mirror import sequin_mirror
+from app.services.status_stream import status_broadcaster
+from app.models.sequin_instance import SequinInstance
 from app.models.settings import SystemSettings
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 
 logger = logging.getLogger(__name__)
 
+# Per-call read timeouts (seconds) for calls that are known to be slower or
+# that must fail fast. Everything else uses the shared client's defaults.
+TEST_CONNECTION_TIMEOUT = 5.0
+TEST_CONNECTION_DB_TIMEOUT = 30.0
+REFRESH_TABLES_TIMEOUT = 60.0
+
+LIST_DATABASES_PATH = "/api/postgres_databases?show_sensitive=true"
+LIST_SINKS_PATH = "/api/sinks"
+
+
+@dataclass
+class RawBody:
+    """An upstream response body kept as bytes, for pass-through responses."""
+    content: bytes
+    media_type: str
+
+    def to_response(self) -> Response:
+        return Response(content=self.content, media_type=self.media_type)
+
+
+def _decode_shared(value: bytes) -> Any:
+    """A value stored by `_cached_get` in the shared cache: b"J" + JSON or b"R" + media type + newline + body."""
+    if value[:1] == b"R":
+        media_type, _, content = value[1:].partition(b"\n")
+        return RawBody(content, media_type.decode())
+    return json.loads(value[1:])
+
+
+def _is_sensitive(path: str) -> bool:
+    """True for paths that ask Sequin for unredacted credentials."""
+    query = parse_qs(urlsplit(path).query)
+    return query.get("show_sensitive", ["false"])[-1].lower() == "true"
+
+
+def _drop_local_state(url_prefix: str, path_prefix: str) -> None:
+    sequin_cache.invalidate_prefix(url_prefix)
+    # A GET sent after the write must not join one that started before it
+    sequin_flights.forget(url_prefix)
+    sequin_mirror.mark_stale_path(path_prefix)
+    status_broadcaster.notify()
+
 
 class SequinService:
     """
     Service for interacting with Sequin API.
-    All data is fetched directly from Sequin API - no local DB storage.
+    Sequin is the source of truth; databases and sinks are also mirrored into
+    local tables (see app.services.sequin_mirror) so listings can be served
+    without a round trip, and every write marks the mirror stale.
+    Requests go through the app-wide pooled HTTP client, or the instance's own
+    pool for additional Sequin instances (see app.core.http_client and
+    app.services.sequin_instances).
+    Read endpoints are served through a short-lived response cache that every
+    write invalidates (see app.services.cache), and identical concurrent GETs
+    share a single upstream call (see app.services.singleflight).
+    Idempotent calls are retried with backoff and every call goes through a
+    per-instance circuit breaker (see app.services.resilience), after being
+    admitted by the rate and concurrency limits of its upstream and endpoint
+    class (see app.services.admission).
     """
     
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: AsyncSession,
+        settings: Union[SystemSettings, SequinInstance],
+        instance_id: Optional[str] = None,
+    ):
         self.session = session
-        self.settings = self._get_settings()
+        self.settings = settings
+        # None is the Sequin configured in SystemSettings; otherwise a SequinInstance ID
+        self.instance_id = instance_id
 
-    def _get_settings(self) -> SystemSettings:
-        settings = self.session.exec(select(SystemSettings)).first()
+    @classmethod
+    async def create(cls, session: AsyncSession) -> "SequinService":
+        """Build a service bound to the current system settings."""
+        # Served from the in-memory snapshot; only hits the DB when it is stale
+        settings = await settings_store.get(session)
         if not settings:
             raise HTTPException(status_code=400, detail="System settings not configured")
-        return settings
+        return cls(session, settings)
 
     def _get_headers(self):
         if not self.settings.sequin_token:
@@ -35,184 +122,365 @@ class SequinService:
         base = self.settings.sequin_url.rstrip("/")
         return f"{base}{path}"
 
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        endpoint_class: Optional[str] = None,
+        admit: bool = True,
+    ) -> httpx.Response:
+        """
+        Send a request to Sequin over the shared client.
+        Upstream error statuses are mapped to HTTPException with the Sequin body as detail.
+        `endpoint_class` picks the admission limits (reads for GET, writes otherwise by default).
+        """
+        return await self._send(
+            method, self._get_url(path), self._get_headers(),
+            json=json, timeout=timeout, endpoint_class=endpoint_class, admit=admit,
+        )
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        *,
+        json: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        endpoint_class: Optional[str] = None,
+        admit: bool = True,
+    ) -> httpx.Response:
+        client = get_http_client(self.instance_id)
+        kwargs: dict[str, Any] = {"headers": headers}
+        if json is not None:
+            kwargs["json"] = json
+        if timeout is not None:
+            # Override the read/write/pool budget but never wait longer to connect than the client default
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=min(timeout, app_settings.SEQUIN_HTTP_CONNECT_TIMEOUT))
+
+        send = getattr(client, method.lower())
+        upstream = self.settings.sequin_url.rstrip("/")
+        breaker = get_breaker(upstream)
+        endpoint_class = endpoint_class or (READ if method.upper() == "GET" else WRITE)
+
+        def resilient() -> Any:
+            return call_with_resilience(
+                lambda: send(url, **kwargs),
+                breaker=breaker,
+                policy=sequin_retry_policy,
+                retryable=method.upper() in IDEMPOTENT_METHODS,
+                gone_on_retry_ok=method.upper() == "DELETE",
+            )
+
+        async def call() -> Any:
+            if not admit:
+                return await resilient()
+            # Admitted once per logical call (inside the single flight), not per retry
+            async with sequin_admission.admit(upstream, endpoint_class):
+                return await resilient()
+
+        try:
+            if method.upper() == "GET":
+                # Same URL (path + query) with the same credentials -> one upstream call
+                key = f"{url}|{headers.get('Authorization', '')}"
+                response = await sequin_flights.do(key, call)
+            else:
+                response = await call()
+            response.raise_for_status()
+            return response
+        except AdmissionRejected as e:
+            raise e.to_http_exception()
+        except CircuitOpenError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Sequin unavailable: {e}",
+                headers={"Retry-After": str(max(1, round(e.retry_after)))},
+            )
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                "Sequin API error %s %s -> %s",
+                method.upper(), url, e.response.status_code,
+                extra={"upstream_body": e.response.text[:2000]},
+            )
+            raise HTTPException(status_code=e.response.status_code, detail=f"Sequin Error: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error("Error calling Sequin %s %s: %r", method.upper(), url, e)
+            raise HTTPException(status_code=502, detail=f"Sequin unreachable: {e!r}")
+
+    async def _cached_get(self, path: str, raw: bool = False) -> Any:
+        """
+        GET `path` through the response cache.
+        URL and headers are resolved up front so a background refresh does not
+        touch the request-scoped session after it is closed.
+        With `raw`, the body is kept as bytes (a RawBody) and never parsed.
+        show_sensitive responses carry credentials and stay in this worker's
+        memory: they are never written to the shared (Redis) cache.
+        """
+        url = self._get_url(path)
+        headers = self._get_headers()
+        # Raw and parsed copies are cached separately; both share the URL prefix for invalidation
+        key = f"{url}#raw" if raw else url
+        shared_ok = not _is_sensitive(path)
+
+        async def load() -> Any:
+            # Another worker may have fetched it moments ago
+            shared = await shared_sequin_cache.get(key) if shared_ok else None
+            if shared is not None:
+                return _decode_shared(shared)
+            response = await self._send("GET", url, headers)
+            media_type = response.headers.get("content-type", "application/json")
+            # Sequin's own bytes are shared, so no worker re-encodes anything
+            if shared_ok:
+                await shared_sequin_cache.set(key, (b"R" + media_type.encode() + b"\n" if raw else b"J") + response.content)
+            if raw:
+                return RawBody(response.content, media_type)
+            return response.json()
+
+        try:
+            return await sequin_cache.get_or_load(key, load)
+        except HTTPException as e:
+            # While Sequin is failing, the breaker is open or admission is refused, an expired copy beats an error
+            entry = sequin_cache.peek(key)
+            if e.status_code in (429, 502, 503, 504) and entry is not None:
+                logger.warning(f"Serving expired cache for {key} after Sequin error {e.status_code}")
+                return entry.value
+            raise
+
+    async def _invalidate(self, path_prefix: str) -> None:
+        """
+        Drop cached responses under `path_prefix` after a write, mark the mirror
+        stale and wake the status stream, here and (with Redis) on every other worker.
+        """
+        url_prefix = self._get_url(path_prefix)
+        _drop_local_state(url_prefix, path_prefix)
+        await shared_sequin_cache.invalidate_prefix(url_prefix)
+        await coordinator.publish("sequin_invalidate", prefix=url_prefix, path=path_prefix)
+
+    @track_sequin_call("check_connection")
+    async def check_connection(self) -> None:
+        """Raise HTTPException if the Sequin API is not reachable with the configured token."""
+        # Health probes are not subject to admission control, so a busy proxy never reads as an outage
+        await self._request("GET", "/api/postgres_databases", timeout=TEST_CONNECTION_TIMEOUT, admit=False)
+
     async def test_connection(self):
         """Test connection to Sequin API."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self._get_url("/api/postgres_databases"),
-                    headers=self._get_headers(),
-                    timeout=5.0
-                )
-                response.raise_for_status()
-                return True
+            await self.check_connection()
+            return True
         except Exception as e:
             logger.error(f"Sequin Connection Error: {e}")
             return False
 
-    async def list_databases(self):
+    @track_sequin_call("list_databases")
+    async def list_databases(self, use_cache: bool = True):
         """
         List all databases from Sequin API.
-        Returns realtime data directly from Sequin.
+        Returns realtime data directly from Sequin (`use_cache=False` skips the response cache).
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    self._get_url("/api/postgres_databases?show_sensitive=true"),
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                data = response.json()
-                logger.debug(f"Sequin List Response: {data}")
-                print(f"Sequin List Response: {data}")
-                return data  # Returns {"data": [...]}
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Sequin API Error: {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Sequin Error: {e.response.text}")
-            except Exception as e:
-                logger.error(f"Error fetching from Sequin: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
+        if use_cache:
+            data = await self._cached_get(LIST_DATABASES_PATH)
+        else:
+            data = (await self._request("GET", LIST_DATABASES_PATH)).json()
+        # Fetched with show_sensitive=true: only ever logged sampled and redacted
+        log_payload(logger, "Sequin list databases response", data)
+        return data  # Returns {"data": [...]}
 
+    @track_sequin_call("list_databases")
+    async def list_databases_raw(self) -> Response:
+        """
+        list_databases as a pass-through response: Sequin's bytes and content
+        type are returned as-is, skipping a JSON parse and re-encode.
+        """
+        return (await self._cached_get(LIST_DATABASES_PATH, raw=True)).to_response()
+
+    @track_sequin_call("get_database")
     async def get_database(self, id_or_name: str):
         """
         Get a specific database by ID or name from Sequin API.
         Returns realtime data directly from Sequin.
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    self._get_url(f"/api/postgres_databases/{id_or_name}"),
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                data = response.json()
-                logger.debug(f"Sequin Get Response: {data}")
-                return data  # Returns {"data": {...}}
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Sequin API Error: {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Sequin Error: {e.response.text}")
+        data = await self._cached_get(f"/api/postgres_databases/{id_or_name}")
+        log_payload(logger, "Sequin get database response", data)
+        return data  # Returns {"data": {...}}
 
+    @track_sequin_call("create_database")
     async def create_database(self, database_in: dict):
         """
         Create a new database in Sequin.
         Returns the created database from Sequin API response.
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                logger.info(f"Creating database with payload: {database_in}")
-                response = await client.post(
-                    self._get_url("/api/postgres_databases"),
-                    headers=self._get_headers(),
-                    json=database_in
-                )
-                response.raise_for_status()
-                data = response.json()
-                logger.info(f"Sequin Create Response: {data}")
-                
-                # Extract the data object if wrapped
-                if "data" in data:
-                    return data["data"]
-                return data
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Sequin API Error: {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Sequin Error: {e.response.text}")
+        logger.info("Creating Sequin database %s", database_in.get("name"))
+        log_payload(logger, "Sequin create database payload", database_in)
+        response = await self._request("POST", "/api/postgres_databases", json=database_in)
+        await self._invalidate("/api/postgres_databases")
+        data = response.json()
+        log_payload(logger, "Sequin create database response", data)
+
+        # Extract the data object if wrapped
+        if "data" in data:
+            return data["data"]
+        return data
 
+    @track_sequin_call("update_database")
     async def update_database(self, id_or_name: str, database_in: dict):
         """
         Update a database in Sequin.
         Uses the database name in the URL as per Sequin API docs.
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                logger.info(f"Updating database {id_or_name} with payload: {database_in}")
-                response = await client.put(
-                    self._get_url(f"/api/postgres_databases/{id_or_name}"),
-                    headers=self._get_headers(),
-                    json=database_in
-                )
-                response.raise_for_status()
-                data = response.json()
-                logger.info(f"Sequin Update Response: {data}")
-                
-                if "data" in data:
-                    return data["data"]
-                return data
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Sequin API Error: {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Sequin Error: {e.response.text}")
+        logger.info("Updating Sequin database %s", id_or_name)
+        log_payload(logger, "Sequin update database payload", database_in)
+        response = await self._request("PUT", f"/api/postgres_databases/{id_or_name}", json=database_in)
+        await self._invalidate("/api/postgres_databases")
+        data = response.json()
+        log_payload(logger, "Sequin update database response", data)
 
+        if "data" in data:
+            return data["data"]
+        return data
+
+    @track_sequin_call("delete_database")
     async def delete_database(self, id_or_name: str):
         """Delete a database from Sequin."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.delete(
-                    self._get_url(f"/api/postgres_databases/{id_or_name}"),
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                logger.info(f"Deleted database: {id_or_name}")
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Sequin API Error: {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Sequin Error: {e.response.text}")
+        response = await self._request("DELETE", f"/api/postgres_databases/{id_or_name}")
+        await self._invalidate("/api/postgres_databases")
+        logger.info("Deleted Sequin database %s", id_or_name)
+        # Empty when a retry found it already deleted (see call_with_resilience)
+        return response.json() if response.content else {"id": id_or_name, "deleted": True}
             
+    @track_sequin_call("test_connection_db")
     async def test_connection_db(self, database_payload: dict = None):
         """Test connection to a specific database configuration."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self._get_url("/api/postgres_databases/test_connection"),
-                    headers=self._get_headers(),
-                    json=database_payload or {}
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Sequin API Error: {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Sequin Error: {e.response.text}")
+        response = await self._request(
+            "POST",
+            "/api/postgres_databases/test_connection",
+            json=database_payload or {},
+            timeout=TEST_CONNECTION_DB_TIMEOUT,
+            endpoint_class=TEST_CONNECTION_DB,
+        )
+        return response.json()
             
+    @track_sequin_call("refresh_tables")
     async def refresh_tables(self, database_id: str):
         """Refresh tables for a database."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self._get_url(f"/api/postgres_databases/{database_id}/refresh_tables"),
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Sequin API Error: {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Sequin Error: {e.response.text}")
-
-    async def list_sinks(self):
-        """List all sinks from Sequin."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self._get_url("/api/sinks"),
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request(
+            "POST",
+            f"/api/postgres_databases/{database_id}/refresh_tables",
+            timeout=REFRESH_TABLES_TIMEOUT,
+            endpoint_class=REFRESH_TABLES,
+        )
+        await self._invalidate("/api/postgres_databases")
+        return response.json()
+
+    def _bulk_concurrency(self, concurrency: Optional[int]) -> int:
+        requested = concurrency or app_settings.SEQUIN_BULK_CONCURRENCY
+        return min(requested, app_settings.SEQUIN_BULK_MAX_CONCURRENCY)
+
+    async def bulk_create_databases(
+        self,
+        items: List[dict],
+        validate_connection: bool = False,
+        concurrency: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Create many databases with bounded concurrency.
+        With `validate_connection`, each item is checked with test_connection_db
+        right before it is created, so validation also runs in parallel.
+        """
+        async def create_one(item: dict) -> Any:
+            if validate_connection:
+                try:
+                    await self.test_connection_db(item)
+                except Exception as e:
+                    raise StageFailed("validate", e)
+            return await self.create_database(item)
 
+        return await run_bounded(
+            items,
+            create_one,
+            concurrency=self._bulk_concurrency(concurrency),
+            timeout=app_settings.SEQUIN_BULK_ITEM_TIMEOUT,
+            stage="create",
+            key=lambda item: item.get("name"),
+        )
+
+    async def bulk_update_databases(
+        self,
+        items: List[dict],
+        concurrency: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Update many databases with bounded concurrency. Each item carries its `id_or_name`."""
+        async def update_one(item: dict) -> Any:
+            changes = {k: v for k, v in item.items() if k != "id_or_name"}
+            return await self.update_database(item["id_or_name"], changes)
+
+        return await run_bounded(
+            items,
+            update_one,
+            concurrency=self._bulk_concurrency(concurrency),
+            timeout=app_settings.SEQUIN_BULK_ITEM_TIMEOUT,
+            stage="update",
+            key=lambda item: item["id_or_name"],
+        )
+
+    async def bulk_delete_databases(
+        self,
+        ids: List[str],
+        concurrency: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Delete many databases with bounded concurrency."""
+        return await run_bounded(
+            ids,
+            self.delete_database,
+            concurrency=self._bulk_concurrency(concurrency),
+            timeout=app_settings.SEQUIN_BULK_ITEM_TIMEOUT,
+            stage="delete",
+            key=lambda id_or_name: id_or_name,
+        )
+
+    @track_sequin_call("list_sinks")
+    async def list_sinks(self, use_cache: bool = True):
+        """List all sinks from Sequin (`use_cache=False` skips the response cache)."""
+        if use_cache:
+            return await self._cached_get(LIST_SINKS_PATH)
+        return (await self._request("GET", LIST_SINKS_PATH)).json()
+
+    @track_sequin_call("list_sinks")
+    async def list_sinks_raw(self) -> Response:
+        """list_sinks as a pass-through response (see list_databases_raw)."""
+        return (await self._cached_get(LIST_SINKS_PATH, raw=True)).to_response()
+
+    @track_sequin_call("create_sink")
     async def create_sink(self, sink_data: dict):
         """Create a new sink in Sequin."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self._get_url("/api/sinks"),
-                headers=self._get_headers(),
-                json=sink_data
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("POST", "/api/sinks", json=sink_data)
+        await self._invalidate("/api/sinks")
+        return response.json()
 
+    @track_sequin_call("create_backfill")
     async def create_backfill(self, sink_id_or_name: str, backfill_data: dict):
         """Create a backfill for a sink."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self._get_url(f"/api/sinks/{sink_id_or_name}/backfills"),
-                headers=self._get_headers(),
-                json=backfill_data
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("POST", f"/api/sinks/{sink_id_or_name}/backfills", json=backfill_data)
+        return response.json()
+
+    @track_sequin_call("get_backfill")
+    async def get_backfill(self, sink_id_or_name: str, backfill_id: str):
+        """Get a backfill of a sink, including its progress counters."""
+        response = await self._request("GET", f"/api/sinks/{sink_id_or_name}/backfills/{backfill_id}")
+        return response.json()
+
+    @track_sequin_call("update_backfill")
+    async def update_backfill(self, sink_id_or_name: str, backfill_id: str, backfill_data: dict):
+        """Update a backfill of a sink (e.g. {"state": "cancelled"})."""
+        response = await self._request(
+            "PATCH", f"/api/sinks/{sink_id_or_name}/backfills/{backfill_id}", json=backfill_data
+        )
+        return response.json()
+
+
+# Responses cached under the old URL/token must not outlive a settings change
+settings_store.add_listener(lambda _: sequin_cache.clear())
+# Another worker wrote to Sequin
+coordinator.on("sequin_invalidate", lambda event: _drop_local_state(event["prefix"], event["path"]))
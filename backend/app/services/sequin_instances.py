@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.core.http_client import close_instance_client
+from app.models.sequin_instance import SequinInstance
+from app.services.cache import sequin_cache, shared_sequin_cache
+from app.services.coordination import coordinator
+from app.services.sequin import SequinService
+from app.services.sequin_mirror import DATABASES, SINKS, sequin_mirror
+
+logger = logging.getLogger(__name__)
+
+# The Sequin configured in SystemSettings
+DEFAULT_INSTANCE = "default"
+# `instance` value that fans a list read out to every enabled instance
+ALL_INSTANCES = "all"
+
+
+# SequinService methods listing each mirrored resource: (parsed, raw bytes)
+_LIST_METHODS = {
+    DATABASES: ("list_databases", "list_databases_raw"),
+    SINKS: ("list_sinks", "list_sinks_raw"),
+}
+
+
+def _items(response: Any) -> List[Any]:
+    # Sequin lists come as {"data": [...]}; tolerate a bare list as well
+    if isinstance(response, dict):
+        return list(response.get("data") or [])
+    return list(response or [])
+
+
+def ensure_mirrored(instance_id: Optional[str]) -> None:
+    """The local mirror (app.services.sequin_mirror) only covers the default instance."""
+    if instance_id not in (None, DEFAULT_INSTANCE):
+        raise HTTPException(status_code=400, detail="source=mirror is only available for the default Sequin instance")
+
+
+class SequinInstanceRegistry:
+    """
+    Additional Sequin deployments, next to the default one from SystemSettings.
+
+    Each instance gets its own SequinService binding: its own HTTP pool, circuit
+    breaker (keyed by URL) and health status ("sequin:<id>" in the health
+    monitor). Requests are routed by instance ID and list reads can fan out to
+    every enabled instance concurrently.
+
+    The instance rows are kept in memory and re-read at most once per
+    `check_interval` seconds, or right away after a write by this worker.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._instances: Optional[Dict[str, SequinInstance]] = None
+        self._loaded_at = 0.0
+
+    async def all(self, session: AsyncSession) -> Dict[str, SequinInstance]:
+        """Registered instances by ID (detached copies; treat as read-only)."""
+        if self._instances is None or time.monotonic() - self._loaded_at >= self.check_interval:
+            rows = (await session.exec(select(SequinInstance).order_by(SequinInstance.id))).all()
+            self._instances = {row.id: SequinInstance(**row.model_dump()) for row in rows}
+            self._loaded_at = time.monotonic()
+        return self._instances
+
+    def invalidate(self) -> None:
+        self._instances = None
+
+    async def get(self, session: AsyncSession, instance_id: str) -> SequinInstance:
+        instance = (await self.all(session)).get(instance_id)
+        if instance is None:
+            raise HTTPException(status_code=404, detail=f"Sequin instance '{instance_id}' not found")
+        return instance
+
+    async def service(self, session: AsyncSession, instance_id: Optional[str] = None) -> SequinService:
+        """SequinService routed to `instance_id` (the default instance when omitted)."""
+        if instance_id in (None, DEFAULT_INSTANCE):
+            return await SequinService.create(session)
+        if instance_id == ALL_INSTANCES:
+            raise HTTPException(status_code=400, detail="instance=all is only supported for list reads")
+        instance = await self.get(session, instance_id)
+        if not instance.enabled:
+            raise HTTPException(status_code=409, detail=f"Sequin instance '{instance_id}' is disabled")
+        return SequinService(session, instance, instance_id=instance.id)
+
+    async def services(self, session: AsyncSession) -> Dict[str, SequinService]:
+        """A service for the default instance (when configured) and every enabled instance."""
+        services: Dict[str, SequinService] = {}
+        try:
+            services[DEFAULT_INSTANCE] = await SequinService.create(session)
+        except HTTPException:
+            pass  # No default Sequin configured: fan out to the registered instances only
+        for instance in (await self.all(session)).values():
+            if instance.enabled:
+                services[instance.id] = SequinService(session, instance, instance_id=instance.id)
+        return services
+
+    async def fan_out(
+        self,
+        session: AsyncSession,
+        call: Callable[[SequinService], Awaitable[Any]],
+    ) -> Dict[str, Any]:
+        """
+        Run `call` against every instance concurrently and merge the listed items.
+        Every item is tagged with its `instance_id`. An instance that fails is
+        reported under "instances" instead of failing the whole read.
+        """
+        services = await self.services(session)
+        if not services:
+            raise HTTPException(status_code=400, detail="No Sequin instances configured")
+        responses = await asyncio.gather(*(call(service) for service in services.values()), return_exceptions=True)
+
+        data: List[Any] = []
+        instances: Dict[str, Dict[str, Any]] = {}
+        for instance_id, response in zip(services, responses):
+            if isinstance(response, HTTPException):
+                instances[instance_id] = {"ok": False, "status_code": response.status_code, "error": str(response.detail)}
+                continue
+            if isinstance(response, BaseException):
+                instances[instance_id] = {"ok": False, "status_code": 502, "error": repr(response)}
+                continue
+            items = _items(response)
+            # Copies: the parsed responses are shared with the response cache
+            data.extend({**item, "instance_id": instance_id} if isinstance(item, dict) else item for item in items)
+            instances[instance_id] = {"ok": True, "count": len(items)}
+        return {"data": data, "instances": instances}
+
+    async def list_resource(
+        self,
+        session: AsyncSession,
+        resource: str,
+        source: str = "live",
+        instance: Optional[str] = None,
+    ) -> Any:
+        """
+        A databases or sinks listing as the list endpoints serve it: merged across
+        every instance with instance=all, from the local mirror with
+        source=mirror, otherwise live from one instance (Sequin's bytes passed
+        through when SEQUIN_RAW_PASSTHROUGH is on).
+        """
+        parsed, raw = _LIST_METHODS[resource]
+        if instance == ALL_INSTANCES and source == "live":
+            return await self.fan_out(session, lambda service: getattr(service, parsed)())
+        if source == "mirror":
+            ensure_mirrored(instance)
+        service = await self.service(session, instance)
+        if source == "mirror":
+            return await sequin_mirror.read(session, resource, service)
+        if app_settings.SEQUIN_RAW_PASSTHROUGH:
+            return await getattr(service, raw)()
+        return await getattr(service, parsed)()
+
+    async def create(self, session: AsyncSession, data: Dict[str, Any]) -> SequinInstance:
+        if data["id"] in (DEFAULT_INSTANCE, ALL_INSTANCES):
+            raise HTTPException(status_code=400, detail=f"'{data['id']}' is a reserved instance ID")
+        if await session.get(SequinInstance, data["id"]) is not None:
+            raise HTTPException(status_code=409, detail=f"Sequin instance '{data['id']}' already exists")
+        now = datetime.now(timezone.utc)
+        instance = SequinInstance(**data, created_at=now, updated_at=now)
+        session.add(instance)
+        await session.commit()
+        self.invalidate()
+        await coordinator.publish("sequin_instance_changed", instance_id=instance.id, url=instance.sequin_url)
+        return instance
+
+    async def update(self, session: AsyncSession, instance_id: str, changes: Dict[str, Any]) -> SequinInstance:
+        instance = await self._row(session, instance_id)
+        previous_url = instance.sequin_url
+        instance.sqlmodel_update(changes)
+        instance.updated_at = datetime.now(timezone.utc)
+        session.add(instance)
+        await session.commit()
+        await self._release(instance_id, previous_url)
+        return instance
+
+    async def delete(self, session: AsyncSession, instance_id: str) -> None:
+        instance = await self._row(session, instance_id)
+        await session.delete(instance)
+        await session.commit()
+        await self._release(instance_id, instance.sequin_url)
+
+    async def _row(self, session: AsyncSession, instance_id: str) -> SequinInstance:
+        if instance_id == DEFAULT_INSTANCE:
+            raise HTTPException(status_code=400, detail="The default instance is configured in the system settings")
+        instance = await session.get(SequinInstance, instance_id)
+        if instance is None:
+            raise HTTPException(status_code=404, detail=f"Sequin instance '{instance_id}' not found")
+        return instance
+
+    async def _release(self, instance_id: str, url: str, publish: bool = True) -> None:
+        """Drop everything bound to the old URL/token: pool, cached responses and health."""
+        from app.services.health_monitor import health_monitor, instance_probe_name
+
+        self.invalidate()
+        await close_instance_client(instance_id)
+        sequin_cache.invalidate_prefix(url.rstrip("/"))
+        health_monitor.forget(instance_probe_name(instance_id))
+        if publish:
+            await shared_sequin_cache.invalidate_prefix(url.rstrip("/"))
+            await coordinator.publish("sequin_instance_changed", instance_id=instance_id, url=url)
+
+
+sequin_instances = SequinInstanceRegistry(check_interval=app_settings.SETTINGS_VERSION_CHECK_INTERVAL)
+
+# Another worker added, changed or removed an instance
+coordinator.on(
+    "sequin_instance_changed",
+    lambda event: sequin_instances._release(event["instance_id"], event["url"], publish=False),
+)
@@ -0,0 +1,285 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Type
+
+from fastapi import HTTPException
+from sqlalchemy import delete, or_, update
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.models.mirror_state import MirrorSyncState
+from app.services.coordination import coordinator
+from app.models.sequin_database import SequinDatabase
+from app.models.sequin_sink import SequinSink
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+    from app.services.sequin import SequinService
+
+logger = logging.getLogger(__name__)
+
+DATABASES = "databases"
+SINKS = "sinks"
+
+_MODELS: Dict[str, Type[SQLModel]] = {
+    DATABASES: SequinDatabase,
+    SINKS: SequinSink,
+}
+
+# Sequin API path prefix written by each resource, used to map invalidations
+RESOURCE_PATHS = {
+    DATABASES: "/api/postgres_databases",
+    SINKS: "/api/sinks",
+}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone=True columns back without an offset
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return _as_utc(value).isoformat() if value else None
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(item, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _items(payload: Any) -> List[Dict[str, Any]]:
+    """Sequin wraps lists as {"data": [...]}; accept a bare list as well."""
+    if isinstance(payload, dict):
+        payload = payload.get("data", [])
+    return [item for item in payload or [] if isinstance(item, dict) and item.get("id")]
+
+
+def _database_values(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": item.get("name") or "",
+        "hostname": item.get("hostname") or "",
+        "port": item.get("port") or 5432,
+        "database": item.get("database") or "",
+        "username": item.get("username") or "",
+        "password": item.get("password"),
+        "ssl": item.get("ssl", True),
+        "use_local_tunnel": item.get("use_local_tunnel", False),
+        "ipv6": item.get("ipv6", False),
+        "replication_slots": item.get("replication_slots"),
+    }
+
+
+def _sink_values(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": item.get("name"),
+        "type": item.get("type") or (item.get("destination") or {}).get("type"),
+        "status": item.get("status"),
+    }
+
+
+_VALUES = {
+    DATABASES: _database_values,
+    SINKS: _sink_values,
+}
+
+
+class SequinMirror:
+    """
+    Local mirror of Sequin's postgres_databases and sinks.
+
+    `apply` upserts only rows whose content hash changed and deletes rows that
+    disappeared upstream. Reads with `read`/`get_database` are served from the
+    mirror while it is fresher than `max_staleness` and fall back to a live
+    fetch (which also refreshes the mirror) otherwise. Writes through
+    SequinService mark the affected resource stale in this worker. Applies
+    never overlap, so concurrent stale reads cannot insert the same row twice.
+    """
+
+    def __init__(self, interval: float, max_staleness: float):
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self._stale: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self._scheduler: Optional["AsyncIOScheduler"] = None
+
+    def mark_stale(self, resource: str) -> None:
+        self._stale.add(resource)
+
+    def mark_stale_path(self, path: str) -> None:
+        """Mark the resource owning a Sequin API path stale."""
+        for resource, prefix in RESOURCE_PATHS.items():
+            if path.startswith(prefix):
+                self.mark_stale(resource)
+
+    async def apply(self, session: AsyncSession, resource: str, payload: Any) -> Dict[str, int]:
+        """Reconcile the mirror for `resource` with a full Sequin listing."""
+        async with self._lock:
+            return await self._apply(session, resource, payload)
+
+    async def _apply(self, session: AsyncSession, resource: str, payload: Any) -> Dict[str, int]:
+        model = _MODELS[resource]
+        to_values = _VALUES[resource]
+        now = _utcnow()
+
+        existing = {
+            row_id: digest
+            for row_id, digest in (await session.exec(select(model.id, model.content_hash))).all()
+        }
+        stats = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        seen: Set[str] = set()
+
+        for item in _items(payload):
+            row_id = item["id"]
+            seen.add(row_id)
+            digest = content_hash(item)
+            if existing.get(row_id) == digest:
+                stats["unchanged"] += 1
+                continue
+            values = {**to_values(item), "raw": item, "content_hash": digest, "synced_at": now}
+            if row_id in existing:
+                await session.exec(update(model).where(model.id == row_id).values(**values))
+                stats["updated"] += 1
+            else:
+                session.add(model(id=row_id, **values))
+                stats["inserted"] += 1
+
+        removed = [row_id for row_id in existing if row_id not in seen]
+        if removed:
+            await session.exec(delete(model).where(model.id.in_(removed)))
+            stats["deleted"] = len(removed)
+
+        state = await session.get(MirrorSyncState, resource)
+        if state is None:
+            state = MirrorSyncState(resource=resource)
+        state.synced_at = now
+        state.row_count = len(seen)
+        session.add(state)
+        await session.commit()
+
+        self._stale.discard(resource)
+        logger.info(f"Mirror sync {resource}: {stats}")
+        return stats
+
+    async def sync(self, session: AsyncSession, service: "SequinService") -> Dict[str, Dict[str, int]]:
+        """Fetch every resource live from Sequin and reconcile the mirror."""
+        return {
+            DATABASES: await self.apply(session, DATABASES, await service.list_databases(use_cache=False)),
+            SINKS: await self.apply(session, SINKS, await service.list_sinks(use_cache=False)),
+        }
+
+    async def status(self, session: AsyncSession) -> Dict[str, Any]:
+        states = {state.resource: state for state in (await session.exec(select(MirrorSyncState))).all()}
+        return {
+            resource: {
+                "synced_at": _isoformat(states[resource].synced_at) if resource in states else None,
+                "row_count": states[resource].row_count if resource in states else 0,
+                "fresh": await self._is_fresh(session, resource),
+            }
+            for resource in _MODELS
+        }
+
+    async def read(self, session: AsyncSession, resource: str, service: "SequinService") -> Dict[str, Any]:
+        """
+        List `resource` from the mirror, falling back to a live fetch when the
+        mirror is stale. If Sequin is down, stale mirror data is served instead.
+        """
+        state = await session.get(MirrorSyncState, resource)
+        if not await self._is_fresh(session, resource, state):
+            fetch = service.list_databases if resource == DATABASES else service.list_sinks
+            try:
+                payload = await fetch(use_cache=False)
+            except HTTPException:
+                if state is None or state.synced_at is None:
+                    raise
+                logger.warning(f"Live fetch of {resource} failed; serving stale mirror")
+            else:
+                await self.apply(session, resource, payload)
+                return {"data": _items(payload), "synced_at": _isoformat(_utcnow()), "source": "live"}
+
+        model = _MODELS[resource]
+        rows = (await session.exec(select(model.raw).order_by(model.name))).all()
+        return {
+            "data": [raw for raw in rows if raw is not None],
+            "synced_at": _isoformat(state.synced_at),
+            "source": "mirror",
+        }
+
+    async def get_database(self, session: AsyncSession, id_or_name: str, service: "SequinService") -> Dict[str, Any]:
+        """Get one database from the mirror by ID or name, live when stale or unknown."""
+        if await self._is_fresh(session, DATABASES):
+            row = (
+                await session.exec(
+                    select(SequinDatabase).where(
+                        or_(SequinDatabase.id == id_or_name, SequinDatabase.name == id_or_name)
+                    )
+                )
+            ).first()
+            if row is not None and row.raw is not None:
+                return {"data": row.raw, "synced_at": _isoformat(row.synced_at), "source": "mirror"}
+        data = await service.get_database(id_or_name)
+        return {**data, "synced_at": _isoformat(_utcnow()), "source": "live"}
+
+    async def _is_fresh(
+        self,
+        session: AsyncSession,
+        resource: str,
+        state: Optional[MirrorSyncState] = None,
+    ) -> bool:
+        if resource in self._stale:
+            return False
+        if state is None:
+            state = await session.get(MirrorSyncState, resource)
+        if state is None or state.synced_at is None:
+            return False
+        return (_utcnow() - _as_utc(state.synced_at)).total_seconds() < self.max_staleness
+
+    def start(self) -> None:
+        """Start periodic background syncs. Must be called from a running event loop."""
+        if self._scheduler is not None:
+            return
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+        from apscheduler.triggers.interval import IntervalTrigger  # type: ignore
+
+        self._scheduler = AsyncIOScheduler()
+        self._scheduler.add_job(
+            self._scheduled_sync,
+            trigger=IntervalTrigger(seconds=self.interval, jitter=self.interval / 10),
+            id="sequin-mirror-sync",
+            next_run_time=datetime.now(timezone.utc),
+            max_instances=1,
+            coalesce=True,
+        )
+        self._scheduler.start()
+        logger.info(f"Sequin mirror sync started (interval={self.interval}s)")
+
+    def shutdown(self) -> None:
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+        self._scheduler = None
+
+    async def _scheduled_sync(self) -> None:
+        from app.core.database import engine
+        from app.services.sequin import SequinService
+
+        try:
+            # With Redis, only one worker syncs; the mirror tables are shared anyway
+            if not await coordinator.hold_lease("sequin-mirror-sync", max(self.interval * 3, app_settings.REDIS_LEASE_TTL)):
+                return
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                service = await SequinService.create(session)
+                await self.sync(session, service)
+        except Exception as e:
+            logger.warning(f"Scheduled mirror sync failed: {e!r}")
+
+
+sequin_mirror = SequinMirror(
+    interval=app_settings.MIRROR_SYNC_INTERVAL,
+    max_staleness=app_settings.MIRROR_MAX_STALENESS,
+)
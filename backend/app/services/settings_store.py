@@ -0,0 +1,98 @@
+import logging
+import time
+from typing import Callable, List, Optional
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.models.settings import SystemSettings
+from app.services.coordination import coordinator
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class SettingsStore:
+    """
+    Versioned in-memory snapshot of the SystemSettings row.
+
+    The row is loaded once and then only re-read when:
+    - this worker commits an update (`set`), or
+    - a throttled `SELECT version` (at most once per `check_interval` seconds)
+      shows that another worker committed a newer version.
+
+    Snapshots are detached copies, so they are safe to use after the request
+    session is closed. Treat them as read-only.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._snapshot: object = _MISSING
+        self._checked_at = 0.0
+        self._listeners: List[Callable[[Optional[SystemSettings]], None]] = []
+
+    @property
+    def version(self) -> Optional[int]:
+        if isinstance(self._snapshot, SystemSettings):
+            return self._snapshot.version
+        return None
+
+    def add_listener(self, listener: Callable[[Optional[SystemSettings]], None]) -> None:
+        """Register a callback fired whenever the settings version changes."""
+        self._listeners.append(listener)
+
+    async def get(self, session: AsyncSession) -> Optional[SystemSettings]:
+        """Return the current snapshot, loading or re-validating it when due."""
+        if self._snapshot is _MISSING:
+            return await self.reload(session)
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            current = (await session.exec(select(SystemSettings.version))).first()
+            self._checked_at = time.monotonic()
+            if current != self.version:
+                logger.info(f"Settings version changed ({self.version} -> {current}). Reloading.")
+                return await self.reload(session)
+        return self._snapshot  # type: ignore[return-value]
+
+    async def reload(self, session: AsyncSession) -> Optional[SystemSettings]:
+        row = (await session.exec(select(SystemSettings))).first()
+        self._publish(self._copy(row))
+        return self._snapshot  # type: ignore[return-value]
+
+    def set(self, row: SystemSettings) -> None:
+        """Replace the snapshot with a freshly committed row."""
+        self._publish(self._copy(row))
+
+    def invalidate(self) -> None:
+        """Force the next `get` to reload from the database."""
+        self._snapshot = _MISSING
+
+    def expire(self) -> None:
+        """Check the version on the next `get`, e.g. when another worker reported a change."""
+        self._checked_at = 0.0
+
+    def _publish(self, snapshot: Optional[SystemSettings]) -> None:
+        # Listeners only care about committed setting changes, not the first load
+        # or rewrites of status columns that keep the same version.
+        changed = self._snapshot is not _MISSING and (
+            snapshot is None or self.version != snapshot.version
+        )
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        if changed:
+            for listener in self._listeners:
+                listener(snapshot)
+
+    @staticmethod
+    def _copy(row: Optional[SystemSettings]) -> Optional[SystemSettings]:
+        if row is None:
+            return None
+        return SystemSettings(**row.model_dump())
+
+
+# Shared by every request in this worker
+settings_store = SettingsStore(check_interval=app_settings.SETTINGS_VERSION_CHECK_INTERVAL)
+
+# Another worker committed new settings: pick them up now instead of at the next version check
+coordinator.on("settings_changed", lambda _: settings_store.expire())
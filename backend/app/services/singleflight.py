@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls into one.
+
+    The first caller for a key starts the work; callers that arrive while it is
+    still running await the same task and receive its result (or exception).
+    The task is shielded so one caller disconnecting does not cancel the
+    upstream call for everybody else.
+
+    After a write, `forget(prefix)` fences the calls in flight under `prefix`:
+    their current callers still get their result, but later callers start a
+    fresh call instead of joining one that began before the write.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[str, "asyncio.Task[Any]"] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executed += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: "asyncio.Task[Any]") -> None:
+        # The key may already belong to a newer call if this one was forgotten
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def forget(self, prefix: str) -> None:
+        """Stop new callers from joining the calls in flight whose key starts with `prefix`."""
+        for key in [k for k in self._in_flight if k.startswith(prefix)]:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Shared by all SequinService instances in this worker
+sequin_flights = SingleFlight()
@@ -0,0 +1,256 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+_PLAIN_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*$")
+
+
+@dataclass
+class ColumnSpec:
+    """
+    A source column. `nullable` is the source's nullability, reported back to
+    the client but deliberately not carried into the target DDL: non-key
+    columns are filled through lenient TRY_ casts, and a CDC MERGE may see
+    partial row images, so only key columns are NOT NULL.
+    """
+    name: str
+    pg_type: str
+    primary_key: bool = False
+    nullable: bool = True
+
+
+@dataclass
+class PipelineNames:
+    landing_table: str
+    stream: str
+    task: str
+    target_table: str
+    warehouse: str
+    schedule: str
+
+
+def quote_ident(name: str) -> str:
+    """Snowflake identifier: bare (upper-cased) when plain, double-quoted otherwise."""
+    if _PLAIN_IDENTIFIER.match(name):
+        return name.upper()
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _qualified(*parts: str) -> str:
+    return ".".join(quote_ident(part) for part in parts)
+
+
+def _json_key(name: str) -> str:
+    # Path segments into PAYLOAD keep the source column's exact case
+    if _PLAIN_IDENTIFIER.match(name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def map_type(pg_type: str, strict: bool = False) -> Tuple[str, str]:
+    """
+    Snowflake column type for a Postgres type (as printed by format_type), and
+    the expression template that converts a value `{v}` extracted from the
+    change event. Temporal encodings follow the landing data: dates as days since
+    the epoch and timestamps as epoch milliseconds.
+
+    Lenient conversions use TRY_ functions and give NULL for values they cannot
+    read; with `strict` (key columns) they fail the load instead.
+    """
+    t = pg_type.lower().strip()
+    if t.endswith("[]"):
+        return "ARRAY", "{v}::array"
+    numeric = re.match(r"^(?:numeric|decimal)\((\d+),\s*(\d+)\)$", t)
+    if numeric:
+        precision, scale = (int(group) for group in numeric.groups())
+        # Snowflake's NUMBER stops at 38 digits; wider values are kept exactly as text
+        if precision > 38 or scale > min(precision, 37):
+            return "VARCHAR", "{v}::string"
+        return f"NUMBER({precision},{scale})", f"{{v}}::number({precision},{scale})"
+    if t in ("smallint", "integer", "bigint", "int", "int2", "int4", "int8", "smallserial", "serial", "bigserial"):
+        return "NUMBER(38,0)", "{v}::number"
+    if t in ("numeric", "decimal", "money"):
+        return "NUMBER(38,10)", "{v}::number(38,10)"
+    if t in ("real", "double precision", "float4", "float8"):
+        return "FLOAT", "{v}::float"
+    if t in ("boolean", "bool"):
+        return "BOOLEAN", "{v}::boolean"
+    if t == "date":
+        return "DATE", "DATEADD('day', TO_NUMBER({v}::string), DATE '1970-01-01')"
+    if t == "timestamptz" or (t.startswith("timestamp") and "with time zone" in t):
+        return "TIMESTAMP_TZ", f"{'' if strict else 'TRY_'}TO_TIMESTAMP_TZ({{v}}::string)"
+    if t.startswith("timestamp"):
+        return "TIMESTAMP_NTZ", "TO_TIMESTAMP_NTZ(TO_NUMBER({v}::string) / 1000)"
+    if t in ("json", "jsonb"):
+        return "VARIANT", f"{'' if strict else 'TRY_'}PARSE_JSON({{v}}::string)"
+    return "VARCHAR", "{v}::string"
+
+
+def generate_pipeline(columns: List[ColumnSpec], names: PipelineNames) -> List[str]:
+    """
+    DDL for an incremental CDC pipeline from a Kafka landing table (written by
+    the Snowflake Kafka connector: PAYLOAD holds the change event,
+    RECORD_METADATA the Kafka coordinates):
+
+    1. a typed target table keyed like the source,
+    2. an append-only stream on the landing table, so each run only sees new events,
+    3. a task that MERGEs the latest event per key into the target
+       (deduplicated with QUALIFY ROW_NUMBER()) when the stream has data,
+    4. resuming the task.
+
+    Every column is read once from a single row image (after, or before for
+    deletes), so the cost of a run follows the size of the change batch.
+    """
+    if not columns:
+        raise HTTPException(status_code=422, detail="Table has no columns")
+    keys = [column for column in columns if column.primary_key]
+    if not keys:
+        raise HTTPException(status_code=422, detail="Table needs a primary key for an incremental MERGE")
+
+    typed = [(column, *map_type(column.pg_type, strict=column.primary_key)) for column in columns]
+
+    # Only key columns are NOT NULL: other values go through lenient casts that may yield NULL
+    definitions = [
+        f"    {quote_ident(column.name)} {sf_type}{' NOT NULL' if column.primary_key else ''}"
+        for column, sf_type, _ in typed
+    ]
+    definitions.append(f"    PRIMARY KEY ({', '.join(quote_ident(k.name) for k in keys)})")
+    create_table = (
+        f"CREATE TABLE IF NOT EXISTS {names.target_table} (\n" + ",\n".join(definitions) + "\n)"
+    )
+
+    create_stream = (
+        f"CREATE STREAM IF NOT EXISTS {names.stream} ON TABLE {names.landing_table} APPEND_ONLY = TRUE"
+    )
+
+    extracted = ",\n".join(
+        f"            {cast.format(v='ROW_IMAGE:' + _json_key(column.name))} AS {quote_ident(column.name)}"
+        for column, _, cast in typed
+    )
+    partition_by = ", ".join(quote_ident(k.name) for k in keys)
+    source = (
+        "    SELECT *\n"
+        "    FROM (\n"
+        "        SELECT\n"
+        "            OP,\n"
+        f"{extracted},\n"
+        "            EVENT_CREATE_TIME, EVENT_PARTITION, EVENT_OFFSET\n"
+        "        FROM (\n"
+        "            SELECT\n"
+        "                PAYLOAD:op::string AS OP,\n"
+        "                IFF(PAYLOAD:op::string = 'd', PAYLOAD:before, PAYLOAD:after) AS ROW_IMAGE,\n"
+        "                RECORD_METADATA:CreateTime::number AS EVENT_CREATE_TIME,\n"
+        "                RECORD_METADATA:partition::number AS EVENT_PARTITION,\n"
+        "                RECORD_METADATA:offset::number AS EVENT_OFFSET\n"
+        f"            FROM {names.stream}\n"
+        "            WHERE PAYLOAD IS NOT NULL\n"
+        "        )\n"
+        "    )\n"
+        "    QUALIFY ROW_NUMBER() OVER (\n"
+        f"        PARTITION BY {partition_by}\n"
+        "        ORDER BY EVENT_CREATE_TIME DESC, EVENT_PARTITION DESC, EVENT_OFFSET DESC\n"
+        "    ) = 1"
+    )
+    on = " AND ".join(f"T.{quote_ident(k.name)} = S.{quote_ident(k.name)}" for k in keys)
+    non_keys = [column for column in columns if not column.primary_key]
+    all_names = [quote_ident(column.name) for column in columns]
+    merge_clauses = [
+        "WHEN MATCHED AND S.OP = 'd' THEN DELETE",
+    ]
+    if non_keys:
+        assignments = ",\n    ".join(
+            f"{quote_ident(c.name)} = S.{quote_ident(c.name)}" for c in non_keys
+        )
+        merge_clauses.append(f"WHEN MATCHED AND S.OP <> 'd' THEN UPDATE SET\n    {assignments}")
+    merge_clauses.append(
+        "WHEN NOT MATCHED AND S.OP <> 'd' THEN INSERT (\n    "
+        + ", ".join(all_names)
+        + "\n) VALUES (\n    "
+        + ", ".join(f"S.{name}" for name in all_names)
+        + "\n)"
+    )
+    merge = (
+        f"MERGE INTO {names.target_table} T\nUSING (\n{source}\n) S\nON {on}\n"
+        + "\n".join(merge_clauses)
+    )
+    create_task = (
+        f"CREATE OR REPLACE TASK {names.task}\n"
+        f"    WAREHOUSE = {quote_ident(names.warehouse)}\n"
+        f"    SCHEDULE = {_quote_literal(names.schedule)}\n"
+        f"    WHEN SYSTEM$STREAM_HAS_DATA({_quote_literal(names.stream)})\n"
+        f"AS\n{merge}"
+    )
+    resume_task = f"ALTER TASK {names.task} RESUME"
+    return [create_table, create_stream, create_task, resume_task]
+
+
+def pipeline_names(
+    table: str,
+    landing_database: str,
+    landing_schema: str,
+    target_database: str,
+    target_schema: str,
+    warehouse: str,
+    schedule: str,
+    target_table: Optional[str] = None,
+) -> PipelineNames:
+    """Object names following the existing <TABLE>_LANDING / STR_ / TASK_ convention."""
+    base = (target_table or table).upper()
+    return PipelineNames(
+        landing_table=_qualified(landing_database, landing_schema, f"{base}_LANDING"),
+        stream=_qualified(landing_database, landing_schema, f"STR_{base}_LANDING"),
+        task=_qualified(landing_database, landing_schema, f"TASK_{base}_CDC"),
+        target_table=_qualified(target_database, target_schema, base),
+        warehouse=warehouse,
+        schedule=schedule,
+    )
+
+
+_COLUMNS_QUERY = """
+SELECT a.attname,
+       format_type(a.atttypid, a.atttypmod),
+       a.attnotnull,
+       EXISTS (
+           SELECT 1 FROM pg_index i
+           WHERE i.indrelid = c.oid AND i.indisprimary AND a.attnum = ANY(i.indkey)
+       )
+FROM pg_attribute a
+JOIN pg_class c ON c.oid = a.attrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = $1 AND c.relname = $2 AND a.attnum > 0 AND NOT a.attisdropped
+ORDER BY a.attnum
+"""
+
+
+async def introspect_postgres(connection: Dict[str, Any], schema: str, table: str) -> List[ColumnSpec]:
+    """Read a table's columns and primary key from the source Postgres catalog."""
+    import asyncpg  # type: ignore
+
+    try:
+        conn = await asyncpg.connect(
+            host=connection["hostname"],
+            port=connection.get("port") or 5432,
+            database=connection["database"],
+            user=connection["username"],
+            password=connection.get("password"),
+            ssl="require" if connection.get("ssl") else None,
+            timeout=10,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Could not connect to source database: {e}")
+    try:
+        rows = await conn.fetch(_COLUMNS_QUERY, schema, table)
+    finally:
+        await conn.close()
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Table {schema}.{table} not found")
+    return [
+        ColumnSpec(name=name, pg_type=pg_type, nullable=not not_null, primary_key=is_pk)
+        for name, pg_type, not_null, is_pk in rows
+    ]
@@ -0,0 +1,219 @@
+import asyncio
+import itertools
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from fastapi import HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.services.sequin_mirror import DATABASES, SINKS, _items
+
+logger = logging.getLogger(__name__)
+
+HEALTH = "health"
+KAFKA_LAG = "kafka_lag"
+
+State = Dict[str, Dict[str, Any]]
+
+
+def diff_state(previous: State, current: State) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-topic changes between two states ({topic: {key: value}}):
+    {topic: {"upserted": {key: value}, "removed": [key, ...]}}. Unchanged topics are omitted.
+    """
+    changes: Dict[str, Dict[str, Any]] = {}
+    for topic in current.keys() | previous.keys():
+        before = previous.get(topic, {})
+        after = current.get(topic, {})
+        upserted = {key: value for key, value in after.items() if before.get(key) != value}
+        removed = [key for key in before if key not in after]
+        if upserted or removed:
+            changes[topic] = {"upserted": upserted, "removed": removed}
+    return changes
+
+
+def format_event(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _lag_summary(latest: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # Per-partition detail changes on every sample; clients only get group/topic totals
+    if not latest:
+        return {}
+    return {
+        group: {"lag": data["lag"], "topics": {topic: t["lag"] for topic, t in data["topics"].items()}}
+        for group, data in latest["groups"].items()
+    }
+
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class StatusBroadcaster:
+    """
+    Fans one server-side poll of pipeline status out to every connected client.
+
+    The poll (Sequin databases and sinks through the shared response cache,
+    health monitor results and Kafka lag totals) only runs while someone is
+    subscribed. Each poll publishes a single "diff" event with what changed;
+    writes through SequinService wake the poller early, and wake-ups within
+    `coalesce_window` collapse into one poll. Each client has a bounded queue:
+    a client that falls `queue_size` events behind is dropped and told to
+    reconnect, rather than buffering without limit.
+    """
+
+    def __init__(self, interval: float, coalesce_window: float, queue_size: int, heartbeat: float):
+        self.interval = interval
+        self.coalesce_window = coalesce_window
+        self.queue_size = max(queue_size, 2)
+        self.heartbeat = heartbeat
+        self._subscribers: Set[Subscriber] = set()
+        self._state: State = {}
+        self._event_ids = itertools.count(1)
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.dropped_count = 0
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        if self._state:
+            subscriber.queue.put_nowait(format_event("snapshot", self._state, next(self._event_ids)))
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._wake.set()
+            self._task = asyncio.create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def notify(self) -> None:
+        """Poll soon instead of waiting for the next interval (e.g. after a write)."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stream(self) -> AsyncIterator[str]:
+        """Server-Sent Events for one client: a snapshot, then diffs and keep-alives."""
+        subscriber = self.subscribe()
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def publish(self, event: str, data: Any) -> None:
+        message = format_event(event, data, next(self._event_ids))
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        # Replace the backlog with a final notice so the client resyncs on reconnect
+        self._subscribers.discard(subscriber)
+        subscriber.dropped = True
+        self.dropped_count += 1
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(format_event("dropped", {"reason": "client too slow"}))
+        subscriber.queue.put_nowait(None)
+        logger.info("Dropped slow status stream client")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "dropped": self.dropped_count,
+            "polling": self._task is not None and not self._task.done(),
+        }
+
+    async def shutdown(self) -> None:
+        for subscriber in list(self._subscribers):
+            self._subscribers.discard(subscriber)
+            try:
+                subscriber.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._state = {}
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while self._subscribers:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+                # Let a burst of writes settle into a single poll
+                await asyncio.sleep(self.coalesce_window)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self._subscribers:
+                break
+            try:
+                state = await self._poll()
+            except Exception as e:
+                logger.warning(f"Status stream poll failed: {e!r}")
+                continue
+            if not self._state:
+                self._state = state
+                self.publish("snapshot", state)
+                continue
+            changes = diff_state(self._state, state)
+            self._state = state
+            if changes:
+                self.publish("diff", changes)
+        # Nobody is listening: the next subscriber starts from a fresh snapshot
+        self._state = {}
+
+    async def _poll(self) -> State:
+        from app.core.database import engine
+        from app.services.health_monitor import health_monitor
+        from app.services.kafka_lag import kafka_lag_collector
+        from app.services.sequin import SequinService
+
+        state: State = {
+            HEALTH: health_monitor.snapshot(),
+            KAFKA_LAG: _lag_summary(kafka_lag_collector.latest),
+        }
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                service = await SequinService.create(session)
+                state[DATABASES] = {item["id"]: item for item in _items(await service.list_databases())}
+                state[SINKS] = {item["id"]: item for item in _items(await service.list_sinks())}
+        except HTTPException as e:
+            # Keep the last known lists rather than telling clients everything was removed
+            logger.warning(f"Status stream could not list Sequin resources: {e.detail}")
+        for topic in (DATABASES, SINKS):
+            state.setdefault(topic, self._state.get(topic, {}))
+        return state
+
+
+status_broadcaster = StatusBroadcaster(
+    interval=app_settings.STATUS_STREAM_INTERVAL,
+    coalesce_window=app_settings.STATUS_STREAM_COALESCE_WINDOW,
+    queue_size=app_settings.STATUS_STREAM_QUEUE_SIZE,
+    heartbeat=app_settings.STATUS_STREAM_HEARTBEAT,
+)
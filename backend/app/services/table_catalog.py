@@ -0,0 +1,436 @@
+import hashlib
+import json
+import logging
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.models.sequin_database import SequinDatabase
+from app.models.table_catalog import CatalogTable, SchemaChangeEvent
+from app.services.coordination import coordinator
+from app.services.status_stream import status_broadcaster
+
+if TYPE_CHECKING:
+    from app.services.sequin import SequinService
+
+logger = logging.getLogger(__name__)
+
+ADDED = "added"
+ALTERED = "altered"
+REMOVED = "removed"
+
+# Catalog key: (Sequin instance ID, Sequin database ID)
+CatalogKey = Tuple[str, str]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _column(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": item["name"],
+        "type": item.get("type") or item.get("data_type"),
+        "attnum": item.get("attnum"),
+        "is_pk": bool(item.get("is_pk?", item.get("is_pk", False))),
+    }
+
+
+def normalize_tables(payload: Any) -> Optional[List[Dict[str, Any]]]:
+    """
+    Tables from a refresh_tables or database response, as
+    [{"schema_name", "table_name", "oid", "columns"}]; None when the payload
+    carries no table list at all.
+    """
+    if isinstance(payload, dict) and isinstance(payload.get("data"), (dict, list)):
+        payload = payload["data"]
+    if isinstance(payload, dict):
+        payload = payload.get("tables")
+    if not isinstance(payload, list):
+        return None
+
+    tables: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for item in payload:
+        if not isinstance(item, dict):
+            continue
+        name = item.get("name") or item.get("table_name")
+        if not name:
+            continue
+        schema = item.get("schema") or item.get("schema_name") or "public"
+        columns = [_column(c) for c in item.get("columns") or [] if isinstance(c, dict) and c.get("name")]
+        columns.sort(key=lambda c: (c["attnum"] is None, c["attnum"] or 0, c["name"]))
+        tables[(schema, name)] = {"schema_name": schema, "table_name": name, "oid": item.get("oid"), "columns": columns}
+    return list(tables.values())
+
+
+def table_fingerprint(table: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps([table["oid"], table["columns"]], sort_keys=True).encode()).hexdigest()
+
+
+def column_diff(before: Optional[List[Dict[str, Any]]], after: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Columns added, removed and changed (type or primary key) between two column lists."""
+    old = {column["name"]: column for column in before or []}
+    new = {column["name"]: column for column in after or []}
+    changed = {}
+    for name in old.keys() & new.keys():
+        fields = {
+            field: [old[name].get(field), new[name].get(field)]
+            for field in ("type", "is_pk")
+            if old[name].get(field) != new[name].get(field)
+        }
+        if fields:
+            changed[name] = fields
+    return {
+        "added": [name for name in new if name not in old],
+        "removed": [name for name in old if name not in new],
+        "changed": dict(sorted(changed.items())),
+    }
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CatalogIndex:
+    """
+    Search index over the qualified table names ("schema.table") of one database.
+
+    Prefix search bisects a sorted list holding both the qualified and the bare
+    table name of every table; substring search narrows candidates with a
+    trigram index before checking them (queries under three characters scan).
+    Results are table IDs ordered by qualified name.
+    """
+
+    def __init__(self, tables: Iterable[Tuple[int, str, str]]):
+        self.names: Dict[int, str] = {}
+        self.schemas: Dict[int, str] = {}
+        self._trigrams: Dict[str, Set[int]] = defaultdict(set)
+        entries = []
+        for table_id, schema, table in tables:
+            qualified = f"{schema}.{table}"
+            self.names[table_id] = qualified
+            self.schemas[table_id] = schema
+            entries.extend([(qualified.lower(), table_id), (table.lower(), table_id)])
+            for gram in _trigrams(qualified.lower()):
+                self._trigrams[gram].add(table_id)
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._ids = [table_id for _, table_id in entries]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _ordered(self, ids: Iterable[int]) -> List[int]:
+        return sorted(ids, key=self.names.__getitem__)
+
+    def all(self) -> List[int]:
+        return self._ordered(self.names)
+
+    def prefix(self, query: str) -> List[int]:
+        query = query.lower()
+        found: Set[int] = set()
+        for position in range(bisect_left(self._keys, query), len(self._keys)):
+            if not self._keys[position].startswith(query):
+                break
+            found.add(self._ids[position])
+        return self._ordered(found)
+
+    def substring(self, query: str) -> List[int]:
+        query = query.lower()
+        grams = _trigrams(query)
+        if grams:
+            candidates = set.intersection(*(self._trigrams.get(gram, set()) for gram in grams))
+        else:
+            candidates = set(self.names)
+        return self._ordered(table_id for table_id in candidates if query in self.names[table_id].lower())
+
+
+class TableCatalog:
+    """
+    Persisted catalog of the schemas, tables and columns of each Sequin database,
+    filled from refresh_tables responses.
+
+    Every table carries a fingerprint of its OID and column definitions; a
+    refresh only rewrites tables whose fingerprint changed, deletes tables that
+    disappeared and records one SchemaChangeEvent per added, altered or removed
+    table. The first refresh of a database is the baseline and records no events.
+
+    Searches are served from an in-memory CatalogIndex per database, built from
+    the catalog on first use and dropped when tables are added or removed (in
+    every worker, through the coordinator). At most `max_indexes` are kept.
+    """
+
+    def __init__(self, max_indexes: int):
+        self.max_indexes = max_indexes
+        self._indexes: "OrderedDict[CatalogKey, CatalogIndex]" = OrderedDict()
+
+    async def resolve_database_id(
+        self,
+        session: AsyncSession,
+        service: "SequinService",
+        id_or_name: str,
+        mirrored: bool,
+    ) -> str:
+        """
+        Sequin's ID for a database given by ID or name: the catalog is keyed by
+        ID only. Looked up in the local mirror when it covers the instance
+        (`mirrored`), otherwise read from Sequin.
+        """
+        if mirrored:
+            found = (
+                await session.exec(
+                    select(SequinDatabase.id).where(
+                        or_(SequinDatabase.id == id_or_name, SequinDatabase.name == id_or_name)
+                    )
+                )
+            ).first()
+            if found:
+                return found
+        database = await service.get_database(id_or_name)
+        if isinstance(database, dict) and isinstance(database.get("data"), dict):
+            database = database["data"]
+        if isinstance(database, dict) and isinstance(database.get("id"), str):
+            return database["id"]
+        raise HTTPException(status_code=502, detail=f"Sequin returned no ID for database {id_or_name}")
+
+    async def refresh(
+        self,
+        session: AsyncSession,
+        service: "SequinService",
+        database_id: str,
+        response: Any,
+        instance_id: str,
+    ) -> Optional[Dict[str, int]]:
+        """
+        Update the catalog of `database_id` (a resolved Sequin ID) from a
+        refresh_tables response, reading the database from Sequin when the
+        response has no table list. None if neither has one.
+        """
+        tables = normalize_tables(response)
+        if tables is None:
+            tables = normalize_tables(await service.get_database(database_id))
+        if tables is None:
+            logger.info(f"No table list for database {database_id}; catalog not updated")
+            return None
+        return await self.apply(session, instance_id, database_id, tables)
+
+    async def apply(
+        self,
+        session: AsyncSession,
+        instance_id: str,
+        database_id: str,
+        tables: List[Dict[str, Any]],
+    ) -> Dict[str, int]:
+        """Reconcile the catalog of one database with a full table list."""
+        now = _utcnow()
+        scope = (CatalogTable.instance_id == instance_id, CatalogTable.database_id == database_id)
+        existing = {
+            (schema, table): (table_id, fingerprint)
+            for table_id, schema, table, fingerprint in (
+                await session.exec(
+                    select(CatalogTable.id, CatalogTable.schema_name, CatalogTable.table_name, CatalogTable.fingerprint)
+                    .where(*scope)
+                )
+            ).all()
+        }
+        baseline = not existing
+        stats = {ADDED: 0, ALTERED: 0, REMOVED: 0, "unchanged": 0}
+        events: List[SchemaChangeEvent] = []
+
+        def record(schema: str, table: str, change: str, details: Optional[Dict[str, Any]] = None) -> None:
+            stats[change] += 1
+            if not baseline:
+                events.append(SchemaChangeEvent(
+                    instance_id=instance_id, database_id=database_id, schema_name=schema,
+                    table_name=table, change=change, details=details, detected_at=now,
+                ))
+
+        seen: Set[Tuple[str, str]] = set()
+        altered: Dict[int, Tuple[Dict[str, Any], str]] = {}
+        for table in tables:
+            key = (table["schema_name"], table["table_name"])
+            seen.add(key)
+            fingerprint = table_fingerprint(table)
+            current = existing.get(key)
+            if current is None:
+                session.add(CatalogTable(
+                    instance_id=instance_id, database_id=database_id, **table,
+                    fingerprint=fingerprint, updated_at=now,
+                ))
+                record(*key, ADDED, {"columns": [column["name"] for column in table["columns"]]})
+            elif current[1] != fingerprint:
+                altered[current[0]] = (table, fingerprint)
+            else:
+                stats["unchanged"] += 1
+
+        if altered:
+            for row in (await session.exec(select(CatalogTable).where(CatalogTable.id.in_(list(altered))))).all():
+                table, fingerprint = altered[row.id]
+                details = column_diff(row.columns, table["columns"])
+                if row.oid is not None and table["oid"] is not None and row.oid != table["oid"]:
+                    details["recreated"] = True
+                row.oid = table["oid"]
+                row.columns = table["columns"]
+                row.fingerprint = fingerprint
+                row.updated_at = now
+                session.add(row)
+                record(row.schema_name, row.table_name, ALTERED, details)
+
+        removed = {key: value[0] for key, value in existing.items() if key not in seen}
+        if removed:
+            await session.exec(delete(CatalogTable).where(CatalogTable.id.in_(list(removed.values()))))
+            for key in removed:
+                record(*key, REMOVED)
+
+        session.add_all(events)
+        await session.commit()
+
+        if stats[ADDED] or stats[REMOVED]:
+            self.drop_index(instance_id, database_id)
+            await coordinator.publish("catalog_changed", instance_id=instance_id, database_id=database_id)
+        if events:
+            status_broadcaster.publish("schema_change", {
+                "instance_id": instance_id,
+                "database_id": database_id,
+                **{change: stats[change] for change in (ADDED, ALTERED, REMOVED)},
+            })
+        logger.info(f"Catalog refresh {instance_id}/{database_id}: {stats}")
+        return stats
+
+    def drop_index(self, instance_id: str, database_id: str) -> None:
+        self._indexes.pop((instance_id, database_id), None)
+
+    async def _index(self, session: AsyncSession, instance_id: str, database_id: str) -> CatalogIndex:
+        key = (instance_id, database_id)
+        index = self._indexes.get(key)
+        if index is None:
+            rows = (
+                await session.exec(
+                    select(CatalogTable.id, CatalogTable.schema_name, CatalogTable.table_name)
+                    .where(CatalogTable.instance_id == instance_id, CatalogTable.database_id == database_id)
+                )
+            ).all()
+            index = CatalogIndex(rows)
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(key)
+        return index
+
+    async def search(
+        self,
+        session: AsyncSession,
+        instance_id: str,
+        database_id: str,
+        query: Optional[str] = None,
+        mode: str = "prefix",
+        schema: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """One page of the tables whose qualified or bare name matches `query`."""
+        index = await self._index(session, instance_id, database_id)
+        if not query:
+            ids = index.all()
+        elif mode == "substring":
+            ids = index.substring(query)
+        else:
+            ids = index.prefix(query)
+        if schema is not None:
+            ids = [table_id for table_id in ids if index.schemas[table_id] == schema]
+
+        page = ids[offset:offset + limit]
+        rows = {
+            row.id: row
+            for row in (await session.exec(select(CatalogTable).where(CatalogTable.id.in_(page)))).all()
+        } if page else {}
+        return {
+            "total": len(ids),
+            "limit": limit,
+            "offset": offset,
+            "items": [_summary(rows[table_id]) for table_id in page if table_id in rows],
+        }
+
+    async def schemas(self, session: AsyncSession, instance_id: str, database_id: str) -> List[Dict[str, Any]]:
+        rows = (
+            await session.exec(
+                select(CatalogTable.schema_name, func.count())
+                .where(CatalogTable.instance_id == instance_id, CatalogTable.database_id == database_id)
+                .group_by(CatalogTable.schema_name)
+                .order_by(CatalogTable.schema_name)
+            )
+        ).all()
+        return [{"schema_name": schema, "table_count": count} for schema, count in rows]
+
+    async def get_table(
+        self,
+        session: AsyncSession,
+        instance_id: str,
+        database_id: str,
+        schema: str,
+        table: str,
+    ) -> Dict[str, Any]:
+        row = (
+            await session.exec(
+                select(CatalogTable).where(
+                    CatalogTable.instance_id == instance_id,
+                    CatalogTable.database_id == database_id,
+                    CatalogTable.schema_name == schema,
+                    CatalogTable.table_name == table,
+                )
+            )
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Table {schema}.{table} is not in the catalog of {database_id}")
+        return {**_summary(row), "columns": row.columns or [], "fingerprint": row.fingerprint}
+
+    async def changes(
+        self,
+        session: AsyncSession,
+        instance_id: str,
+        database_id: str,
+        since: Optional[datetime] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Schema change events of one database, newest first."""
+        conditions = [SchemaChangeEvent.instance_id == instance_id, SchemaChangeEvent.database_id == database_id]
+        if since is not None:
+            conditions.append(SchemaChangeEvent.detected_at > since)
+        total = (await session.exec(select(func.count()).select_from(SchemaChangeEvent).where(*conditions))).one()
+        events = (
+            await session.exec(
+                select(SchemaChangeEvent)
+                .where(*conditions)
+                .order_by(SchemaChangeEvent.detected_at.desc(), SchemaChangeEvent.id.desc())
+                .offset(offset)
+                .limit(limit)
+            )
+        ).all()
+        return {"total": total, "limit": limit, "offset": offset, "items": [event.model_dump() for event in events]}
+
+
+def _summary(row: CatalogTable) -> Dict[str, Any]:
+    return {
+        "schema_name": row.schema_name,
+        "table_name": row.table_name,
+        "oid": row.oid,
+        "column_count": len(row.columns or []),
+        "updated_at": row.updated_at,
+    }
+
+
+table_catalog = TableCatalog(max_indexes=app_settings.CATALOG_INDEX_MAX_DATABASES)
+
+# Another worker added or removed tables: rebuild the search index on next use
+coordinator.on(
+    "catalog_changed",
+    lambda event: table_catalog.drop_index(event["instance_id"], event["database_id"]),
+)
@@ -0,0 +1,314 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.models.sequin_database import SequinDatabase
+from app.services.coordination import coordinator
+from app.services.kafka_lag import LagSeries
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+WARNING = "warning"
+CRITICAL = "critical"
+
+# One round trip per source: the WAL position plus every slot, joined to its
+# walsender (if any) for the flush lag Postgres itself reports. The outer join
+# keeps the WAL position when the source has no slots.
+SLOTS_QUERY = """
+SELECT
+    CASE WHEN pg_is_in_recovery() THEN pg_last_wal_receive_lsn() ELSE pg_current_wal_lsn() END::text AS current_lsn,
+    s.slot_name,
+    s.plugin,
+    s.slot_type,
+    s.active,
+    s.wal_status,
+    s.restart_lsn::text AS restart_lsn,
+    s.confirmed_flush_lsn::text AS confirmed_flush_lsn,
+    pg_wal_lsn_diff(
+        CASE WHEN pg_is_in_recovery() THEN pg_last_wal_receive_lsn() ELSE pg_current_wal_lsn() END,
+        s.restart_lsn
+    )::bigint AS retained_bytes,
+    pg_wal_lsn_diff(
+        CASE WHEN pg_is_in_recovery() THEN pg_last_wal_receive_lsn() ELSE pg_current_wal_lsn() END,
+        s.confirmed_flush_lsn
+    )::bigint AS flush_lag_bytes,
+    EXTRACT(EPOCH FROM r.flush_lag)::float8 AS reported_flush_lag_seconds
+FROM (SELECT 1) AS position
+LEFT JOIN pg_replication_slots s ON true
+LEFT JOIN pg_stat_replication r ON r.pid = s.active_pid
+ORDER BY s.slot_name
+"""
+
+
+def _isoformat(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def _fingerprint(source: SequinDatabase) -> Tuple[Any, ...]:
+    return (source.hostname, source.port, source.database, source.username, source.password, source.ssl)
+
+
+def slot_alerts(
+    source: str,
+    slot: Dict[str, Any],
+    retained_thresholds: Tuple[int, int],
+    flush_lag_thresholds: Tuple[float, float],
+) -> List[Dict[str, Any]]:
+    """Threshold alerts for one sampled slot, most severe first."""
+    alerts = []
+
+    def check(metric: str, value: Optional[float], thresholds: Tuple[float, float]) -> None:
+        if value is None:
+            return
+        warning, critical = thresholds
+        severity = CRITICAL if value >= critical else WARNING if value >= warning else None
+        if severity:
+            alerts.append({
+                "source": source,
+                "slot": slot["slot_name"],
+                "metric": metric,
+                "severity": severity,
+                "value": value,
+                "threshold": critical if severity == CRITICAL else warning,
+            })
+
+    check("retained_bytes", slot["retained_bytes"], retained_thresholds)
+    check("confirmed_flush_lag_seconds", slot["confirmed_flush_lag_seconds"], flush_lag_thresholds)
+    # "unreserved": the WAL is kept past max_slot_wal_keep_size and goes at the next checkpoint
+    if slot["wal_status"] in ("lost", "unreserved"):
+        alerts.append({
+            "source": source,
+            "slot": slot["slot_name"],
+            "metric": "wal_status",
+            "severity": CRITICAL,
+            "value": slot["wal_status"],
+            "threshold": None,
+        })
+    return sorted(alerts, key=lambda alert: alert["severity"] != CRITICAL)
+
+
+class WalMonitor:
+    """
+    Samples replication slots and WAL retention of the source databases
+    registered in Sequin (read from the local mirror, see
+    app.services.sequin_mirror), so a stalled slot is noticed before it fills
+    the source's disk.
+
+    Each source gets a small asyncpg pool that is kept between runs and only
+    rebuilt when its connection details change. Every run queries all sources
+    concurrently, one query each, and records per "source|slot":
+
+    - retained_bytes: WAL held back by the slot's restart_lsn,
+    - confirmed_flush_lag_seconds: how long WAL has been waiting at the slot's
+      confirmed_flush_lsn (the larger of the time since it last advanced while
+      newer WAL exists and the flush_lag reported by an active walsender).
+
+    Both go into bounded time series with rollups; alerts compare the latest
+    sample against the warning/critical thresholds. Runs never overlap: a live
+    sample requested while the scheduled one is running waits for it.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        raw_size: int,
+        timeout: float,
+        retained_thresholds: Tuple[int, int],
+        flush_lag_thresholds: Tuple[float, float],
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.retained_thresholds = retained_thresholds
+        self.flush_lag_thresholds = flush_lag_thresholds
+        self.retained = LagSeries(raw_size=raw_size)
+        self.flush_lag = LagSeries(raw_size=raw_size)
+        self.latest: Optional[Dict[str, Any]] = None
+        self._latest_ts = 0.0
+        self._pools: Dict[str, Tuple[Tuple[Any, ...], Any]] = {}
+        # (confirmed_flush_lsn, since) per "source|slot", to time stalled slots
+        self._flush_positions: Dict[str, Tuple[Optional[str], float]] = {}
+        # Serializes runs, which share the pools and the stall timers
+        self._lock = asyncio.Lock()
+        self._scheduler: Optional["AsyncIOScheduler"] = None
+
+    async def collect(self, session: AsyncSession) -> Dict[str, Any]:
+        """Sample every registered source once, record the results and share them."""
+        async with self._lock:
+            return await self._collect(session)
+
+    async def _collect(self, session: AsyncSession) -> Dict[str, Any]:
+        sources = (await session.exec(select(SequinDatabase).order_by(SequinDatabase.name))).all()
+        await self._close_pools(keep={source.id for source in sources})
+        samples = await asyncio.gather(*(self._sample(source) for source in sources))
+        now = time.time()
+        result = {source.name: sample for source, sample in zip(sources, samples)}
+        # Forget stall timers of dropped slots; keep those of sources that merely failed this run
+        live = {f"{name}|{slot['slot_name']}" for name, sample in result.items() for slot in sample["slots"]}
+        failed = {name for name, sample in result.items() if sample.get("error")}
+        self._flush_positions = {
+            key: value for key, value in self._flush_positions.items()
+            if key in live or key.split("|", 1)[0] in failed
+        }
+        self._record(now, result)
+        await coordinator.set_json("wal-monitor", {"ts": now, "sources": result}, self._lease_ttl())
+        return self.latest
+
+    async def _sample(self, source: SequinDatabase) -> Dict[str, Any]:
+        if source.use_local_tunnel:
+            return {"error": "Source is reached through a Sequin local tunnel", "slots": []}
+        try:
+            pool = await self._pool(source)
+            async with pool.acquire(timeout=self.timeout) as conn:
+                rows = await conn.fetch(SLOTS_QUERY, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"WAL sample of {source.name} failed: {e!r}")
+            return {"error": str(e) or repr(e), "slots": []}
+
+        now = time.time()
+        managed = {slot.get("slot_name") for slot in source.replication_slots or [] if isinstance(slot, dict)}
+        slots = []
+        for row in rows:
+            if row["slot_name"] is None:
+                continue
+            key = f"{source.name}|{row['slot_name']}"
+            confirmed = row["confirmed_flush_lsn"]
+            position, since = self._flush_positions.get(key, (None, now))
+            if confirmed != position:
+                since = now
+            self._flush_positions[key] = (confirmed, since)
+            stalled = now - since if row["flush_lag_bytes"] else 0.0
+            reported = row["reported_flush_lag_seconds"]
+            slots.append({
+                "slot_name": row["slot_name"],
+                "plugin": row["plugin"],
+                "slot_type": row["slot_type"],
+                "active": row["active"],
+                "wal_status": row["wal_status"],
+                "managed_by_sequin": row["slot_name"] in managed,
+                "restart_lsn": row["restart_lsn"],
+                "confirmed_flush_lsn": confirmed,
+                "retained_bytes": row["retained_bytes"],
+                "flush_lag_bytes": row["flush_lag_bytes"],
+                "confirmed_flush_lag_seconds": round(max(stalled, reported or 0.0), 1),
+            })
+        current_lsn = rows[0]["current_lsn"] if rows else None
+        return {"error": None, "current_lsn": current_lsn, "slots": slots}
+
+    async def _pool(self, source: SequinDatabase) -> Any:
+        fingerprint = _fingerprint(source)
+        entry = self._pools.get(source.id)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+        if entry is not None:
+            await entry[1].close()
+        import asyncpg  # type: ignore
+
+        pool = await asyncpg.create_pool(
+            host=source.hostname,
+            port=source.port,
+            database=source.database,
+            user=source.username,
+            password=source.password,
+            ssl="require" if source.ssl else None,
+            # One connection is enough for one query per interval; idle ones are closed
+            min_size=0,
+            max_size=1,
+            max_inactive_connection_lifetime=max(self.interval * 3, 300),
+            timeout=self.timeout,
+        )
+        self._pools[source.id] = (fingerprint, pool)
+        return pool
+
+    async def _close_pools(self, keep: Optional[set] = None) -> None:
+        for source_id in [s for s in self._pools if keep is None or s not in keep]:
+            _, pool = self._pools.pop(source_id)
+            try:
+                await pool.close()
+            except Exception as e:
+                logger.warning(f"Closing WAL monitor pool for {source_id} failed: {e!r}")
+
+    def _record(self, ts: float, sources: Dict[str, Any]) -> None:
+        self._latest_ts = ts
+        self.latest = {"collected_at": _isoformat(ts), "sources": sources}
+        slots = [(name, slot) for name, sample in sources.items() for slot in sample["slots"]]
+        self.retained.add(ts, {f"{name}|{slot['slot_name']}": slot["retained_bytes"] or 0 for name, slot in slots})
+        self.flush_lag.add(ts, {f"{name}|{slot['slot_name']}": slot["confirmed_flush_lag_seconds"] for name, slot in slots})
+
+    def alerts(self) -> List[Dict[str, Any]]:
+        """Threshold alerts on the latest sample, critical first; unreachable sources are warnings."""
+        if self.latest is None:
+            return []
+        alerts = []
+        for name, sample in self.latest["sources"].items():
+            if sample.get("error"):
+                alerts.append({
+                    "source": name, "slot": None, "metric": "unreachable",
+                    "severity": WARNING, "value": sample["error"], "threshold": None,
+                })
+            for slot in sample["slots"]:
+                alerts.extend(slot_alerts(name, slot, self.retained_thresholds, self.flush_lag_thresholds))
+        return sorted(alerts, key=lambda alert: alert["severity"] != CRITICAL)
+
+    async def _adopt(self) -> None:
+        shared = await coordinator.get_json("wal-monitor")
+        if shared is not None and shared["ts"] > self._latest_ts:
+            self._record(shared["ts"], shared["sources"])
+
+    def _lease_ttl(self) -> float:
+        return max(self.interval * 3, app_settings.REDIS_LEASE_TTL)
+
+    def start(self) -> None:
+        """Start periodic sampling. Must be called from a running event loop."""
+        if self._scheduler is not None:
+            return
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+        from apscheduler.triggers.interval import IntervalTrigger  # type: ignore
+
+        self._scheduler = AsyncIOScheduler()
+        self._scheduler.add_job(
+            self._scheduled_collect,
+            trigger=IntervalTrigger(seconds=self.interval, jitter=self.interval / 10),
+            id="wal-monitor",
+            next_run_time=datetime.now(timezone.utc),
+            max_instances=1,
+            coalesce=True,
+        )
+        self._scheduler.start()
+        logger.info(f"WAL monitor started (interval={self.interval}s)")
+
+    async def shutdown(self) -> None:
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+        self._scheduler = None
+        await self._close_pools()
+
+    async def _scheduled_collect(self) -> None:
+        from app.core.database import engine
+
+        try:
+            # With Redis, one worker connects to the sources and the others reuse its samples
+            if not await coordinator.hold_lease("wal-monitor", self._lease_ttl()):
+                await self._adopt()
+                return
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                await self.collect(session)
+        except Exception as e:
+            logger.warning(f"WAL monitor run failed: {e!r}")
+
+
+wal_monitor = WalMonitor(
+    interval=app_settings.WAL_MONITOR_INTERVAL,
+    raw_size=app_settings.WAL_MONITOR_RAW_SAMPLES,
+    timeout=app_settings.WAL_MONITOR_TIMEOUT,
+    retained_thresholds=(app_settings.WAL_RETAINED_WARNING_BYTES, app_settings.WAL_RETAINED_CRITICAL_BYTES),
+    flush_lag_thresholds=(app_settings.WAL_FLUSH_LAG_WARNING_SECONDS, app_settings.WAL_FLUSH_LAG_CRITICAL_SECONDS),
+)
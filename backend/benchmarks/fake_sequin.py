@@ -0,0 +1,126 @@
+"""
+Local stand-in for the Sequin management API, for benchmarks.
+
+Serves the endpoints the backend proxies with a configurable response delay
+and payload size. Payloads are built once at startup so the stand-in itself
+stays cheap and the numbers reflect the backend.
+
+Run it standalone (then point the backend settings' sequin_url at it):
+
+    uv run python -m benchmarks.fake_sequin --port 7376 --latency-ms 20 --items 50
+"""
+import argparse
+import asyncio
+import random
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, HTTPException
+
+
+def _databases(items: int, padding: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"db_{i}",
+            "name": f"database_{i}",
+            "hostname": f"pg-{i}.internal",
+            "port": 5432,
+            "database": "app",
+            "username": "cdc",
+            "ssl": True,
+            "use_local_tunnel": False,
+            "ipv6": False,
+            "replication_slots": [{"publication_name": f"pub_{i}", "slot_name": f"slot_{i}"}],
+            "notes": "x" * padding,
+        }
+        for i in range(items)
+    ]
+
+
+def _sinks(items: int, padding: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"sink_{i}",
+            "name": f"sink_{i}",
+            "status": "active",
+            "database": f"database_{i}",
+            "destination": {"type": "kafka", "topic": f"cdc.table_{i}"},
+            "notes": "x" * padding,
+        }
+        for i in range(items)
+    ]
+
+
+def create_fake_sequin(
+    latency_ms: float = 20.0,
+    jitter_ms: float = 5.0,
+    items: int = 50,
+    padding: int = 0,
+) -> FastAPI:
+    """
+    Fake Sequin app. Every request waits `latency_ms` plus up to `jitter_ms`;
+    list endpoints return `items` entries, each padded with `padding` bytes.
+    """
+    app = FastAPI(title="Fake Sequin")
+    databases = _databases(items, padding)
+    sinks = _sinks(items, padding)
+    by_id = {db["id"]: db for db in databases} | {db["name"]: db for db in databases}
+    state = {"requests": 0}
+
+    async def delay() -> None:
+        state["requests"] += 1
+        seconds = (latency_ms + random.uniform(0, jitter_ms)) / 1000
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    @app.get("/api/postgres_databases")
+    async def list_databases():
+        await delay()
+        return {"data": databases}
+
+    @app.get("/api/postgres_databases/{id_or_name}")
+    async def get_database(id_or_name: str):
+        await delay()
+        if id_or_name not in by_id:
+            raise HTTPException(status_code=404, detail="Not found")
+        return {"data": by_id[id_or_name]}
+
+    @app.post("/api/postgres_databases")
+    async def create_database(payload: Dict[str, Any]):
+        await delay()
+        return {"data": {"id": f"db_{random.randrange(10**9)}", **payload}}
+
+    @app.post("/api/postgres_databases/test_connection")
+    async def test_connection(payload: Dict[str, Any]):
+        await delay()
+        return {"success": True}
+
+    @app.get("/api/sinks")
+    async def list_sinks():
+        await delay()
+        return {"data": sinks}
+
+    @app.get("/_stats")
+    async def stats():
+        return state
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake Sequin API for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7376)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--padding", type=int, default=0, help="Extra bytes per list item")
+    args = parser.parse_args()
+
+    app = create_fake_sequin(args.latency_ms, args.jitter_ms, args.items, args.padding)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Benchmark driver for the backend's proxy hot path.
+
+By default everything runs in one process: the backend app is called over
+httpx's ASGI transport, its shared Sequin client is wired to the fake Sequin
+app (see benchmarks.fake_sequin) and the app DB is a temporary SQLite file.
+That isolates the backend's own overhead from network noise. With --target
+the driver hits an already running backend instead.
+
+    uv run python -m benchmarks.run --requests 2000 --concurrency 32
+    uv run python -m benchmarks.run --output benchmarks/baselines/in_process.json
+    uv run python -m benchmarks.run --baseline benchmarks/baselines/in_process.json --fail-on-regression 25
+
+Results are JSON: throughput and p50/p95/p99 latency per scenario.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+FAKE_SEQUIN_URL = "http://fake-sequin"
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    # In-process only: whether the Sequin response cache is enabled
+    cache: bool = False
+    body: Optional[Dict[str, Any]] = None
+
+
+SCENARIOS = [
+    Scenario("sequin_databases_cached", "GET", "/api/v1/sequin/databases/", cache=True),
+    Scenario("sequin_databases", "GET", "/api/v1/sequin/databases/"),
+    Scenario("sequin_database_get", "GET", "/api/v1/sequin/databases/db_1"),
+    Scenario("sequin_sinks", "GET", "/api/v1/sequin/sinks"),
+    Scenario("sequin_stats", "GET", "/api/v1/sequin/stats"),
+    Scenario("settings_get", "GET", "/api/v1/settings/"),
+    Scenario("settings_health", "GET", "/api/v1/settings/health"),
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    values = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)  # noqa: E731
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 1) if elapsed > 0 else 0.0,
+        "mean_ms": ms(sum(values) / len(values)) if values else 0.0,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else 0.0,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, Any]:
+    """Send `requests` requests from `concurrency` workers and summarize latency."""
+
+    async def send() -> bool:
+        response = await client.request(scenario.method, scenario.path, json=scenario.body)
+        return response.status_code < 400
+
+    for _ in range(warmup):
+        await send()
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                ok = await send()
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+@asynccontextmanager
+async def in_process_backend(latency_ms: float, jitter_ms: float, items: int, padding: int) -> AsyncIterator[httpx.AsyncClient]:
+    """Backend app wired to the fake Sequin and a throwaway SQLite DB."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.core import http_client
+    from app.core.database import get_session
+    from app.main import app
+    from app.models.settings import SystemSettings
+    from benchmarks.fake_sequin import create_fake_sequin
+
+    workdir = tempfile.mkdtemp(prefix="etl-bench-")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        session.add(SystemSettings(sequin_url=FAKE_SEQUIN_URL, sequin_token="bench-token"))
+        await session.commit()
+
+    async def get_session_override():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+            await session.commit()
+
+    fake = create_fake_sequin(latency_ms, jitter_ms, items, padding)
+    app.dependency_overrides[get_session] = get_session_override
+    http_client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), base_url=FAKE_SEQUIN_URL)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://backend") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        await http_client.close_http_client()
+        await engine.dispose()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    selected = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+    results: Dict[str, Any] = {}
+
+    if args.target:
+        async with httpx.AsyncClient(base_url=args.target, timeout=30) as client:
+            for scenario in selected:
+                results[scenario.name] = await run_scenario(client, scenario, args.requests, args.concurrency, args.warmup)
+                print(_format_row(scenario.name, results[scenario.name]), file=sys.stderr)
+    else:
+        from app.services.cache import sequin_cache
+
+        ttl = sequin_cache.ttl
+        async with in_process_backend(args.latency_ms, args.jitter_ms, args.items, args.padding) as client:
+            for scenario in selected:
+                sequin_cache.clear()
+                sequin_cache.ttl = ttl if scenario.cache else 0
+                results[scenario.name] = await run_scenario(client, scenario, args.requests, args.concurrency, args.warmup)
+                print(_format_row(scenario.name, results[scenario.name]), file=sys.stderr)
+        sequin_cache.ttl = ttl
+
+    return {
+        "meta": {
+            "mode": "remote" if args.target else "in_process",
+            "target": args.target,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "sequin_latency_ms": None if args.target else args.latency_ms,
+            "sequin_jitter_ms": None if args.target else args.jitter_ms,
+            "items": None if args.target else args.items,
+            "padding": None if args.target else args.padding,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "scenarios": results,
+    }
+
+
+def _format_row(name: str, result: Dict[str, Any]) -> str:
+    return (
+        f"{name:<28} {result['throughput_rps']:>9.1f} req/s  "
+        f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+        f"p99 {result['p99_ms']:>8.2f}ms  errors {result['errors']}"
+    )
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: Optional[float]) -> List[str]:
+    """Print p95/throughput deltas against a baseline; return scenarios that regressed."""
+    regressed = []
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base or not base["p95_ms"]:
+            continue
+        p95_delta = (result["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100
+        rps_delta = (
+            (result["throughput_rps"] - base["throughput_rps"]) / base["throughput_rps"] * 100
+            if base["throughput_rps"] else 0.0
+        )
+        print(f"{name:<28} p95 {p95_delta:+7.1f}%  throughput {rps_delta:+7.1f}%", file=sys.stderr)
+        if max_regression is not None and p95_delta > max_regression:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the backend's Sequin proxy and settings endpoints")
+    parser.add_argument("--target", help="Base URL of a running backend (default: in-process with a fake Sequin)")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="*", help=f"Subset of: {', '.join(s.name for s in SCENARIOS)}")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake Sequin response delay")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--items", type=int, default=50, help="Items in fake Sequin list responses")
+    parser.add_argument("--padding", type=int, default=0, help="Extra bytes per fake Sequin list item")
+    parser.add_argument("--output", help="Write results JSON here (e.g. to record a new baseline)")
+    parser.add_argument("--baseline", help="Compare against a previous results JSON")
+    parser.add_argument("--fail-on-regression", type=float, help="Exit 1 if any p95 grew by more than this percent")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressed = compare(results, json.load(f), args.fail_on_regression)
+        if regressed:
+            print(f"p95 regression above {args.fail_on_regression}%: {', '.join(regressed)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+from benchmarks import run as bench
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert bench.percentile(values, 50) == 50
+    assert bench.percentile(values, 99) == 99
+    assert bench.percentile([], 95) == 0.0
+
+
+def test_in_process_benchmark_against_fake_sequin(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    args = [
+        "--requests", "20", "--concurrency", "4", "--warmup", "1", "--latency-ms", "0", "--jitter-ms", "0",
+        "--scenarios", "sequin_databases", "settings_get",
+        "--output", str(output),
+    ]
+    assert bench.main(args) == 0
+
+    import json
+    results = json.loads(output.read_text())
+    assert results["meta"]["mode"] == "in_process"
+    for name in ("sequin_databases", "settings_get"):
+        scenario = results["scenarios"][name]
+        assert scenario["errors"] == 0 and scenario["requests"] == 20
+        assert 0 < scenario["p50_ms"] <= scenario["p95_ms"] <= scenario["p99_ms"]
+
+    # Comparing a run with itself never counts as a regression
+    assert bench.compare(results, results, max_regression=0) == []
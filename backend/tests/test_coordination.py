@@ -0,0 +1,137 @@
+import asyncio
+from unittest.mock import patch
+
+import fakeredis
+import httpx
+import pytest
+
+from app.core import redis_client
+from app.models.settings import SystemSettings
+from app.services.cache import sequin_cache, shared_sequin_cache
+from app.services.coordination import Coordinator, coordinator
+from app.services.sequin import SequinService
+
+
+@pytest.fixture(name="redis")
+def redis_fixture():
+    # One fake server shared by every "worker" in a test
+    server = fakeredis.FakeServer()
+    sequin_cache.clear()
+    yield server
+    redis_client._client = None
+    sequin_cache.clear()
+
+
+def _use(server):
+    redis_client._client = fakeredis.FakeAsyncRedis(server=server)
+
+
+def test_only_one_worker_holds_a_poller_lease(redis):
+    async def run():
+        _use(redis)
+        worker_a, worker_b = Coordinator("test:"), Coordinator("test:")
+        first = [await worker_a.hold_lease("kafka-lag", ttl=30), await worker_b.hold_lease("kafka-lag", ttl=30)]
+        # The holder renews; the other keeps skipping
+        renewed = [await worker_a.hold_lease("kafka-lag", ttl=30), await worker_b.hold_lease("kafka-lag", ttl=30)]
+        await worker_a.release_leases()
+        takeover = await worker_b.hold_lease("kafka-lag", ttl=30)
+        return first, renewed, takeover
+
+    first, renewed, takeover = asyncio.run(run())
+    assert first == [True, False] and renewed == [True, False] and takeover
+
+
+def test_leases_are_always_granted_without_redis():
+    redis_client._client = None
+    assert asyncio.run(Coordinator("test:").hold_lease("anything", ttl=1))
+
+
+@patch("httpx.AsyncClient.get")
+def test_workers_share_sequin_responses_and_invalidate_each_other(mock_get, redis):
+    mock_get.return_value = httpx.Response(
+        200, json={"data": [{"id": "sink_1"}]}, request=httpx.Request("GET", "https://mock.sequin.io")
+    )
+    service = SequinService(None, SystemSettings(sequin_url="https://mock.sequin.io", sequin_token="t"))
+    received = []
+
+    async def run():
+        _use(redis)
+        listener = Coordinator("test:")
+        listener.channel = coordinator.channel
+        listener.on("sequin_invalidate", received.append)
+        task = asyncio.create_task(listener._listen())
+        await asyncio.sleep(0.05)
+
+        first = await service.list_sinks()
+        # Another worker: empty local cache, same Redis
+        sequin_cache.clear()
+        second = await service.list_sinks()
+        upstream_calls = mock_get.call_count
+
+        await service._invalidate("/api/sinks")
+        after_write = await shared_sequin_cache.get("https://mock.sequin.io/api/sinks")
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return first, second, upstream_calls, after_write
+
+    first, second, upstream_calls, after_write = asyncio.run(run())
+    assert first == second == {"data": [{"id": "sink_1"}]}
+    assert upstream_calls == 1
+    assert after_write is None
+    assert [event["prefix"] for event in received] == ["https://mock.sequin.io/api/sinks"]
+
+
+@patch("httpx.AsyncClient.get")
+def test_credentials_are_not_written_to_the_shared_cache(mock_get, redis):
+    from app.services.sequin import LIST_DATABASES_PATH
+
+    mock_get.return_value = httpx.Response(
+        200, json={"data": [{"id": "db_1", "password": "secret"}]}, request=httpx.Request("GET", "https://mock.sequin.io")
+    )
+    service = SequinService(None, SystemSettings(sequin_url="https://mock.sequin.io", sequin_token="t"))
+
+    async def run():
+        _use(redis)
+        data = await service._cached_get(LIST_DATABASES_PATH)
+        return data, await shared_sequin_cache.get(f"https://mock.sequin.io{LIST_DATABASES_PATH}")
+
+    data, shared = asyncio.run(run())
+    assert data["data"][0]["password"] == "secret"
+    assert shared is None
+
+
+def test_workers_claim_an_idempotency_key_once(redis):
+    from app.services.job_queue import TERMINAL, JobQueue
+
+    async def work(session):
+        return None
+
+    async def run():
+        _use(redis)
+        worker_a = JobQueue(workers=1, max_queued=5, result_ttl=60, timeout=1)
+        worker_b = JobQueue(workers=1, max_queued=5, result_ttl=60, timeout=1)
+        results = await asyncio.gather(worker_a.submit("op", work, "key-1"), worker_b.submit("op", work, "key-1"))
+        created = next(job for job, is_new in results if is_new)
+        while created.state not in TERMINAL:
+            await asyncio.sleep(0.01)
+        await worker_a.shutdown()
+        await worker_b.shutdown()
+        records = await redis_client._client.keys(coordinator.key("job:*"))
+        return results, records
+
+    ((job_a, created_a), (job_b, created_b)), records = asyncio.run(run())
+    assert job_a.id == job_b.id
+    # The worker that lost the claim left no job record of its own
+    assert records == [coordinator.key(f"job:{job_a.id}").encode()]
+    assert sorted([created_a, created_b]) == [False, True]
+
+
+def test_remote_write_event_drops_local_cache_entries():
+    sequin_cache.set("https://mock.sequin.io/api/sinks", {"data": []})
+    sequin_cache.set("https://mock.sequin.io/api/postgres_databases", {"data": []})
+    event = '{"type": "sequin_invalidate", "origin": "other-worker", "prefix": "https://mock.sequin.io/api/sinks", "path": "/api/sinks"}'
+
+    asyncio.run(coordinator.dispatch(event))
+    assert sequin_cache.peek("https://mock.sequin.io/api/sinks") is None
+    assert sequin_cache.peek("https://mock.sequin.io/api/postgres_databases") is not None
+    sequin_cache.clear()
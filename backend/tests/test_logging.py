@@ -0,0 +1,68 @@
+import io
+import json
+import logging
+import queue
+from unittest.mock import patch
+
+from app.core.logging_config import (
+    DroppingQueueHandler,
+    JsonFormatter,
+    RedactingFilter,
+    TextFormatter,
+    log_payload,
+    redact,
+)
+
+
+def test_redact_masks_secrets_in_dicts_and_text():
+    payload = {"name": "orders", "password": "hunter2", "nested": [{"sequin_token": "abc"}], "port": 5432}
+    assert redact(payload) == {"name": "orders", "password": "***", "nested": [{"sequin_token": "***"}], "port": 5432}
+
+    text = "{'password': 'hunter2', 'username': 'cdc'} Authorization: Bearer abc.def token=xyz"
+    masked = redact(text)
+    assert "hunter2" not in masked and "abc.def" not in masked and "xyz" not in masked
+    assert "'username': 'cdc'" in masked
+
+
+def test_queued_records_are_redacted_json_off_the_caller_thread():
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=1)
+    handler = DroppingQueueHandler(records)
+    logger = logging.getLogger("test.logging.queue")
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    try:
+        with patch("app.core.logging_config.settings.LOG_DEBUG_SAMPLE_RATE", 1.0):
+            log_payload(logger, "Sequin list databases response", {"data": [{"password": "hunter2"}]})
+        logger.info("dropped: the queue is full")
+    finally:
+        logger.removeHandler(handler)
+
+    assert DroppingQueueHandler.dropped >= 1
+    record = records.get_nowait()
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.addFilter(RedactingFilter())
+    output.setFormatter(JsonFormatter())
+    output.handle(record)
+
+    entry = json.loads(stream.getvalue())
+    assert entry["level"] == "DEBUG" and entry["msg"] == "Sequin list databases response"
+    assert "hunter2" not in entry["payload"] and entry["payload_chars"] > 0
+
+
+def test_payload_logging_is_skipped_above_debug():
+    logger = logging.getLogger("test.logging.info")
+    logger.setLevel(logging.INFO)
+    with patch("app.core.logging_config.redact") as redact_mock:
+        log_payload(logger, "large payload", {"data": list(range(10000))})
+    redact_mock.assert_not_called()
+
+
+def test_text_format_keeps_extra_fields():
+    record = logging.makeLogRecord({
+        "name": "app.services.sequin", "levelname": "DEBUG", "msg": "Sequin list sinks response",
+        "payload": '{"data": []}', "payload_chars": 12,
+    })
+    line = TextFormatter("%(levelname)s %(name)s: %(message)s").format(record)
+    assert line == 'DEBUG app.services.sequin: Sequin list sinks response payload={"data": []} payload_chars=12'
@@ -0,0 +1,13 @@
+from fastapi.testclient import TestClient
+from app.main import app
+
+def test_metrics_endpoint_exposes_backend_series():
+    client = TestClient(app)
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert 'etl_http_request_duration_seconds_count{method="GET",route="/",status="200"}' in body
+    assert "etl_sequin_cache_requests_total" in body
+    assert 'etl_db_pool_connections{state="size"}' in body
+    assert "etl_sequin_http_connections" in body
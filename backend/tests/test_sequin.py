@@ -1,31 +1,49 @@
 from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine, select, delete
 from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.main import app
 from app.core.database import get_session
 from app.models.settings import SystemSettings
+from app.services.settings_store import settings_store
+from app.services.cache import sequin_cache, ResponseCache
 from unittest.mock import patch, AsyncMock
+import httpx
 import pytest
 
-# Setup in-memory DB for tests
+# Setup in-memory DB for tests.
+# The app uses the async engine (aiosqlite); the sync engine shares the same
+# in-memory database so tests can arrange data without an event loop.
+DB_URI = "file:test_sequin?mode=memory&cache=shared&uri=true"
 engine = create_engine(
-    "sqlite:///:memory:", 
-    connect_args={"check_same_thread": False}, 
+    f"sqlite:///{DB_URI}",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{DB_URI}",
     poolclass=StaticPool
 )
 SQLModel.metadata.create_all(engine)
 
 @pytest.fixture(name="client")
 def client_fixture():
-    def get_session_override():
-        with Session(engine) as session:
+    async def get_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
             yield session
+            await session.commit()
     
     app.dependency_overrides[get_session] = get_session_override
+    settings_store.invalidate()
+    sequin_cache.clear()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
 
+def sequin_response(payload) -> httpx.Response:
+    return httpx.Response(200, json=payload, request=httpx.Request("GET", "https://mock.sequin.io"))
+
 def setup_settings(session: Session):
     settings = SystemSettings(sequin_url="https://mock.sequin.io", sequin_token="test-token", kafka_url="kafka:9092")
     session.add(settings)
@@ -42,11 +60,7 @@ def test_list_databases(mock_get, client):
         setup_settings(session)
     
     # Mock Sequin API response
-    mock_get.return_value = AsyncMock(
-        status_code=200,
-        raise_for_status=lambda: None,
-        json=lambda: [{"id": "db_1", "name": "test-db"}]
-    )
+    mock_get.return_value = sequin_response([{"id": "db_1", "name": "test-db"}])
 
     response = client.get("/api/v1/sequin/databases")
     assert response.status_code == 200
@@ -62,12 +76,810 @@ def test_list_sinks(mock_get, client):
     with Session(engine) as session:
          setup_settings(session)
 
+    mock_get.return_value = sequin_response([{"id": "sink_1", "name": "sink-consumer"}])
+
+    response = client.get("/api/v1/sequin/sinks")
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "sink-consumer"
+
+def test_shared_http_client_is_reused():
+    from app.core.http_client import get_http_client
+    assert get_http_client() is get_http_client()
+
+def test_pool_stats(client):
+    response = client.get("/api/v1/sequin/pool-stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["max_connections"] > 0
+    assert "idle_connections" in data
+
+@patch("httpx.AsyncClient.post")
+@patch("httpx.AsyncClient.get")
+def test_list_sinks_cached_until_write(mock_get, mock_post, client):
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.commit()
+        setup_settings(session)
+
+    mock_get.return_value = sequin_response([{"id": "sink_1", "name": "sink-consumer"}])
+    mock_post.return_value = AsyncMock(
+        status_code=200,
+        raise_for_status=lambda: None,
+        json=lambda: {"id": "sink_2", "name": "new-sink"}
+    )
+
+    client.get("/api/v1/sequin/sinks")
+    client.get("/api/v1/sequin/sinks")
+    assert mock_get.call_count == 1
+
+    client.post("/api/v1/sequin/sinks", json={"name": "new-sink"})
+    client.get("/api/v1/sequin/sinks")
+    assert mock_get.call_count == 2
+
+@patch("httpx.AsyncClient.get")
+def test_list_databases_passes_sequin_bytes_through(mock_get, client):
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.commit()
+        setup_settings(session)
+
+    body = b'{"data": [{"id": "db_1", "name": "test-db"}]}'
+    mock_get.return_value = httpx.Response(
+        200,
+        content=body,
+        headers={"content-type": "application/json; charset=utf-8"},
+        request=httpx.Request("GET", "https://mock.sequin.io"),
+    )
+
+    with patch("httpx.Response.json", side_effect=AssertionError("body must not be parsed")):
+        response = client.get("/api/v1/sequin/databases")
+        cached = client.get("/api/v1/sequin/databases")
+
+    assert response.content == body and cached.content == body
+    assert response.headers["content-type"] == "application/json; charset=utf-8"
+    assert mock_get.call_count == 1
+
+    with patch("app.services.sequin_instances.app_settings.SEQUIN_RAW_PASSTHROUGH", False):
+        sequin_cache.clear()
+        assert client.get("/api/v1/sequin/databases").json() == {"data": [{"id": "db_1", "name": "test-db"}]}
+
+def test_default_response_class_handles_non_str_keys():
+    from app.core.responses import FastJSONResponse
+
+    assert FastJSONResponse({1: "a", "b": None}).body == b'{"1":"a","b":null}'
+
+def test_response_cache_lru_eviction():
+    import asyncio
+
+    async def run():
+        cache = ResponseCache(ttl=60, stale_ttl=0, max_entries=2)
+        for key in ("a", "b", "c"):
+            await cache.get_or_load(key, AsyncMock(return_value=key))
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.stats()["entries"] == 2
+    assert cache.evictions == 1
+
+def test_singleflight_coalesces_concurrent_calls():
+    import asyncio
+    from app.services.singleflight import SingleFlight
+
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"data": []}
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("GET /api/sinks", fetch) for _ in range(50)))
+        return flights, results
+
+    flights, results = asyncio.run(run())
+    assert calls == 1
+    assert all(r == {"data": []} for r in results)
+    assert flights.stats()["coalesced"] == 49
+
+def test_concurrent_stale_mirror_reads_apply_once_at_a_time():
+    import asyncio
+    from unittest.mock import MagicMock
+    from app.models.mirror_state import MirrorSyncState
+    from app.models.sequin_database import SequinDatabase
+    from app.services.sequin_mirror import SequinMirror, DATABASES
+
+    with Session(engine) as session:
+        session.exec(delete(SequinDatabase))
+        session.exec(delete(MirrorSyncState))
+        session.commit()
+
+    mirror = SequinMirror(interval=60, max_staleness=300)
+    service = MagicMock()
+    service.list_databases = AsyncMock(return_value={"data": [{"id": "db_new", "name": "orders"}]})
+
+    async def read():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            return await mirror.read(session, DATABASES, service)
+
+    async def run():
+        return await asyncio.gather(read(), read())
+
+    results = asyncio.run(run())
+    assert [result["data"][0]["id"] for result in results] == ["db_new", "db_new"]
+    with Session(engine) as session:
+        assert len(session.exec(select(SequinDatabase)).all()) == 1
+        session.exec(delete(SequinDatabase))
+        session.exec(delete(MirrorSyncState))
+        session.commit()
+
+def test_get_after_write_does_not_join_a_get_from_before_it():
+    import asyncio
+    from app.services.sequin import SequinService
+
+    service = SequinService(None, SystemSettings(sequin_url="https://mock.sequin.io", sequin_token="t"))
+    versions = iter(["before-write", "after-write"])
+
+    async def slow_get(url, **kwargs):
+        body = {"data": [{"name": next(versions)}]}
+        await asyncio.sleep(0.05)
+        return sequin_response(body)
+
+    async def run():
+        sequin_cache.clear()
+        in_flight = asyncio.create_task(service.list_sinks())
+        await asyncio.sleep(0.01)
+        # A write lands while the first GET is still waiting on Sequin
+        await service._invalidate("/api/sinks")
+        after = await service.list_sinks()
+        return await in_flight, after
+
+    with patch("httpx.AsyncClient.get", side_effect=slow_get):
+        before, after = asyncio.run(run())
+    assert before["data"][0]["name"] == "before-write"
+    assert after["data"][0]["name"] == "after-write"
+    sequin_cache.clear()
+
+def test_proxy_stats(client):
+    response = client.get("/api/v1/sequin/stats")
+    assert response.status_code == 200
+    assert "coalesced" in response.json()["singleflight"]
+
+def test_mirror_apply_upserts_only_changed_rows():
+    import asyncio
+    from app.services.sequin_mirror import SequinMirror, DATABASES
+
+    mirror = SequinMirror(interval=60, max_staleness=300)
+    db_1 = {"id": "db_1", "name": "orders", "hostname": "pg1", "port": 5432, "database": "orders", "username": "cdc"}
+    db_2 = {"id": "db_2", "name": "users", "hostname": "pg2", "port": 5432, "database": "users", "username": "cdc"}
+
+    async def run():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            first = await mirror.apply(session, DATABASES, {"data": [db_1, db_2]})
+            second = await mirror.apply(session, DATABASES, {"data": [{**db_1, "hostname": "pg1-new"}]})
+            return first, second
+
+    first, second = asyncio.run(run())
+    assert first == {"inserted": 2, "updated": 0, "deleted": 0, "unchanged": 0}
+    assert second == {"inserted": 0, "updated": 1, "deleted": 1, "unchanged": 0}
+
+@patch("httpx.AsyncClient.get")
+def test_list_databases_from_mirror(mock_get, client):
+    from app.services.sequin_mirror import sequin_mirror
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.commit()
+        setup_settings(session)
+
     mock_get.return_value = AsyncMock(
         status_code=200,
         raise_for_status=lambda: None,
-        json=lambda: [{"id": "sink_1", "name": "sink-consumer"}]
+        json=lambda: {"data": [{"id": "db_1", "name": "test-db"}]}
     )
+    sequin_mirror.mark_stale("databases")
+
+    first = client.get("/api/v1/sequin/databases?source=mirror").json()
+    second = client.get("/api/v1/sequin/databases?source=mirror").json()
+
+    assert first["source"] == "live"
+    assert second["source"] == "mirror"
+    assert second["data"] == [{"id": "db_1", "name": "test-db"}]
+    assert second["synced_at"]
+    assert mock_get.call_count == 1
+    status = client.get("/api/v1/sequin/mirror/status").json()
+    assert status["databases"]["fresh"] and status["databases"]["row_count"] == 1
+
+def test_bulk_create_databases_reports_each_item(client):
+    import asyncio
+    from fastapi import HTTPException
+    from app.services.sequin import SequinService
+
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.commit()
+        setup_settings(session)
+
+    async def test_connection_db(self, payload):
+        if payload["name"] == "bad":
+            raise HTTPException(status_code=422, detail="connection refused")
+        return {"success": True}
+
+    async def create_database(self, payload):
+        await asyncio.sleep(0.01)
+        return {"id": f"db_{payload['name']}", "name": payload["name"]}
+
+    base = {"hostname": "pg", "database": "app", "username": "cdc", "password": "secret"}
+    payload = {
+        "items": [{**base, "name": "good"}, {**base, "name": "bad"}],
+        "validate_connection": True,
+        "concurrency": 2,
+    }
+    with patch.object(SequinService, "test_connection_db", test_connection_db), \
+         patch.object(SequinService, "create_database", create_database):
+        response = client.post("/api/v1/sequin/databases/bulk", json=payload)
 
-    response = client.get("/api/v1/sequin/sinks")
     assert response.status_code == 200
-    assert response.json()[0]["name"] == "sink-consumer"
+    body = response.json()
+    assert body["succeeded"] == 1 and body["failed"] == 1
+    good, bad = body["results"]
+    assert good["ok"] and good["data"]["id"] == "db_good"
+    assert bad["stage"] == "validate" and bad["status_code"] == 422 and bad["key"] == "bad"
+
+def test_bulk_requests_over_the_item_limit_are_rejected(client):
+    from app.schemas.sequin_database import BULK_MAX_ITEMS
+
+    base = {"hostname": "pg", "database": "app", "username": "cdc"}
+    too_many = [{**base, "name": f"db{i}"} for i in range(BULK_MAX_ITEMS + 1)]
+    ids = [f"db{i}" for i in range(BULK_MAX_ITEMS + 1)]
+    updates = [{"id_or_name": i} for i in ids]
+    assert client.post("/api/v1/sequin/databases/bulk", json={"items": too_many}).status_code == 422
+    assert client.put("/api/v1/sequin/databases/bulk", json={"items": updates}).status_code == 422
+    assert client.request("DELETE", "/api/v1/sequin/databases/bulk", json={"ids": ids}).status_code == 422
+
+def test_run_bounded_times_out_slow_items_only():
+    import asyncio
+    from app.services.bulk import run_bounded
+
+    async def op(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    results = asyncio.run(run_bounded([0.01, 5, 0.01], op, concurrency=2, timeout=0.2, stage="create"))
+    assert [r["ok"] for r in results] == [True, False, True]
+    assert results[1]["status_code"] == 504
+
+def test_retry_then_circuit_breaker_fails_fast():
+    import asyncio
+    import httpx
+    from app.services.resilience import (
+        CircuitBreaker, CircuitOpenError, RetryPolicy, call_with_resilience, OPEN,
+    )
+
+    request = httpx.Request("GET", "https://mock.sequin.io/api/sinks")
+    responses = [httpx.Response(502, request=request), httpx.Response(200, request=request)]
+
+    async def flaky():
+        return responses.pop(0)
+
+    async def down():
+        raise httpx.ConnectError("refused", request=request)
+
+    async def run():
+        breaker = CircuitBreaker("sequin", failure_threshold=3, reset_timeout=60)
+        policy = RetryPolicy(max_retries=3, base_delay=0, max_delay=0)
+        ok = await call_with_resilience(flaky, breaker, policy, retryable=True)
+
+        with pytest.raises(httpx.ConnectError):
+            await call_with_resilience(down, breaker, policy, retryable=True)
+        with pytest.raises(CircuitOpenError):
+            await call_with_resilience(down, breaker, policy, retryable=True)
+        return ok, breaker, policy
+
+    ok, breaker, policy = asyncio.run(run())
+    assert ok.status_code == 200
+    assert policy.retries == 1 + 2
+    assert breaker.state == OPEN
+    assert breaker.rejected_count == 1
+
+def test_retried_delete_404_counts_as_success():
+    import asyncio
+    import httpx
+    from app.services.resilience import CircuitBreaker, RetryPolicy, call_with_resilience
+
+    request = httpx.Request("DELETE", "https://mock.sequin.io/api/postgres_databases/db_1")
+    # The first attempt's response was lost; the retry finds the resource gone
+    responses = [httpx.ConnectError("reset", request=request), httpx.Response(404, request=request)]
+
+    async def delete():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    gone = asyncio.run(call_with_resilience(
+        delete, CircuitBreaker("sequin", failure_threshold=3, reset_timeout=60),
+        RetryPolicy(max_retries=1, base_delay=0, max_delay=0), retryable=True, gone_on_retry_ok=True,
+    ))
+    assert gone.status_code == 204
+
+def test_admission_control_queues_then_rejects(client):
+    import asyncio
+    from contextlib import asynccontextmanager
+    from app.services.admission import (
+        AdmissionController, AdmissionRejected, RATE_LIMITED, SATURATED, sequin_admission,
+    )
+
+    async def run():
+        admission = AdmissionController("sequin", {"upstream": {"rate": 10, "burst": 2}}, max_wait=0.15)
+        async def call():
+            async with admission.admit("u", "read"):
+                return "ok"
+
+        # Two from the burst, one queued ~0.1s for the next token, one that would wait too long
+        results = await asyncio.gather(*(call() for _ in range(4)), return_exceptions=True)
+        assert results[:3] == ["ok"] * 3
+        rate_limited = results[3]
+
+        admission = AdmissionController("sequin", {"refresh_tables": {"concurrency": 1}}, max_wait=0.05)
+        async with admission.admit("u", "refresh_tables"):
+            with pytest.raises(AdmissionRejected) as saturated:
+                async with admission.admit("u", "refresh_tables"):
+                    pass
+        return rate_limited, saturated.value, admission.stats()
+
+    rate_limited, saturated, stats = asyncio.run(run())
+    assert (rate_limited.reason, rate_limited.status_code) == (RATE_LIMITED, 429)
+    assert 0.15 < rate_limited.retry_after <= 0.2
+    assert (saturated.reason, saturated.status_code) == (SATURATED, 503)
+    assert stats["gates"]["u refresh_tables"]["rejected"][SATURATED] == 1
+
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.commit()
+        setup_settings(session)
+
+    async def refuse(self, upstream, endpoint_class):
+        assert endpoint_class == "refresh_tables"
+        raise AdmissionRejected("sequin refresh_tables", RATE_LIMITED, 1.2)
+        yield
+
+    with patch.object(type(sequin_admission), "admit", asynccontextmanager(refuse)), \
+            patch("httpx.AsyncClient.post") as mock_post:
+        response = client.post("/api/v1/sequin/databases/db_1/refresh-tables")
+    assert response.status_code == 429 and response.headers["Retry-After"] == "2"
+    mock_post.assert_not_called()
+
+def test_job_queue_runs_bounded_deduplicates_and_expires(client):
+    import asyncio
+    from fastapi import HTTPException
+    from app.services.job_queue import FAILED, SUCCEEDED, JobQueue
+    from app.services.sequin import SequinService
+
+    async def run():
+        queue = JobQueue(workers=1, max_queued=2, result_ttl=60, timeout=1)
+        running = []
+
+        async def work(session, value):
+            running.append(value)
+            assert len(running) == 1  # one worker: never two at once
+            await asyncio.sleep(0.01)
+            running.remove(value)
+            return {"value": value}
+
+        async def fail(session):
+            raise HTTPException(status_code=409, detail="conflict")
+
+        first, created = await queue.submit("op", lambda s: work(s, 1), "key-1", request={"n": 1})
+        replay, replay_created = await queue.submit("op", lambda s: work(s, 1), "key-1", request={"n": 1})
+        with pytest.raises(HTTPException) as mismatch:
+            await queue.submit("op", lambda s: work(s, 2), "key-1", request={"n": 2})
+        failing, _ = await queue.submit("op", fail)
+        with pytest.raises(HTTPException) as full:
+            await queue.submit("op", lambda s: work(s, 3))
+
+        events = [event async for event in queue.stream(failing.id, heartbeat=1)]
+        # Concurrent submissions with one key share the job of the one that claimed it first
+        (raced, raced_created), (raced_again, raced_again_created) = await asyncio.gather(
+            queue.submit("op", lambda s: work(s, 4), "key-2"), queue.submit("op", lambda s: work(s, 4), "key-2"),
+        )
+        assert raced is raced_again and [raced_created, raced_again_created] == [True, False]
+        [event async for event in queue.stream(raced.id, heartbeat=1)]
+        await queue.shutdown()
+        queue.result_ttl = 0
+        for job in (first, failing, raced):
+            job.expires_at = job.finished_at
+        return queue, first, created, replay, replay_created, mismatch.value, failing, full.value, events
+
+    queue, first, created, replay, replay_created, mismatch, failing, full, events = asyncio.run(run())
+    assert created and not replay_created and replay is first
+    assert mismatch.status_code == 422 and full.status_code == 503
+    assert first.state == SUCCEEDED and first.result == {"value": 1}
+    assert failing.state == FAILED and failing.error == {"status_code": 409, "detail": "conflict"}
+    assert events[-1].startswith("event: status") and '"failed"' in events[-1]
+    assert queue.list() == [] and queue.stats()["deduplicated"] == 2
+
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.commit()
+        setup_settings(session)
+
+    with patch.object(SequinService, "test_connection_db", AsyncMock(return_value={"ok": True})):
+        headers = {"Prefer": "respond-async", "Idempotency-Key": "check-1"}
+        accepted = client.post("/api/v1/sequin/databases/test-connection", headers=headers)
+        again = client.post("/api/v1/sequin/databases/test-connection", headers=headers)
+        inline = client.post("/api/v1/sequin/databases/test-connection")
+    assert accepted.status_code == 202 and again.status_code == 202
+    assert accepted.headers["Location"] == f"/api/v1/jobs/{accepted.json()['id']}"
+    assert again.json()["id"] == accepted.json()["id"] and again.headers["Idempotent-Replayed"] == "true"
+    assert client.get(accepted.headers["Location"]).status_code == 200
+    assert inline.status_code == 200 and inline.json() == {"ok": True}
+    assert client.get("/api/v1/jobs/unknown").status_code == 404
+
+def test_status_stream_fans_out_diffs_and_drops_slow_clients():
+    import asyncio
+    import json
+    from app.services.status_stream import StatusBroadcaster
+
+    states = [
+        {"databases": {"db1": {"id": "db1", "name": "a"}, "db2": {"id": "db2", "name": "b"}}},
+        {"databases": {"db1": {"id": "db1", "name": "a2"}}},
+    ]
+
+    async def run():
+        broadcaster = StatusBroadcaster(interval=60, coalesce_window=0.01, queue_size=2, heartbeat=60)
+        poll = AsyncMock(side_effect=states)
+        with patch.object(broadcaster, "_poll", poll):
+            fast, slow = broadcaster.subscribe(), broadcaster.subscribe()
+            await asyncio.sleep(0.05)
+            snapshot = json.loads((await fast.queue.get()).split("data: ")[1])
+
+            # A burst of writes collapses into one poll
+            for _ in range(5):
+                broadcaster.notify()
+            await asyncio.sleep(0.05)
+            diff = json.loads((await fast.queue.get()).split("data: ")[1])
+
+            broadcaster.publish("diff", {})  # slow client never read: its queue overflows
+            dropped = [slow.queue.get_nowait(), slow.queue.get_nowait()]
+            stats = broadcaster.stats()
+            await broadcaster.shutdown()
+        return poll.call_count, snapshot, diff, dropped, stats
+
+    polls, snapshot, diff, dropped, stats = asyncio.run(run())
+    assert polls == 2
+    assert set(snapshot["databases"]) == {"db1", "db2"}
+    assert diff == {"databases": {"upserted": {"db1": {"id": "db1", "name": "a2"}}, "removed": ["db2"]}}
+    assert dropped[0].startswith("event: dropped") and dropped[1] is None
+    assert stats["subscribers"] == 1 and stats["dropped"] == 1
+
+def test_backfill_orchestrator_respects_per_source_limit(client):
+    from datetime import datetime, timedelta, timezone
+    from app.models.backfill_job import BackfillJob
+    from app.services.sequin import SequinService
+
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.exec(delete(BackfillJob))
+        session.commit()
+        setup_settings(session)
+
+    items = [
+        {"sink_id": "orders-sink", "table": "public.orders", "source_database": "shop"},
+        {"sink_id": "orders-sink", "table": "public.order_items", "source_database": "shop"},
+        {"sink_id": "users-sink", "source_database": "accounts"},
+    ]
+    response = client.post("/api/v1/backfills/", json={"items": items})
+    assert response.status_code == 202
+    assert [job["state"] for job in response.json()] == ["queued"] * 3
+
+    states = {}
+
+    async def create_backfill(self, sink_id, payload):
+        backfill_id = f"bf_{payload.get('table', sink_id)}"
+        states[backfill_id] = "active"
+        return {"id": backfill_id, "state": "active", "rows_initial_count": 100}
+
+    async def get_backfill(self, sink_id, backfill_id):
+        return {"id": backfill_id, "state": states[backfill_id], "rows_processed_count": 100}
+
+    with patch.object(SequinService, "create_backfill", create_backfill), \
+         patch.object(SequinService, "get_backfill", get_backfill):
+        assert client.post("/api/v1/backfills/tick").json() == {"finished": 0, "started": 2}
+        summary = client.get("/api/v1/backfills/summary").json()
+        assert summary["running_per_source"] == {"shop": 1, "accounts": 1}
+        assert summary["states"]["queued"] == 1
+
+        # The first "shop" backfill finishing frees that source's slot
+        states["bf_public.orders"] = "completed"
+        assert client.post("/api/v1/backfills/tick").json() == {"finished": 1, "started": 1}
+
+    jobs = {job["table"]: job for job in client.get("/api/v1/backfills/?sink_id=orders-sink").json()}
+    assert jobs["public.orders"]["state"] == "completed"
+    assert jobs["public.orders"]["percent_complete"] == 100.0
+    assert jobs["public.order_items"]["state"] == "running"
+    assert jobs["public.order_items"]["sequin_backfill_id"] == "bf_public.order_items"
+
+    # A claim another worker is still working on is left alone; a stale one is
+    # queued again, or failed once it used up its attempts
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        session.exec(delete(BackfillJob))
+        session.add(BackfillJob(sink_id="fresh", source_database="a", state="starting", attempts=1, updated_at=now))
+        session.add(BackfillJob(sink_id="stale", source_database="b", state="starting", attempts=1,
+                                updated_at=now - timedelta(hours=1)))
+        session.add(BackfillJob(sink_id="spent", source_database="c", state="starting", attempts=3,
+                                updated_at=now - timedelta(hours=1)))
+        session.commit()
+
+    async def no_id(self, sink_id, payload):
+        return {"state": "active"}
+
+    with patch.object(SequinService, "create_backfill", no_id):
+        client.post("/api/v1/backfills/tick")
+    jobs = {job["sink_id"]: job for job in client.get("/api/v1/backfills/").json()}
+    assert jobs["fresh"]["state"] == "starting"
+    assert jobs["spent"]["state"] == "failed"
+    # Requeued, then started again; with no backfill ID it must not stay "running"
+    assert (jobs["stale"]["state"], jobs["stale"]["attempts"]) == ("failed", 2)
+    assert jobs["stale"]["error"] == "Sequin returned no backfill ID"
+
+def test_backfill_cancel_while_starting_or_refreshing_is_kept(client):
+    from app.models.backfill_job import BackfillJob
+    from app.services.sequin import SequinService
+
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.exec(delete(BackfillJob))
+        session.commit()
+        setup_settings(session)
+    started = client.post("/api/v1/backfills/", json={"items": [{"sink_id": "s1", "source_database": "a"}]})
+    job_id = started.json()[0]["id"]
+
+    def cancel_in_db():
+        # Another request cancels the job while the tick is waiting on Sequin
+        with Session(engine) as session:
+            job = session.get(BackfillJob, job_id)
+            job.state = "cancelled"
+            session.add(job)
+            session.commit()
+
+    async def create_backfill(self, sink_id, payload):
+        cancel_in_db()
+        return {"id": "bf_1", "state": "active"}
+
+    cancelled_in_sequin = []
+
+    async def update_backfill(self, sink_id, backfill_id, payload):
+        cancelled_in_sequin.append((backfill_id, payload["state"]))
+        return {"id": backfill_id, **payload}
+
+    with patch.object(SequinService, "create_backfill", create_backfill), \
+         patch.object(SequinService, "update_backfill", update_backfill):
+        assert client.post("/api/v1/backfills/tick").json() == {"finished": 0, "started": 0}
+    job = client.get(f"/api/v1/backfills/{job_id}").json()
+    assert (job["state"], job["sequin_backfill_id"]) == ("cancelled", "bf_1")
+    assert cancelled_in_sequin == [("bf_1", "cancelled")]
+
+    # Same for a running job whose progress is being fetched
+    with Session(engine) as session:
+        job = session.get(BackfillJob, job_id)
+        job.state = "running"
+        session.add(job)
+        session.commit()
+
+    async def get_backfill(self, sink_id, backfill_id):
+        cancel_in_db()
+        return {"id": backfill_id, "state": "active"}
+
+    with patch.object(SequinService, "get_backfill", get_backfill):
+        client.post("/api/v1/backfills/tick")
+    assert client.get(f"/api/v1/backfills/{job_id}").json()["state"] == "cancelled"
+
+def test_snowflake_pipeline_preview(client):
+    payload = {
+        "table": "tblsam_periode_minggu",
+        "columns": [
+            {"name": "periode_minggu_id", "type": "bigint", "primary_key": True, "nullable": False},
+            {"name": "start_date", "type": "date"},
+            {"name": "amount", "type": "numeric(12,2)"},
+            {"name": "last_modified", "type": "timestamp without time zone"},
+            {"name": "checksum", "type": "numeric(60,0)"},
+            {"name": "updated_at", "type": "timestamp with time zone", "nullable": False},
+        ],
+    }
+    response = client.post("/api/v1/snowflake/pipelines/preview", json=payload)
+    assert response.status_code == 200
+    table, stream, task, resume = response.json()["statements"]
+
+    assert "DEV_SNOWFLAKE_DB.BRONZE.TBLSAM_PERIODE_MINGGU" in table
+    assert "AMOUNT NUMBER(12,2)" in table and "PRIMARY KEY (PERIODE_MINGGU_ID)" in table
+    assert "CHECKSUM VARCHAR" in table
+    # Filled by a TRY_ cast, so it must be able to hold NULL
+    assert "UPDATED_AT TIMESTAMP_TZ,\n" in table and "PERIODE_MINGGU_ID NUMBER(38,0) NOT NULL" in table
+    assert "TRY_TO_TIMESTAMP_TZ(ROW_IMAGE:updated_at::string)" in task
+    assert "APPEND_ONLY = TRUE" in stream and "TBLSAM_PERIODE_MINGGU_LANDING" in stream
+    assert "FROM SNOWFLAKE_LANDING_DB.DEV.STR_TBLSAM_PERIODE_MINGGU_LANDING" in task
+    assert "PARTITION BY PERIODE_MINGGU_ID" in task
+    assert "DATEADD('day', TO_NUMBER(ROW_IMAGE:start_date::string), DATE '1970-01-01')" in task
+    assert "WHEN MATCHED AND S.OP = 'd' THEN DELETE" in task
+    assert resume.startswith("ALTER TASK")
+
+    no_key = {"table": "t", "columns": [{"name": "a", "type": "text"}]}
+    assert client.post("/api/v1/snowflake/pipelines/preview", json=no_key).status_code == 422
+
+@patch("httpx.AsyncClient.get")
+def test_sequin_instances_route_and_fan_out(mock_get, client):
+    from app.core.http_client import get_http_client
+    from app.models.sequin_instance import SequinInstance
+    from app.services.sequin_instances import sequin_instances
+
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.exec(delete(SequinInstance))
+        session.commit()
+        setup_settings(session)
+    sequin_instances.invalidate()
+
+    clusters = {
+        "https://mock.sequin.io": [{"id": "db_1", "name": "default-db"}],
+        "https://eu.sequin.io": [{"id": "db_2", "name": "eu-db"}],
+    }
+
+    async def get(url, **kwargs):
+        request = httpx.Request("GET", url)
+        if url.startswith("https://broken.sequin.io"):
+            return httpx.Response(401, text="bad token", request=request)
+        base = next(base for base in clusters if url.startswith(base))
+        return httpx.Response(200, json={"data": clusters[base]}, request=request)
+    mock_get.side_effect = get
+
+    for instance in (
+        {"id": "eu-1", "sequin_url": "https://eu.sequin.io", "sequin_token": "eu-token"},
+        {"id": "broken", "sequin_url": "https://broken.sequin.io", "sequin_token": "x"},
+    ):
+        assert client.post("/api/v1/sequin/instances/", json=instance).status_code == 201
+    assert client.post("/api/v1/sequin/instances/", json={"id": "default", "sequin_url": "x"}).status_code == 400
+
+    routed = client.get("/api/v1/sequin/databases", params={"instance": "eu-1"})
+    assert routed.json() == {"data": [{"id": "db_2", "name": "eu-db"}]}
+    # Each instance has its own pool
+    assert get_http_client("eu-1") is not get_http_client()
+
+    merged = client.get("/api/v1/sequin/databases", params={"instance": "all"}).json()
+    assert sorted((item["instance_id"], item["name"]) for item in merged["data"]) == [
+        ("default", "default-db"), ("eu-1", "eu-db"),
+    ]
+    assert merged["instances"]["broken"] == {"ok": False, "status_code": 401, "error": "Sequin Error: bad token"}
+    assert client.get("/api/v1/sequin/databases", params={"instance": "all", "source": "mirror"}).status_code == 400
+
+    listed = {item["id"]: item for item in client.get("/api/v1/sequin/instances/").json()}
+    assert set(listed) == {"default", "broken", "eu-1"} and listed["eu-1"]["has_token"]
+    assert "sequin_token" not in listed["eu-1"]
+
+    assert client.delete("/api/v1/sequin/instances/broken").status_code == 200
+    assert client.get("/api/v1/sequin/databases", params={"instance": "broken"}).status_code == 404
+
+def test_refresh_tables_builds_searchable_catalog(client):
+    from app.models.sequin_database import SequinDatabase
+    from app.services.sequin import SequinService
+    from app.services.table_catalog import CatalogIndex
+
+    with Session(engine) as session:
+        session.exec(delete(SystemSettings))
+        session.exec(delete(SequinDatabase))
+        session.commit()
+        setup_settings(session)
+        # The mirror maps the database's name to its ID
+        session.add(SequinDatabase(id="db_1", name="orders-db", hostname="pg", port=5432, database="orders", username="u"))
+        session.commit()
+
+    def tables(*extra):
+        return {"data": {"id": "db_1", "tables": [
+            {"oid": 1, "schema": "public", "name": "orders", "columns": [
+                {"attnum": 1, "name": "id", "type": "bigint", "is_pk?": True},
+                *extra,
+            ]},
+            {"oid": 2, "schema": "public", "name": "order_items", "columns": []},
+            {"oid": 3, "schema": "billing", "name": "invoices", "columns": []},
+        ]}}
+
+    first = tables()
+    second = tables({"attnum": 2, "name": "total", "type": "numeric"})
+    second["data"]["tables"].pop()  # billing.invoices dropped
+    refresh = AsyncMock(side_effect=[first, second])
+
+    with patch.object(SequinService, "refresh_tables", refresh):
+        baseline = client.post("/api/v1/sequin/databases/orders-db/refresh-tables").json()["catalog"]
+        assert baseline == {"added": 3, "altered": 0, "removed": 0, "unchanged": 0}
+        base = "/api/v1/sequin/databases/db_1/catalog"
+        assert client.get(f"{base}/changes").json()["total"] == 0
+
+        search = client.get(f"{base}/tables", params={"q": "ORDER", "limit": 1}).json()
+        assert search["total"] == 2 and [t["table_name"] for t in search["items"]] == ["order_items"]
+        assert client.get(f"{base}/tables", params={"q": "voice", "mode": "substring"}).json()["total"] == 1
+        # Addressed by name, the same catalog is found
+        by_name = client.get("/api/v1/sequin/databases/orders-db/catalog/tables", params={"q": "ORDER"}).json()
+        assert by_name["total"] == 2
+        # A database the mirror does not know yet is resolved through Sequin
+        with patch.object(SequinService, "get_database", AsyncMock(return_value={"data": {"id": "db_1"}})):
+            renamed = client.get("/api/v1/sequin/databases/orders-renamed/catalog/schemas").json()
+        assert {s["schema_name"] for s in renamed} == {"public", "billing"}
+
+        stats = client.post("/api/v1/sequin/databases/orders-db/refresh-tables").json()["catalog"]
+        assert stats == {"added": 0, "altered": 1, "removed": 1, "unchanged": 1}
+
+    changes = client.get(f"{base}/changes").json()["items"]
+    assert {(c["table_name"], c["change"]) for c in changes} == {("orders", "altered"), ("invoices", "removed")}
+    altered = next(c for c in changes if c["change"] == "altered")
+    assert altered["details"]["added"] == ["total"]
+    assert client.get(f"{base}/schemas").json() == [{"schema_name": "public", "table_count": 2}]
+    assert client.get(f"{base}/tables/public/orders").json()["column_count"] == 2
+    assert client.get(f"{base}/tables/billing/invoices").status_code == 404
+
+    index = CatalogIndex([(1, "public", "orders"), (2, "sales", "public_orders")])
+    assert index.prefix("public") == [1, 2] and index.substring("c_or") == [2]
+
+    with Session(engine) as session:
+        session.exec(delete(SequinDatabase))
+        session.commit()
+
+def test_wal_monitor_flags_stalled_slots(client):
+    import asyncio
+    from app.models.sequin_database import SequinDatabase
+    from app.services.wal_monitor import WalMonitor
+
+    monitor = WalMonitor(interval=60, raw_size=10, timeout=1,
+                         retained_thresholds=(100, 1000), flush_lag_thresholds=(60, 600))
+    row = {
+        "current_lsn": "0/5000", "slot_name": "sequin_slot", "plugin": "pgoutput", "slot_type": "logical",
+        "active": False, "wal_status": "extended", "restart_lsn": "0/1000", "confirmed_flush_lsn": "0/1000",
+        "retained_bytes": 5000, "flush_lag_bytes": 4096, "reported_flush_lag_seconds": None,
+    }
+    conn = AsyncMock()
+    conn.fetch.return_value = [row]
+    acquired = AsyncMock()
+    acquired.__aenter__.return_value = conn
+    pool = AsyncMock()
+    pool.acquire = lambda timeout=None: acquired
+
+    with Session(engine) as session:
+        session.exec(delete(SequinDatabase))
+        session.add(SequinDatabase(id="db-1", name="orders", hostname="pg", port=5432, database="orders",
+                                   username="u", replication_slots=[{"slot_name": "sequin_slot"}]))
+        session.add(SequinDatabase(id="db-2", name="tunnelled", hostname="", port=5432, database="x",
+                                   username="u", use_local_tunnel=True))
+        session.commit()
+
+    with patch.object(WalMonitor, "_pool", AsyncMock(return_value=pool)), \
+            patch("app.services.wal_monitor.time") as clock, \
+            patch("app.api.v1.endpoints.wal.wal_monitor", monitor):
+        clock.time.return_value = 1000.0
+        first = client.get("/api/v1/wal/slots?live=true").json()
+        clock.time.return_value = 1700.0
+        client.get("/api/v1/wal/slots?live=true")
+        alerts = client.get("/api/v1/wal/alerts").json()
+
+    slot = first["sources"]["orders"]["slots"][0]
+    assert slot["managed_by_sequin"] and slot["confirmed_flush_lag_seconds"] == 0.0
+    assert first["sources"]["tunnelled"]["error"]
+    # The confirmed flush LSN did not move for 700s while newer WAL exists
+    assert alerts["critical"] == 2 and alerts["warning"] == 1
+    assert [a["metric"] for a in alerts["alerts"]] == ["retained_bytes", "confirmed_flush_lag_seconds", "unreachable"]
+    assert len(monitor.flush_lag.query("raw")) == 2
+
+    # A live sample and the scheduled run never overlap
+    running = []
+
+    async def slow_collect(session):
+        running.append(session)
+        assert len(running) == 1
+        await asyncio.sleep(0.01)
+        running.remove(session)
+        return {}
+
+    async def both():
+        await asyncio.gather(monitor.collect("live"), monitor.collect("scheduled"))
+
+    with patch.object(monitor, "_collect", slow_collect):
+        asyncio.run(both())
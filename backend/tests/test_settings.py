@@ -1,27 +1,40 @@
 from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine
 from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 import pytest
+from unittest.mock import patch, AsyncMock
 from app.main import app
 from app.core.database import get_session
 # Import models so they are registered with SQLModel.metadata
 from app.models.settings import SystemSettings
+from app.services.settings_store import settings_store
 
-# Setup in-memory DB for tests
+# Setup in-memory DB for tests.
+# The app uses the async engine (aiosqlite); the sync engine shares the same
+# in-memory database so tests can arrange data without an event loop.
+DB_URI = "file:test_settings?mode=memory&cache=shared&uri=true"
 engine = create_engine(
-    "sqlite:///:memory:", 
-    connect_args={"check_same_thread": False}, 
+    f"sqlite:///{DB_URI}",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{DB_URI}",
     poolclass=StaticPool
 )
 SQLModel.metadata.create_all(engine)
 
 @pytest.fixture(name="client")
 def client_fixture():
-    def get_session_override():
-        with Session(engine) as session:
+    async def get_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
             yield session
+            await session.commit()
     
     app.dependency_overrides[get_session] = get_session_override
+    settings_store.invalidate()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
@@ -48,3 +61,137 @@ def test_update_settings(client):
     # Verify persistence
     response = client.get("/api/v1/settings/")
     assert response.json()["sequin_url"] == "https://newapi.sequin.io"
+
+def test_update_settings_bumps_version_and_refreshes_snapshot(client):
+    before = client.get("/api/v1/settings/").json()["version"]
+    response = client.post("/api/v1/settings/", json={"kafka_url": "broker:29092"})
+    assert response.json()["version"] == before + 1
+    assert settings_store.version == before + 1
+
+    # Served from the snapshot without another SELECT
+    with patch.object(AsyncSession, "exec", side_effect=AssertionError("unexpected query")):
+        response = client.get("/api/v1/settings/")
+    assert response.json()["kafka_url"] == "broker:29092"
+
+def test_kafka_status_is_served_from_monitor_cache(client):
+    from app.services.health_monitor import health_monitor
+    health_monitor.reset()
+    client.post("/api/v1/settings/", json={"kafka_url": "broker:29092"})
+
+    probe_result = {"connected": True, "details": ["AdminClient connected."]}
+    with patch("app.services.health_monitor.check_kafka_connection", new_callable=AsyncMock, return_value=probe_result) as probe:
+        first = client.post("/api/v1/settings/test-kafka").json()
+        second = client.post("/api/v1/settings/test-kafka").json()
+        live = client.post("/api/v1/settings/test-kafka?live=true").json()
+
+    assert probe.call_count == 2
+    assert first["connected"] and not first["cached"]
+    assert second["cached"]
+    assert not live["cached"]
+    assert "latency_ms" in live
+    assert client.get("/api/v1/settings/").json()["kafka_reachable"] is True
+
+def test_kafka_checks_run_concurrently_under_deadline():
+    import asyncio
+    import time
+    from app.services import kafka
+
+    def slow(_):
+        time.sleep(0.3)
+        return "ok"
+
+    def hung(_):
+        time.sleep(2)
+        return "late"
+
+    checks = {"admin": slow, "producer": slow, "consumer": hung}
+    with patch.dict(kafka._CHECKS, checks):
+        started = time.perf_counter()
+        result = asyncio.run(kafka.check_kafka_connection("broker:9092", timeout=0.5))
+        elapsed = time.perf_counter() - started
+
+        metadata = asyncio.run(kafka.check_kafka_connection("broker:9092", metadata_only=True, timeout=1))
+
+    assert elapsed < 1
+    assert not result["connected"]
+    assert "Consumer check failed" in result["error"]
+    assert [c["ok"] for c in result["checks"]] == [True, True, False]
+    assert result["checks"][0]["latency_ms"] >= 300
+    assert metadata["connected"] and [c["check"] for c in metadata["checks"]] == ["admin"]
+
+def test_hung_kafka_probes_do_not_block_other_kafka_calls():
+    import asyncio
+    import threading
+    from app.services import kafka
+
+    release = threading.Event()
+
+    def hung(_):
+        release.wait(5)
+        return "late"
+
+    async def probe_then_call():
+        # Enough timed-out probes to occupy every probe thread
+        for _ in range(kafka._probe_executor._max_workers):
+            await kafka.check_kafka_connection("broker:9092", metadata_only=True, timeout=0.01)
+        return await asyncio.wait_for(kafka.run_blocking(lambda: "offsets"), timeout=1)
+
+    with patch.dict(kafka._CHECKS, {"admin": hung}):
+        try:
+            assert asyncio.run(probe_then_call()) == "offsets"
+        finally:
+            release.set()
+            # Let the queued probes finish while the check is still patched
+            kafka._probe_executor.submit(lambda: None).result(timeout=5)
+
+def test_kafka_lag_per_partition_and_topic():
+    from app.services.kafka_lag import compute_lag
+
+    committed = {"sink-group": {("cdc.orders", 0): 90, ("cdc.orders", 1): -1, ("cdc.users", 0): 10}}
+    end_offsets = {("cdc.orders", 0): 100, ("cdc.orders", 1): 5, ("cdc.users", 0): 10}
+    lag = compute_lag(committed, end_offsets)
+
+    orders = lag["sink-group"]["topics"]["cdc.orders"]
+    assert [p["lag"] for p in orders["partitions"]] == [10, 5]
+    assert orders["lag"] == 15
+    assert lag["sink-group"]["topics"]["cdc.users"]["lag"] == 0
+    assert lag["sink-group"]["lag"] == 15
+
+def test_kafka_lag_series_rollups_are_bounded(client):
+    from app.services.kafka_lag import LagSeries, kafka_lag_collector
+
+    series = LagSeries(raw_size=3)
+    for i in range(5):
+        series.add(120 + i * 20, {"g|t": float(i * 10)})
+
+    assert len(series.query("raw")) == 3
+    minutes = series.query("1m")
+    assert [m["samples"] for m in minutes] == [3, 2]
+    assert minutes[0]["avg"] == {"g|t": 10.0} and minutes[0]["max"] == {"g|t": 20.0}
+    assert series.query("5m")[0]["samples"] == 5
+
+    with patch.object(kafka_lag_collector, "series", series):
+        history = client.get("/api/v1/kafka/lag/history?resolution=1m&group=other").json()
+    assert history["points"][0]["avg"] == {}
+
+def test_startup_migrations_skip_when_schema_is_current(tmp_path):
+    from sqlalchemy import create_engine as create_sync_engine
+    from app.core import db_migrations
+
+    assert len(db_migrations.script_heads()) == 1
+    head = next(iter(db_migrations.script_heads()))
+
+    fresh = create_sync_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    with fresh.begin() as connection:
+        assert db_migrations._run_pending_migrations(connection) == "upgraded"
+    with fresh.begin() as connection:
+        assert db_migrations.current_revision(connection) == head
+        with patch("alembic.command.upgrade", side_effect=AssertionError("unexpected DDL")):
+            assert db_migrations._run_pending_migrations(connection) == "current"
+
+    # Tables from an old create_all without alembic_version are stamped and upgraded
+    legacy = create_sync_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    SQLModel.metadata.create_all(legacy)
+    with legacy.begin() as connection:
+        assert db_migrations._run_pending_migrations(connection) == "upgraded"
+        assert db_migrations.current_revision(connection) == head